@@ -0,0 +1,225 @@
+"""
+Concurrency benchmark of the database data path.
+
+Seeds a throwaway SQLite database with creatures, then runs slow searches
+(full table scans) concurrently with a steady stream of fast lookups by ID,
+while a ticker measures how late the event loop wakes up. It compares
+running the queries inline on the event loop, as the handlers used to, with
+running them on the bounded database executor:
+
+    python benchmarks/database.py --creatures 200000 --searches 4 --lookups 200
+
+With inline queries every lookup waits behind the scans running on the
+loop. On the executor the loop stays responsive, and lookups only queue
+when the slow searches occupy every worker (see DB_EXECUTOR_WORKERS).
+
+Add --writers to keep inserts committing meanwhile, and compare the SQLite
+profile with other settings through the environment, e.g.:
+
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL \\
+        python benchmarks/database.py --writers 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from fake_llm import percentiles
+
+
+def seed(engine, count: int) -> None:
+    """
+    Insert count creatures with random names in batches.
+    """
+    from pokedex.creature.enums import BodyShapeIcon
+    from pokedex.creature.models import Creature
+
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxy"
+    rows = [
+        {
+            "name": "".join(rng.choices(letters, k=12)),
+            "scientific_name": "".join(rng.choices(letters, k=16)),
+            "description": "Benchmark creature " * 5,
+            "gender_ratio": 0.5,
+            "kingdom": "Animalia",
+            "classification": rng.choice(["Mammal", "Bird", "Fish", "Reptile"]),
+            "family": "Benchmarkidae",
+            "height": rng.uniform(1, 500),
+            "weight": rng.uniform(0.1, 5000),
+            "body_shape": rng.choice(list(BodyShapeIcon)),
+            "image_path": f"/uploads/{i}.jpg",
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as connection:
+        for start in range(0, count, 10_000):
+            connection.execute(Creature.__table__.insert(), rows[start : start + 10_000])
+
+
+async def run_strategy(engine, strategy: str, args: argparse.Namespace) -> dict:
+    from sqlmodel import Session
+
+    from pokedex.creature.enums import BodyShapeIcon
+    from pokedex.creature.models import Creature
+    from pokedex.creature.service import get, search_creatures
+    from pokedex.database import run_db
+
+    def search_inline(session: Session) -> list:
+        return session.query(Creature).filter(Creature.name.ilike("%zz%")).all()
+
+    lags: list[float] = []
+    lookups: list[float] = []
+    searches: list[float] = []
+    writes: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    async def search():
+        while not done.is_set():
+            with Session(engine) as session:
+                started = time.perf_counter()
+                if strategy == "inline":
+                    search_inline(session)
+                else:
+                    await search_creatures(session, name="zz")
+                searches.append(time.perf_counter() - started)
+            await asyncio.sleep(0)
+
+    def insert(session: Session) -> None:
+        session.add(
+            Creature(
+                name=f"written {random.random()}",
+                scientific_name="Benchmarkus scriptor",
+                description="Written while searching",
+                gender_ratio=0.5,
+                kingdom="Animalia",
+                classification="Mammal",
+                family="Benchmarkidae",
+                height=1,
+                weight=1,
+                body_shape=BodyShapeIcon.QUADRUPED,
+                image_path="/uploads/written.jpg",
+            )
+        )
+        session.commit()
+
+    async def write():
+        while not done.is_set():
+            with Session(engine) as session:
+                started = time.perf_counter()
+                if strategy == "inline":
+                    insert(session)
+                else:
+                    await run_db(insert, session)
+                writes.append(time.perf_counter() - started)
+            await asyncio.sleep(0)
+
+    async def lookup(creature_id: int, issued: float):
+        # Timed from when the request arrived, including the wait for the loop
+        with Session(engine) as session:
+            if strategy == "inline":
+                get(session, creature_id)
+            else:
+                await run_db(get, session, creature_id)
+        lookups.append(time.perf_counter() - issued)
+
+    async def lookups_stream():
+        tasks = []
+        next_issue = time.perf_counter()
+        for _ in range(args.lookups):
+            tasks.append(
+                asyncio.create_task(lookup(random.randint(1, args.creatures), next_issue))
+            )
+            next_issue += args.lookup_interval
+            await asyncio.sleep(max(0.0, next_issue - time.perf_counter()))
+        await asyncio.gather(*tasks)
+        done.set()
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(
+        lookups_stream(),
+        *(search() for _ in range(args.searches)),
+        *(write() for _ in range(args.writers)),
+    )
+    elapsed = time.perf_counter() - started
+    await ticker_task
+
+    return {
+        "strategy": strategy,
+        "elapsed_seconds": elapsed,
+        "lookup": percentiles(lookups),
+        "search": percentiles(searches),
+        "write": percentiles(writes),
+        "searches_per_second": len(searches) / elapsed,
+        "loop_lag": {**percentiles(lags), "max": max(lags, default=0.0)},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--creatures", type=int, default=200_000, help="Rows to seed")
+    parser.add_argument("--searches", type=int, default=4,
+                        help="Slow searches kept running concurrently")
+    parser.add_argument("--writers", type=int, default=0,
+                        help="Inserts kept committing concurrently")
+    parser.add_argument("--lookups", type=int, default=200, help="Lookups by ID to send")
+    parser.add_argument("--lookup-interval", type=float, default=0.01,
+                        help="Seconds between lookups")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        os.environ.setdefault("MODEL_API_KEY", "benchmark")
+        os.environ.setdefault("IMAGE_MODEL_API_KEY", "benchmark")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+        from loguru import logger
+
+        import pokedex.creature.models  # noqa: F401 registers the tables
+        from pokedex.database import create_db_and_tables, engine
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        engine.echo = False
+        create_db_and_tables(engine)
+        seed(engine, args.creatures)
+
+        results = [
+            asyncio.run(run_strategy(engine, strategy, args)) for strategy in ("inline", "executor")
+        ]
+
+    print(
+        f"\n{args.creatures} creatures, {args.searches} concurrent searches, "
+        f"{args.lookups} lookups every {args.lookup_interval}s"
+    )
+    print(f"{'':<22}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for result in results:
+        print(f"{result['strategy']} ({result['elapsed_seconds']:.2f}s)")
+        for name in ("lookup", "search", "write", "loop_lag"):
+            stats = result[name]
+            if not stats["count"]:
+                continue
+            print(
+                f"  {name:<20}{stats['count']:>7}"
+                f"{stats['p50']:>9.4f}s{stats['p95']:>9.4f}s{stats['p99']:>9.4f}s"
+            )
+        print(f"  {'max loop lag':<27}{result['loop_lag']['max']:>9.4f}s")
+        print(f"  {'searches per second':<27}{result['searches_per_second']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark of the creature facets.
+
+Seeds a throwaway SQLite database with creatures, then compares reading the
+facets of the whole catalogue from the counts the triggers maintain against
+counting them with GROUP BY queries over the table, and times filtered
+facets, which are always counted:
+
+    python benchmarks/facets.py --creatures 200000 --requests 20
+
+It also times inserts with and without the facet triggers, the price of
+keeping the counts up to date.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from database import seed
+from fake_llm import percentiles
+
+
+async def run_strategy(engine, strategy: str, requests: int) -> dict:
+    from sqlmodel import Session
+
+    from pokedex.creature import service
+
+    latencies: list[float] = []
+    # Without the summary the service counts the facets from the table
+    service._has_facet_summary = lambda db_session: strategy == "summary"
+    filters = {"classification": "Bird"} if strategy == "filtered" else {}
+    with Session(engine) as session:
+        for _ in range(requests):
+            started = time.perf_counter()
+            await service.get_facets(session, **filters)
+            latencies.append(time.perf_counter() - started)
+    return {"strategy": strategy, "latency": percentiles(latencies)}
+
+
+def time_inserts(engine, count: int) -> float:
+    """
+    Returns the seconds taken to insert count creatures one transaction each.
+    """
+    from pokedex.creature.enums import BodyShapeIcon
+    from pokedex.creature.models import Creature
+
+    started = time.perf_counter()
+    for i in range(count):
+        with engine.begin() as connection:
+            connection.execute(
+                Creature.__table__.insert(),
+                {
+                    "name": f"inserted {time.perf_counter()} {i}",
+                    "scientific_name": "Benchmarkus scriptor",
+                    "description": "Inserted while timing",
+                    "gender_ratio": 0.5,
+                    "kingdom": "Animalia",
+                    "classification": "Mammal",
+                    "family": "Benchmarkidae",
+                    "height": 10.0,
+                    "weight": 1.0,
+                    "body_shape": BodyShapeIcon.QUADRUPED,
+                    "image_path": "/uploads/inserted.jpg",
+                },
+            )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--creatures", type=int, default=200_000, help="Rows to seed")
+    parser.add_argument("--requests", type=int, default=20, help="Facet requests per strategy")
+    parser.add_argument("--inserts", type=int, default=500, help="Inserts to time per setup")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        os.environ.setdefault("MODEL_API_KEY", "benchmark")
+        os.environ.setdefault("IMAGE_MODEL_API_KEY", "benchmark")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+        from loguru import logger
+
+        import pokedex.creature.models  # noqa: F401 registers the tables
+        from pokedex.creature.facets import create_facet_summary
+        from pokedex.database import create_db_and_tables, engine
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        engine.echo = False
+        create_db_and_tables(engine)
+        seed(engine, args.creatures)
+        create_facet_summary(engine)
+
+        results = [
+            asyncio.run(run_strategy(engine, strategy, args.requests))
+            for strategy in ("group by", "summary", "filtered")
+        ]
+
+        with_triggers = time_inserts(engine, args.inserts)
+        with engine.begin() as connection:
+            for event in ("insert", "update", "delete"):
+                connection.execute(text(f"DROP TRIGGER creature_facets_{event}"))
+        without_triggers = time_inserts(engine, args.inserts)
+
+    print(f"\n{args.creatures} creatures, {args.requests} requests")
+    print(f"{'':<12}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for result in results:
+        stats = result["latency"]
+        print(
+            f"{result['strategy']:<12}"
+            f"{stats['p50']:>9.4f}s{stats['p95']:>9.4f}s{stats['p99']:>9.4f}s"
+        )
+    print(f"\n{args.inserts} inserts")
+    print(f"  {'with facet triggers':<24}{with_triggers / args.inserts * 1000:>8.3f}ms each")
+    print(f"  {'without':<24}{without_triggers / args.inserts * 1000:>8.3f}ms each")
+
+
+if __name__ == "__main__":
+    main()
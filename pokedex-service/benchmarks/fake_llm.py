@@ -0,0 +1,429 @@
+"""
+OpenAI-compatible stand-in for the model endpoints used by the service.
+
+It answers the chat completion requests ChatOpenAI sends for structured
+output, both with a JSON schema response format and with function calling,
+by generating a valid object from the requested schema. Latency is sampled
+from a configurable distribution per model, a share of requests can be
+failed on purpose, and real responses can be recorded from an upstream
+endpoint to be replayed later.
+
+Run it on its own with:
+
+    python benchmarks/fake_llm.py --port 9000 --latency lognormal:1.5,0.4
+
+and point MODEL_ENDPOINT and IMAGE_MODEL_ENDPOINT at http://127.0.0.1:9000/v1.
+"""
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import hashlib
+import json
+import math
+import random
+import time
+from typing import Any
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import httpx
+
+# Structured output schemas of the agents and the identify stage they belong to
+SCHEMA_STAGES = {
+    "CreatureName": "scanning",
+    "CreatureIdentification": "scanning",
+    "IsCreatureState": "verifying",
+    "CreatureExplanation": "explaining",
+}
+
+
+@dataclass
+class Latency:
+    """
+    Latency distribution of a model, parsed from specs such as "constant:0.5",
+    "uniform:0.2,1.0", "normal:1.0,0.3", "lognormal:1.5,0.4" (median and
+    sigma) or "replay" to reuse the latency recorded with each response.
+    """
+
+    kind: str
+    params: tuple[float, ...] = ()
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, params = spec.partition(":")
+        expected = {"constant": 1, "uniform": 2, "normal": 2, "lognormal": 2, "replay": 0}
+        if kind not in expected:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        values = tuple(float(value) for value in params.split(",") if value)
+        if len(values) != expected[kind]:
+            raise ValueError(f"Latency {kind} takes {expected[kind]} parameters: {spec}")
+        return cls(kind, values)
+
+    def sample(self, rng: random.Random, recorded: float | None = None) -> float:
+        match self.kind:
+            case "constant":
+                return self.params[0]
+            case "uniform":
+                return rng.uniform(*self.params)
+            case "normal":
+                return max(0.0, rng.gauss(*self.params))
+            case "lognormal":
+                median, sigma = self.params
+                return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+            case _:
+                return recorded or 0.0
+
+
+@dataclass
+class FakeModelConfig:
+    """
+    Behaviour of the fake model server.
+    """
+
+    latency: Latency = field(default_factory=lambda: Latency("constant", (0.0,)))
+    model_latency: dict[str, Latency] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (500, 429, 503)
+    # Number of distinct creature names answered, 0 for one name per image
+    name_pool: int = 0
+    seed: int | None = None
+    record_path: str | None = None
+    replay_path: str | None = None
+    upstream: str | None = None
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """
+    Returns the count, mean and nearest-rank p50/p95/p99 of a list of values.
+    """
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+    }
+
+
+def request_key(body: dict) -> str:
+    """
+    Returns the key matching a request to its recorded response.
+    """
+    relevant = {name: body.get(name) for name in ("model", "messages", "response_format", "tools")}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+def requested_schema(body: dict) -> tuple[str, dict | None, bool]:
+    """
+    Returns the name and JSON schema of the structured output requested,
+    and whether it was requested through function calling.
+    """
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        json_schema = response_format["json_schema"]
+        return json_schema.get("name", "json_schema"), json_schema.get("schema"), False
+    tools = body.get("tools") or []
+    if tools:
+        function = tools[0]["function"]
+        return function["name"], function.get("parameters"), True
+    return "text", None, False
+
+
+def message_text(body: dict) -> str:
+    """
+    Returns the contents of the last message, including inline images.
+    """
+    messages = body.get("messages") or [{}]
+    content = messages[-1].get("content") or ""
+    return content if isinstance(content, str) else json.dumps(content, sort_keys=True)
+
+
+class FakeModel:
+    """
+    Generates, records and replays chat completions and keeps per schema
+    latency statistics.
+    """
+
+    def __init__(self, config: FakeModelConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[int, int] = {}
+        self._replay: dict[str, dict] = {}
+        self._replay_by_schema: dict[str, list[dict]] = {}
+        self._replay_cursor: dict[str, int] = {}
+        if config.replay_path:
+            with open(config.replay_path) as f:
+                for line in f:
+                    if line.strip():
+                        self.add_replay(json.loads(line))
+
+    def add_replay(self, record: dict) -> None:
+        self._replay[record["key"]] = record
+        self._replay_by_schema.setdefault(record["schema"], []).append(record)
+
+    def replayed(self, key: str, schema: str) -> dict | None:
+        """
+        Returns the recorded exchange for a request: the exact same request
+        if it was recorded, otherwise the recorded responses of the same
+        schema in turn.
+        """
+        record = self._replay.get(key)
+        if record is not None:
+            return record
+        records = self._replay_by_schema.get(schema)
+        if not records:
+            return None
+        cursor = self._replay_cursor.get(schema, 0)
+        self._replay_cursor[schema] = cursor + 1
+        return records[cursor % len(records)]
+
+    def creature_name(self, seed_text: str) -> str:
+        digest = hashlib.sha256(seed_text.encode()).hexdigest()
+        if self.config.name_pool > 0:
+            return f"Benchmark Creature {int(digest, 16) % self.config.name_pool}"
+        return f"Benchmark Creature {digest[:8]}"
+
+    def fake_value(self, schema: dict, defs: dict, name: str, seed_text: str) -> Any:
+        """
+        Returns a value valid against a JSON schema. Names are derived from
+        the request so the same image is always given the same creature.
+        """
+        if "$ref" in schema:
+            schema = defs[schema["$ref"].rsplit("/", 1)[-1]]
+        if "anyOf" in schema:
+            options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+            return self.fake_value(options[0] if options else {"type": "null"}, defs, name, seed_text)
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+
+        match schema.get("type"):
+            case "object":
+                return {
+                    key: self.fake_value(value, defs, key, seed_text)
+                    for key, value in schema.get("properties", {}).items()
+                }
+            case "array":
+                return [self.fake_value(schema.get("items", {}), defs, name, seed_text)]
+            case "boolean":
+                return True
+            case "integer" | "number":
+                if "maximum" in schema:
+                    value = schema["maximum"]
+                else:
+                    value = max(schema.get("minimum", 1.0), 1.0)
+                return int(value) if schema["type"] == "integer" else float(value)
+            case "string":
+                if name == "name":
+                    return self.creature_name(seed_text)
+                return f"Benchmark {name.replace('_', ' ')}"
+            case _:
+                return None
+
+    def completion(self, body: dict) -> dict:
+        """
+        Returns a chat completion answering the structured output request.
+        """
+        schema_name, schema, function_calling = requested_schema(body)
+        seed_text = message_text(body)
+        if schema is None:
+            content = "Benchmark response"
+        else:
+            content = json.dumps(self.fake_value(schema, schema.get("$defs", {}), "", seed_text))
+
+        message: dict[str, Any] = {"role": "assistant", "content": content, "refusal": None}
+        finish_reason = "stop"
+        if function_calling:
+            message["content"] = None
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": schema_name, "arguments": content},
+                }
+            ]
+            finish_reason = "tool_calls"
+
+        prompt_tokens = len(seed_text) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "schemas": {schema: percentiles(values) for schema, values in self.latencies.items()},
+            "errors": {str(status): count for status, count in self.errors.items()},
+        }
+
+
+def create_app(config: FakeModelConfig) -> FastAPI:
+    """
+    Returns the fake model server as an ASGI app.
+
+    Args:
+        config (FakeModelConfig): Behaviour of the server
+
+    Returns:
+        FastAPI: The app, with the FakeModel in app.state.model
+    """
+    model = FakeModel(config)
+    record_file = open(config.record_path, "a") if config.record_path else None
+    upstream = httpx.AsyncClient(base_url=config.upstream, timeout=300) if config.upstream else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        if upstream is not None:
+            await upstream.aclose()
+        if record_file is not None:
+            record_file.close()
+
+    app = FastAPI(title="Fake model server", lifespan=lifespan)
+    app.state.model = model
+
+    async def record(body: dict, schema: str, latency: float, status: int, response: dict) -> None:
+        record = {
+            "key": request_key(body),
+            "schema": schema,
+            "model": body.get("model"),
+            "latency": latency,
+            "status": status,
+            "response": response,
+        }
+        model.add_replay(record)
+        if record_file is not None:
+            record_file.write(json.dumps(record) + "\n")
+            record_file.flush()
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        schema_name, _, _ = requested_schema(body)
+        model_name = body.get("model", "")
+
+        if upstream is not None:
+            started = time.perf_counter()
+            response = await upstream.post(
+                "/chat/completions",
+                json=body,
+                headers={"Authorization": request.headers.get("authorization", "")},
+            )
+            latency = time.perf_counter() - started
+            await record(body, schema_name, latency, response.status_code, response.json())
+            model.latencies.setdefault(schema_name, []).append(latency)
+            return JSONResponse(response.json(), status_code=response.status_code)
+
+        if model.rng.random() < config.error_rate:
+            # Overloaded backends tend to reject requests early
+            status = model.rng.choice(config.error_statuses)
+            model.errors[status] = model.errors.get(status, 0) + 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error", "code": status}},
+                status_code=status,
+            )
+
+        replayed = model.replayed(request_key(body), schema_name)
+        latency = config.model_latency.get(model_name, config.latency).sample(
+            model.rng, replayed["latency"] if replayed else None
+        )
+        await asyncio.sleep(latency)
+        model.latencies.setdefault(schema_name, []).append(latency)
+
+        if replayed is not None:
+            return JSONResponse(replayed["response"], status_code=replayed["status"])
+        return model.completion(body)
+
+    @app.get("/stats")
+    async def stats():
+        return model.stats()
+
+    return app
+
+
+def parse_model_latency(values: list[str]) -> dict[str, Latency]:
+    """
+    Parses MODEL=SPEC options into per model latency distributions.
+    """
+    latencies = {}
+    for value in values:
+        model_name, _, spec = value.partition("=")
+        latencies[model_name] = Latency.parse(spec)
+    return latencies
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options configuring the fake model server to a parser.
+    """
+    group = parser.add_argument_group("fake model server")
+    group.add_argument("--latency", type=Latency.parse, default=Latency("constant", (0.0,)),
+                       help="Latency distribution, e.g. constant:0.5, uniform:0.2,1, "
+                            "normal:1,0.3, lognormal:1.5,0.4 or replay")
+    group.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SPEC",
+                       help="Latency distribution of one model, may be repeated")
+    group.add_argument("--error-rate", type=float, default=0.0,
+                       help="Share of requests failed with one of --error-status")
+    group.add_argument("--error-status", type=int, action="append", default=None,
+                       help="Status codes of injected failures, may be repeated")
+    group.add_argument("--name-pool", type=int, default=0,
+                       help="Number of distinct creature names answered, 0 for one per image")
+    group.add_argument("--seed", type=int, default=None, help="Seed of latencies and failures")
+    group.add_argument("--record", dest="record_path", metavar="PATH",
+                       help="Append the exchanges with --upstream to this JSONL file")
+    group.add_argument("--replay", dest="replay_path", metavar="PATH",
+                       help="Answer with the responses recorded in this JSONL file")
+    group.add_argument("--upstream", metavar="URL",
+                       help="Real endpoint to forward requests to while recording, e.g. "
+                            "https://api.openai.com/v1")
+
+
+def config_from_args(args: argparse.Namespace) -> FakeModelConfig:
+    """
+    Returns the server configuration from parsed options.
+    """
+    return FakeModelConfig(
+        latency=args.latency,
+        model_latency=parse_model_latency(args.model_latency),
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status or (500, 429, 503)),
+        name_pool=args.name_pool,
+        seed=args.seed,
+        record_path=args.record_path,
+        replay_path=args.replay_path,
+        upstream=args.upstream,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,307 @@
+"""
+End-to-end benchmark of creature identification.
+
+Runs the real service with uvicorn against the fake model server from
+fake_llm.py, both on local ports and with a throwaway database and storage,
+then drives it over HTTP and reports throughput and p50/p95/p99 latencies:
+end to end, per identify stage and per model call.
+
+    python benchmarks/identify.py --requests 200 --concurrency 16 \\
+        --latency lognormal:1.5,0.4 --error-rate 0.02
+
+In the default "sync" mode the images are posted to /creature/identify and
+stage latencies come from the model calls. In "jobs" mode they are queued
+on /creature/jobs and each stage is timed from the job's event stream.
+Pass service settings with --env, e.g. --env FUSED_SCAN=true.
+"""
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import io
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import httpx
+from PIL import Image
+import uvicorn
+
+from fake_llm import SCHEMA_STAGES, add_arguments, config_from_args, create_app, percentiles
+
+API_PREFIX = "/api/v1"
+
+
+@dataclass
+class Results:
+    """
+    Measurements collected while driving the service.
+    """
+
+    latencies: list[float] = field(default_factory=list)
+    stages: dict[str, list[float]] = field(default_factory=dict)
+    statuses: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def count(self, status: str) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def generate_images(count: int, size: int, seed: int | None) -> list[bytes]:
+    """
+    Returns distinct noise images, so neither the scan cache nor the
+    near-duplicate index can answer for one another.
+    """
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        image = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def start_fake_model(args: argparse.Namespace, port: int):
+    """
+    Serve the fake model in its own thread and event loop, so its simulated
+    latency does not compete with the service for the loop.
+    """
+    app = create_app(config_from_args(args))
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, app.state.model
+
+
+def configure_service(args: argparse.Namespace, directory: str, model_port: int) -> None:
+    """
+    Point the service at the fake model and throwaway storage. This must run
+    before the service is imported, as its settings are read at import.
+    """
+    endpoint = f"http://127.0.0.1:{model_port}/v1"
+    for name in ("static", "uploads", "derivatives", "jobs"):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+    os.environ.update(
+        {
+            "API_PREFIX": API_PREFIX,
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'benchmark.db')}",
+            "STATIC_DIR": os.path.join(directory, "static"),
+            "UPLOAD_DIR": os.path.join(directory, "uploads"),
+            "DERIVATIVE_DIR": os.path.join(directory, "derivatives"),
+            "JOB_SPOOL_DIR": os.path.join(directory, "jobs"),
+            "MODEL_ENDPOINT": endpoint,
+            "IMAGE_MODEL_ENDPOINT": endpoint,
+            "MODEL_API_KEY": "benchmark",
+            "IMAGE_MODEL_API_KEY": "benchmark",
+        }
+    )
+    for value in args.env:
+        name, _, setting = value.partition("=")
+        os.environ[name] = setting
+
+
+async def identify(client: httpx.AsyncClient, image: bytes, results: Results) -> None:
+    started = time.perf_counter()
+    response = await client.post(
+        f"{API_PREFIX}/creature/identify",
+        files={"image": ("benchmark.jpg", image, "image/jpeg")},
+    )
+    results.latencies.append(time.perf_counter() - started)
+    results.count(str(response.status_code))
+
+
+async def identify_job(client: httpx.AsyncClient, image: bytes, results: Results) -> None:
+    started = time.perf_counter()
+    response = await client.post(
+        f"{API_PREFIX}/creature/jobs",
+        files={"image": ("benchmark.jpg", image, "image/jpeg")},
+    )
+    if response.status_code != 202:
+        results.latencies.append(time.perf_counter() - started)
+        results.count(str(response.status_code))
+        return
+
+    job_id = response.json()["id"]
+    stage, entered = "queued", started
+    status = "unknown"
+    async with client.stream("GET", f"{API_PREFIX}/creature/jobs/{job_id}/events") as events:
+        async for line in events.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            state = json.loads(line.removeprefix("data: "))
+            status = state["status"]
+            current = state["stage"] or stage
+            if status in ("succeeded", "failed") or current != stage:
+                now = time.perf_counter()
+                results.stages.setdefault(stage, []).append(now - entered)
+                stage, entered = current, now
+    results.latencies.append(time.perf_counter() - started)
+    results.count(status)
+
+
+async def drive(args: argparse.Namespace, port: int, images: list[bytes], model) -> Results:
+    """
+    Send the requests with bounded concurrency, after the warmup requests.
+    """
+    call = identify_job if args.mode == "jobs" else identify
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout
+    ) as client:
+        for i in range(args.warmup):
+            await call(client, images[i % len(images)], Results())
+        model.latencies.clear()
+        model.errors.clear()
+
+        results = Results()
+        queue: asyncio.Queue[bytes] = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(images[(args.warmup + i) % len(images)])
+
+        async def worker():
+            while not queue.empty():
+                image = queue.get_nowait()
+                try:
+                    await call(client, image, results)
+                except httpx.HTTPError as e:
+                    results.count(type(e).__name__)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        results.elapsed = time.perf_counter() - started
+    return results
+
+
+def report(args: argparse.Namespace, results: Results, model, llm_stats: list[dict]) -> dict:
+    """
+    Returns the benchmark summary and prints it as a table.
+    """
+    model_stats = model.stats()
+    stages = results.stages
+    if args.mode != "jobs":
+        # Without an event stream, a stage is timed by its model calls
+        stages = {}
+        for schema, values in model.latencies.items():
+            stages.setdefault(SCHEMA_STAGES.get(schema, schema), []).extend(values)
+
+    summary = {
+        "mode": args.mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": results.elapsed,
+        "throughput_rps": len(results.latencies) / results.elapsed if results.elapsed else 0.0,
+        "statuses": results.statuses,
+        "latency": percentiles(results.latencies),
+        "stages": {stage: percentiles(values) for stage, values in stages.items()},
+        "model_calls": model_stats["schemas"],
+        "model_errors": model_stats["errors"],
+        "llm_endpoints": llm_stats,
+    }
+
+    print(f"\n{args.requests} requests, concurrency {args.concurrency}, mode {args.mode}")
+    print(f"Throughput: {summary['throughput_rps']:.2f} req/s over {results.elapsed:.2f}s")
+    print(f"Statuses: {results.statuses}")
+    if model_stats["errors"]:
+        print(f"Injected model errors: {model_stats['errors']}")
+    print(f"\n{'':<28}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    rows = [("end to end", summary["latency"])]
+    if args.mode == "jobs":
+        rows += [(f"stage {stage}", stats) for stage, stats in summary["stages"].items()]
+    rows += [(f"model {schema}", stats) for schema, stats in summary["model_calls"].items()]
+    for name, stats in rows:
+        if stats["count"]:
+            print(
+                f"{name:<28}{stats['count']:>7}"
+                f"{stats['p50']:>9.3f}s{stats['p95']:>9.3f}s{stats['p99']:>9.3f}s"
+            )
+    for endpoint in llm_stats:
+        print(
+            f"\nEndpoint {endpoint['endpoint']}: circuit {endpoint['circuit']}, "
+            f"limit {endpoint['concurrency_limit']}, retries {endpoint['retries']}, "
+            f"rejected {endpoint['rejected']}"
+        )
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        model_port, service_port = free_port(), free_port()
+        model_server, model_thread, model = start_fake_model(args, model_port)
+        configure_service(args, directory, model_port)
+
+        from loguru import logger
+
+        from pokedex.database import engine
+        from pokedex.llm import llm_registry
+        from pokedex.main import app
+
+        logger.remove()
+        logger.add(sys.stderr, level=args.log_level)
+        engine.echo = False
+
+        images = generate_images(args.images or args.requests + args.warmup, args.image_size, args.seed)
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=service_port, log_level="warning")
+        )
+        serve_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        try:
+            results = await drive(args, service_port, images, model)
+            llm_stats = llm_registry.stats()
+        finally:
+            server.should_exit = True
+            await serve_task
+            model_server.should_exit = True
+            model_thread.join()
+
+    return report(args, results, model, llm_stats)
+
+
+def main() -> None:
+    # Raised by langchain for every structured output, not by the service
+    warnings.filterwarnings("ignore", message="Pydantic serializer warnings")
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--requests", type=int, default=100, help="Number of measured requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=0, help="Requests sent before measuring")
+    parser.add_argument("--mode", choices=["sync", "jobs"], default="sync")
+    parser.add_argument("--images", type=int, default=0,
+                        help="Distinct images to cycle through, 0 for one per request")
+    parser.add_argument("--image-size", type=int, default=1024, help="Edge of the images in pixels")
+    parser.add_argument("--timeout", type=float, default=300, help="Client timeout in seconds")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Service setting to override, may be repeated")
+    parser.add_argument("--json", metavar="PATH", help="Write the summary to this JSON file")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the service")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
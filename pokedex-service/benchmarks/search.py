@@ -0,0 +1,126 @@
+"""
+Benchmark of free-text creature search.
+
+Seeds a throwaway SQLite database with creatures, then compares searching
+for a few words with substring matches over every searchable column (the
+fallback used without the full-text index) against the FTS5 index:
+
+    python benchmarks/search.py --creatures 200000 --queries 50
+
+Substring matches scan and compare every row for every query, while the
+index looks up the matching rows and ranks them by relevance.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from fake_llm import percentiles
+
+WORDS = [
+    "amber", "brisk", "cinder", "dusk", "ember", "frost", "gale", "hollow", "ivory", "jade",
+    "kelp", "lumen", "moss", "nimbus", "onyx", "pebble", "quill", "rust", "sable", "thorn",
+]
+
+
+def seed(engine, count: int, rng: random.Random) -> None:
+    """
+    Insert count creatures with names and descriptions made of random words.
+    """
+    from pokedex.creature.enums import BodyShapeIcon
+    from pokedex.creature.models import Creature
+
+    def words(k: int) -> str:
+        return " ".join(rng.choice(WORDS) + str(rng.randrange(1000)) for _ in range(k))
+
+    rows = [
+        {
+            "name": f"{words(2)} {i}",
+            "scientific_name": words(2),
+            "description": words(30),
+            "gender_ratio": 0.5,
+            "kingdom": "Animalia",
+            "classification": rng.choice(["Mammal", "Bird", "Fish", "Reptile"]),
+            "family": words(1),
+            "height": rng.uniform(1, 500),
+            "weight": rng.uniform(0.1, 5000),
+            "body_shape": rng.choice(list(BodyShapeIcon)),
+            "image_path": f"/uploads/{i}.jpg",
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as connection:
+        for start in range(0, count, 10_000):
+            connection.execute(Creature.__table__.insert(), rows[start : start + 10_000])
+
+
+async def run_strategy(engine, strategy: str, queries: list[str]) -> dict:
+    from sqlmodel import Session
+
+    from pokedex.creature import service
+
+    latencies: list[float] = []
+    results = 0
+    # Without the index the service falls back to substring matches
+    service._has_search_index = lambda db_session: strategy == "fts"
+    with Session(engine) as session:
+        for q in queries:
+            started = time.perf_counter()
+            results += len((await service.search_creatures(session, q=q)).items)
+            latencies.append(time.perf_counter() - started)
+    return {"strategy": strategy, "latency": percentiles(latencies), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--creatures", type=int, default=200_000, help="Rows to seed")
+    parser.add_argument("--queries", type=int, default=50, help="Searches to run per strategy")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = [
+        " ".join(f"{rng.choice(WORDS)}{rng.randrange(1000)}" for _ in range(rng.randint(1, 2)))
+        for _ in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        os.environ.setdefault("MODEL_API_KEY", "benchmark")
+        os.environ.setdefault("IMAGE_MODEL_API_KEY", "benchmark")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+        from loguru import logger
+
+        import pokedex.creature.models  # noqa: F401 registers the tables
+        from pokedex.database import create_db_and_tables, engine
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        engine.echo = False
+        create_db_and_tables(engine)
+        seed(engine, args.creatures, rng)
+
+        results = [
+            asyncio.run(run_strategy(engine, strategy, queries)) for strategy in ("substring", "fts")
+        ]
+
+    print(f"\n{args.creatures} creatures, {args.queries} queries")
+    print(f"{'':<12}{'results':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for result in results:
+        stats = result["latency"]
+        print(
+            f"{result['strategy']:<12}{result['results']:>9}"
+            f"{stats['p50']:>9.4f}s{stats['p95']:>9.4f}s{stats['p99']:>9.4f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
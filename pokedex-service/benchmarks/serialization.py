@@ -0,0 +1,144 @@
+"""
+Benchmark of serializing large creature listings.
+
+Seeds a throwaway SQLite database with creatures, then serializes all of
+them in ID order three ways:
+
+    python benchmarks/serialization.py --creatures 100000
+
+- orm: Creature objects validated into CreaturePublic and dumped as one
+  JSON array, as the listings used to.
+- rows: plain rows of the public columns dumped as one JSON array with the
+  fast encoder (orjson when installed), as the listings do now.
+- ndjson: the same rows streamed in chunks as newline-delimited JSON.
+
+It reports rows per second, the time to the first byte and the peak memory
+traced while serializing. Peak memory is measured in a separate run, as
+tracing slows everything down.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from database import seed
+
+
+def run_orm(engine) -> tuple[int, float | None]:
+    from pydantic import TypeAdapter
+    from sqlmodel import Session
+
+    from pokedex.creature.models import Creature, CreaturePublic
+
+    adapter = TypeAdapter(list[CreaturePublic])
+    with Session(engine) as session:
+        creatures = session.query(Creature).order_by(Creature.id).all()
+        body = adapter.dump_json(adapter.validate_python(creatures, from_attributes=True))
+    return len(body), None
+
+
+def run_rows(engine) -> tuple[int, float | None]:
+    from sqlmodel import Session
+
+    from pokedex.creature.enums import CreatureSort
+    from pokedex.creature.fields import ALL_FIELDS, render_projection
+    from pokedex.creature.service import get_page
+
+    with Session(engine) as session:
+        page = get_page(session, CreatureSort.ID, fields=ALL_FIELDS)
+        body = render_projection(page.items, ALL_FIELDS)
+    return len(body), None
+
+
+def run_ndjson(engine, chunk_size: int) -> tuple[int, float | None]:
+    from pokedex.creature.fields import ALL_FIELDS, render_ndjson
+    from pokedex.creature.service import stream_creatures
+
+    async def consume() -> tuple[int, float | None]:
+        started = time.perf_counter()
+        first_byte = None
+        size = 0
+        async for chunk in stream_creatures(engine, fields=ALL_FIELDS, chunk_size=chunk_size):
+            size += len(render_ndjson(chunk, ALL_FIELDS))
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+        return size, first_byte
+
+    return asyncio.run(consume())
+
+
+def measure(name: str, run, count: int, repeat: int) -> dict:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size, first_byte = run()
+        durations.append(time.perf_counter() - started)
+    elapsed = min(durations)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "strategy": name,
+        "bytes": size,
+        "seconds": elapsed,
+        "rows_per_second": count / elapsed,
+        "first_byte": first_byte if first_byte is not None else elapsed,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--creatures", type=int, default=100_000, help="Rows to seed")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per NDJSON chunk")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per strategy, best kept")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        os.environ.setdefault("MODEL_API_KEY", "benchmark")
+        os.environ.setdefault("IMAGE_MODEL_API_KEY", "benchmark")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+        from loguru import logger
+
+        import pokedex.creature.models  # noqa: F401 registers the tables
+        from pokedex.creature.fields import orjson
+        from pokedex.database import create_db_and_tables, engine
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        engine.echo = False
+        create_db_and_tables(engine)
+        seed(engine, args.creatures)
+
+        results = [
+            measure("orm", lambda: run_orm(engine), args.creatures, args.repeat),
+            measure("rows", lambda: run_rows(engine), args.creatures, args.repeat),
+            measure(
+                "ndjson", lambda: run_ndjson(engine, args.chunk_size), args.creatures, args.repeat
+            ),
+        ]
+
+    encoder = "orjson" if orjson is not None else "pydantic"
+    print(f"\n{args.creatures} creatures, {encoder} encoder")
+    print(f"{'':<10}{'MiB out':>9}{'seconds':>10}{'rows/s':>11}{'1st byte':>10}{'peak MiB':>10}")
+    for result in results:
+        print(
+            f"{result['strategy']:<10}{result['bytes'] / 2**20:>9.1f}{result['seconds']:>10.3f}"
+            f"{result['rows_per_second']:>11.0f}{result['first_byte']:>9.4f}s{result['peak_mib']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import json
+import random
+
+import httpx
+from langchain_openai import ChatOpenAI
+import openai
+import pytest
+
+from fake_llm import FakeModelConfig, Latency, create_app, percentiles, request_key
+from pokedex.agent.explainer.schema import CreatureExplanation
+from pokedex.agent.scanner.schema import CreatureIdentification, CreatureName
+
+# Raised by langchain for every structured output
+pytestmark = pytest.mark.filterwarnings("ignore:Pydantic serializer warnings")
+
+
+def fake_llm(config: FakeModelConfig) -> tuple[ChatOpenAI, object]:
+    app = create_app(config)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    llm = ChatOpenAI(
+        model="gemma-3-local",
+        base_url="http://fake/v1",
+        api_key="benchmark",
+        http_async_client=client,
+        max_retries=0,
+    )
+    return llm, app.state.model
+
+
+def test_latency_parse():
+    """Test latency distributions are parsed and sampled within their bounds."""
+    assert Latency.parse("constant:0.5").sample(random.Random()) == 0.5
+    assert 0.2 <= Latency.parse("uniform:0.2,1").sample(random.Random()) <= 1
+    assert Latency.parse("replay").sample(random.Random(), recorded=1.5) == 1.5
+    with pytest.raises(ValueError):
+        Latency.parse("uniform:1")
+
+
+def test_percentiles():
+    """Test nearest-rank percentiles."""
+    stats = percentiles([float(value) for value in range(1, 101)])
+
+    assert stats["p50"] == 50
+    assert stats["p95"] == 95
+    assert stats["p99"] == 99
+    assert percentiles([]) == {"count": 0}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["json_schema", "function_calling"])
+async def test_structured_output(method):
+    """Test ChatOpenAI structured output is answered with valid objects."""
+    llm, model = fake_llm(FakeModelConfig(seed=1))
+
+    explanation = await llm.with_structured_output(CreatureExplanation, method=method).ainvoke("Lion")
+    identification = await llm.with_structured_output(CreatureIdentification, method=method).ainvoke("Lion")
+
+    assert isinstance(explanation, CreatureExplanation)
+    assert identification.is_creature
+    assert identification.confidence == 1.0
+    assert identification.name.startswith("Benchmark Creature")
+    assert model.stats()["schemas"]["CreatureExplanation"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_same_image_same_name():
+    """Test a request is always answered with the same creature name."""
+    llm, _ = fake_llm(FakeModelConfig(name_pool=0))
+    structured_llm = llm.with_structured_output(CreatureName)
+
+    first = await structured_llm.ainvoke("image one")
+    again = await structured_llm.ainvoke("image one")
+    other = await structured_llm.ainvoke("image two")
+
+    assert first.name == again.name
+    assert first.name != other.name
+
+
+@pytest.mark.asyncio
+async def test_error_injection():
+    """Test injected failures surface as API errors."""
+    llm, model = fake_llm(FakeModelConfig(error_rate=1.0, error_statuses=(503,)))
+
+    with pytest.raises(openai.InternalServerError):
+        await llm.with_structured_output(CreatureName).ainvoke("Lion")
+    assert model.stats()["errors"] == {"503": 1}
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    """Test recorded responses are replayed, matching the request first."""
+    body = {"model": "gemma-3-local", "messages": [{"role": "user", "content": "Lion"}]}
+    recorded = {
+        "key": request_key(body),
+        "schema": "text",
+        "model": "gemma-3-local",
+        "latency": 0.0,
+        "status": 200,
+        "response": {"choices": [{"message": {"role": "assistant", "content": "Recorded"}}]},
+    }
+    replay_path = tmp_path / "replay.jsonl"
+    replay_path.write_text(json.dumps(recorded) + "\n")
+    app = create_app(FakeModelConfig(replay_path=str(replay_path), latency=Latency("replay")))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake") as client:
+        response = await client.post("/v1/chat/completions", json=body)
+
+    assert response.json() == recorded["response"]
@@ -0,0 +1,139 @@
+"""
+Benchmark of exporting and importing the creature catalogue.
+
+Seeds a throwaway SQLite database with creatures and exports them as
+NDJSON, then empties the catalogue and loads the export back:
+
+    python benchmarks/transfer.py --creatures 100000
+
+- per-row: the first --sample rows validated and created one at a time,
+  each committed in its own transaction like identified creatures are,
+  extrapolated to the whole export.
+- bulk: the whole export imported in batches of executemany upserts, each
+  batch in one transaction.
+- bulk again: the same import over the loaded catalogue, where every row
+  matches an unchanged creature and is skipped rather than rewritten.
+
+Both paths run with the search, facet and version triggers of the real
+schema. Compare batch sizes with --batch-size.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from database import seed
+
+# Seeded creatures reference their images there, see database.seed
+UPLOAD_DIR = "/uploads"
+
+
+async def export(engine, path: str, chunk_size: int) -> float:
+    from pokedex.creature.enums import TransferFormat
+    from pokedex.creature.transfer import export_catalogue
+
+    started = time.perf_counter()
+    with open(path, "wb") as f:
+        async for chunk in export_catalogue(engine, TransferFormat.NDJSON, UPLOAD_DIR, chunk_size):
+            f.write(chunk)
+    return time.perf_counter() - started
+
+
+def run_per_row(engine, path: str, sample: int) -> float:
+    from sqlmodel import Session
+
+    from pokedex.creature.models import CreatureCreate, ImageMetadata
+    from pokedex.creature.service import create
+    from pokedex.creature.transfer import local_path
+
+    started = time.perf_counter()
+    with open(path, "rb") as f, Session(engine) as session:
+        for _, line in zip(range(sample), f):
+            creature = CreatureCreate.model_validate_json(line)
+            creature.image_path = local_path(creature.image_path, UPLOAD_DIR)
+            create(session, creature, phash=0, image=ImageMetadata())
+    return time.perf_counter() - started
+
+
+async def run_bulk(engine, path: str, batch_size: int) -> tuple[float, int]:
+    from pokedex.creature.enums import TransferFormat
+    from pokedex.creature.transfer import import_catalogue
+
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        async for progress in import_catalogue(
+            engine, f, TransferFormat.NDJSON, UPLOAD_DIR, batch_size
+        ):
+            pass
+    return time.perf_counter() - started, progress.imported
+
+
+def empty(engine) -> None:
+    from pokedex.creature.models import Creature
+
+    with engine.begin() as connection:
+        connection.execute(Creature.__table__.delete())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--creatures", type=int, default=100_000, help="Rows to seed")
+    parser.add_argument("--sample", type=int, default=2_000,
+                        help="Rows created one at a time to time the per-row path")
+    parser.add_argument("--batch-size", type=int, default=1_000,
+                        help="Rows per bulk import transaction")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per export chunk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pokedex-benchmark-") as directory:
+        os.environ.setdefault("MODEL_API_KEY", "benchmark")
+        os.environ.setdefault("IMAGE_MODEL_API_KEY", "benchmark")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        os.environ["IMAGE_INDEX_ENABLED"] = "false"
+
+        from loguru import logger
+
+        import pokedex.creature.models  # noqa: F401 registers the tables
+        from pokedex.database import create_db_and_tables, engine
+
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        engine.echo = False
+        create_db_and_tables(engine)
+        seed(engine, args.creatures)
+
+        path = os.path.join(directory, "creatures.ndjson")
+        export_seconds = asyncio.run(export(engine, path, args.chunk_size))
+        size = os.path.getsize(path)
+        empty(engine)
+
+        sample = min(args.sample, args.creatures)
+        per_row_seconds = run_per_row(engine, path, sample)
+        empty(engine)
+
+        bulk_seconds, imported = asyncio.run(run_bulk(engine, path, args.batch_size))
+        again_seconds, _ = asyncio.run(run_bulk(engine, path, args.batch_size))
+
+    per_row_total = per_row_seconds / sample * args.creatures
+    print(f"\n{args.creatures} creatures, {size / 2**20:.1f} MiB of NDJSON, batches of {args.batch_size}")
+    print(f"{'':<12}{'rows':>9}{'seconds':>10}{'rows/s':>11}{'est. total':>12}")
+    rows = [
+        ("export", args.creatures, export_seconds),
+        ("per-row", sample, per_row_seconds),
+        ("bulk", imported, bulk_seconds),
+        ("bulk again", imported, again_seconds),
+    ]
+    for name, count, seconds in rows:
+        total = per_row_total if name == "per-row" else seconds
+        print(f"{name:<12}{count:>9}{seconds:>10.2f}{count / seconds:>11.0f}{total:>11.1f}s")
+
+
+if __name__ == "__main__":
+    main()
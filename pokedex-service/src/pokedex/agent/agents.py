@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 from langgraph.graph.state import CompiledStateGraph
 
-from pokedex.agent.scanner.agent import scanner_agent
+from pokedex.agent.scanner.agent import fused_scanner_agent, scanner_agent
 from pokedex.agent.explainer.agent import explainer_agent
 
 
@@ -17,6 +17,10 @@ agents: dict[str, Agent] = {
         description="A scanner agent which identifies the creature (if present) from the image",
         graph=scanner_agent,
     ),
+    "fused-scanner-agent": Agent(
+        description="A scanner agent which identifies and verifies the creature (if present) in a single image call",
+        graph=fused_scanner_agent,
+    ),
     "explainer-agent": Agent(
         description="A explainer agent which gives a detailed explanation of the creature",
         graph=explainer_agent,
@@ -2,12 +2,13 @@ from langgraph.graph import StateGraph
 
 from pokedex.agent.explainer.schema import ExplainerState
 from pokedex.agent.explainer.nodes import explain_creature
+from pokedex.monitoring.metrics import timed_node
 
 
 # Define the graph
 graph = StateGraph(ExplainerState)
 graph.add_node(
-    "explain_creature", explain_creature
+    "explain_creature", timed_node("explainer-agent", explain_creature)
 )  # TODO consider adding a wiki search tool
 
 graph.set_entry_point("explain_creature")
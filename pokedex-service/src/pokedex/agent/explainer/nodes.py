@@ -3,6 +3,7 @@ from langchain_core.language_models import BaseChatModel
 from loguru import logger
 
 from pokedex.agent.explainer.schema import ExplainerState, CreatureExplanation
+from pokedex.llm import call_llm
 
 
 async def explain_creature(
@@ -16,7 +17,9 @@ Include its scientific name, description, gender ratio, kingdom, classification,
 Provide the explanation as accurate as possible based on the constraints specified.
 """
 
-    response: CreatureExplanation = await structured_llm.ainvoke(prompt)
+    response: CreatureExplanation = await call_llm(
+        config, "llm", lambda: structured_llm.ainvoke(prompt)
+    )
 
     logger.debug(f"Creature explanation: {response}")
 
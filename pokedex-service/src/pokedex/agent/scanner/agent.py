@@ -1,16 +1,29 @@
 from langgraph.graph import StateGraph
 
 from pokedex.agent.scanner.schema import ScannerState
-from pokedex.agent.scanner.nodes import analyze_image, verify_creature
+from pokedex.agent.scanner.nodes import analyze_image, identify_creature, verify_creature
+from pokedex.monitoring.metrics import timed_node
 
 
 # Define the graph
 graph = StateGraph(ScannerState)
-graph.add_node("analyze_image", analyze_image)
-graph.add_node("verify_creature", verify_creature)
+graph.add_node("analyze_image", timed_node("scanner-agent", analyze_image))
+graph.add_node("verify_creature", timed_node("scanner-agent", verify_creature))
 
 graph.set_entry_point("analyze_image")
 graph.add_edge("analyze_image", "verify_creature")
 graph.set_finish_point("verify_creature")
 
 scanner_agent = graph.compile()
+
+
+# Fused graph answering identification and verification in a single vision call
+fused_graph = StateGraph(ScannerState)
+fused_graph.add_node(
+    "identify_creature", timed_node("fused-scanner-agent", identify_creature)
+)
+
+fused_graph.set_entry_point("identify_creature")
+fused_graph.set_finish_point("identify_creature")
+
+fused_scanner_agent = fused_graph.compile()
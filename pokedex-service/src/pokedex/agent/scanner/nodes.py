@@ -1,3 +1,4 @@
+import asyncio
 import base64
 
 from langchain_core.language_models import BaseChatModel
@@ -5,22 +6,37 @@ from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import HumanMessage
 from loguru import logger
 
-from pokedex.agent.scanner.schema import CreatureName, ScannerState, IsCreatureState
-
+from pokedex.config import get_settings
+from pokedex.image.processing import normalize_image
+from pokedex.llm import call_llm
+from pokedex.monitoring.metrics import IMAGE_BYTES
+from pokedex.agent.scanner.schema import (
+    CreatureIdentification,
+    CreatureName,
+    ScannerState,
+    IsCreatureState,
+)
+
+
+async def prepare_image(image: bytes) -> tuple[bytes, str]:
+    settings = get_settings()
+
+    # Decoding and re-encoding is CPU bound, keep it off the event loop
+    image_data, mime_type = await asyncio.to_thread(
+        normalize_image,
+        image,
+        max_edge=settings.image_max_edge,
+        format=settings.image_format,
+        quality=settings.image_quality,
+    )
+    IMAGE_BYTES.labels("model_input").observe(len(image_data))
+    return image_data, mime_type
 
-async def analyze_image(state: ScannerState, config: RunnableConfig) -> ScannerState:
-    image = state.image
-    if not image:
-        raise ValueError("No image provided")
 
+def build_image_message(prompt: str, image: bytes, mime_type: str) -> HumanMessage:
     base64_image = base64.b64encode(image).decode("utf-8")
 
-    prompt = """
-    You are an expert zoologist. Look at the image and identify the creature shown. 
-    If the image contains a clearly visible animal or living being, respond with its common name, such as "African Lion", "Red Kangaroo", or "Chimpanzee".
-    """
-
-    message = HumanMessage(
+    return HumanMessage(
         content=[
             {
                 "type": "text",
@@ -29,17 +45,33 @@ async def analyze_image(state: ScannerState, config: RunnableConfig) -> ScannerS
             {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/png;base64,{base64_image}",
+                    "url": f"data:{mime_type};base64,{base64_image}",
                 },
             },
         ]
     )
 
+
+async def analyze_image(state: ScannerState, config: RunnableConfig) -> ScannerState:
+    image = state.image
+    if not image:
+        raise ValueError("No image provided")
+
+    prompt = """
+    You are an expert zoologist. Look at the image and identify the creature shown. 
+    If the image contains a clearly visible animal or living being, respond with its common name, such as "African Lion", "Red Kangaroo", or "Chimpanzee".
+    """
+
+    image_data, mime_type = await prepare_image(image)
+    message = build_image_message(prompt, image_data, mime_type)
+
     llm: BaseChatModel = config["configurable"].get("image_llm")
     structured_llm = llm.with_structured_output(CreatureName)
 
     logger.debug("Sending image to LLM...")
-    response: CreatureName = await structured_llm.ainvoke([message])
+    response: CreatureName = await call_llm(
+        config, "image_llm", lambda: structured_llm.ainvoke([message])
+    )
 
     logger.debug(f"LLM response: {response}")
 
@@ -55,10 +87,44 @@ async def verify_creature(state: ScannerState, config: RunnableConfig) -> Scanne
     structured_llm = llm.with_structured_output(IsCreatureState)
 
     logger.debug(f"Verifying creature {creature_name} with LLM...")
-    response: IsCreatureState = await structured_llm.ainvoke(prompt)
+    response: IsCreatureState = await call_llm(
+        config, "llm", lambda: structured_llm.ainvoke(prompt)
+    )
     logger.debug(f"LLM verification response: {response}")
 
     if not response.is_creature:
         state.creature_name = None
 
     return state
+
+
+async def identify_creature(state: ScannerState, config: RunnableConfig) -> ScannerState:
+    image = state.image
+    if not image:
+        raise ValueError("No image provided")
+
+    prompt = """
+    You are an expert zoologist. Look at the image and decide whether it shows a clearly visible animal or sea creature.
+    If it does, set is_creature to true and respond with its common name, such as "African Lion", "Red Kangaroo", or "Chimpanzee".
+    If it does not, set is_creature to false and leave the name empty.
+    Also give your confidence in the answer between 0.0 and 1.0.
+    """
+
+    image_data, mime_type = await prepare_image(image)
+    message = build_image_message(prompt, image_data, mime_type)
+
+    llm: BaseChatModel = config["configurable"].get("image_llm")
+    structured_llm = llm.with_structured_output(CreatureIdentification)
+
+    logger.debug("Sending image to LLM for fused identification...")
+    response: CreatureIdentification = await call_llm(
+        config, "image_llm", lambda: structured_llm.ainvoke([message])
+    )
+
+    logger.debug(f"LLM response: {response}")
+
+    min_confidence = get_settings().fused_scan_min_confidence
+    if not response.is_creature or not response.name or response.confidence < min_confidence:
+        return {"creature_name": None, "image": image}
+
+    return {"creature_name": response.name, "image": image}
@@ -15,3 +15,17 @@ class IsCreatureState(BaseModel):
     is_creature: bool = Field(
         description="Indicates if the identified object is an animal/sea creature or not."
     )
+
+class CreatureIdentification(BaseModel):
+    name: str | None = Field(
+        default=None,
+        description="The common name of the creature identified from the image, if any."
+    )
+    is_creature: bool = Field(
+        description="Indicates if the image shows an animal/sea creature or not."
+    )
+    confidence: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Confidence of the identification, between 0.0 and 1.0."
+    )
@@ -0,0 +1,120 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from pokedex.agent.scanner.agent import fused_scanner_agent
+from pokedex.agent.scanner.nodes import identify_creature
+from pokedex.agent.scanner.schema import CreatureIdentification, ScannerState
+
+
+def mock_image_llm(response: CreatureIdentification):
+    structured_llm = Mock()
+    structured_llm.ainvoke = AsyncMock(return_value=response)
+    llm = Mock()
+    llm.with_structured_output.return_value = structured_llm
+    return llm
+
+
+@pytest.fixture
+def mock_min_confidence(mocker):
+    settings = mocker.patch("pokedex.agent.scanner.nodes.get_settings").return_value
+    settings.fused_scan_min_confidence = 0.5
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_identify_creature(mock_min_confidence):
+    """Test a confident creature identification returns its name."""
+    llm = mock_image_llm(
+        CreatureIdentification(name="African Lion", is_creature=True, confidence=0.9)
+    )
+
+    result = await identify_creature(
+        ScannerState(image=b"fake"), {"configurable": {"image_llm": llm}}
+    )
+
+    assert result["creature_name"] == "African Lion"
+    llm.with_structured_output.assert_called_once_with(CreatureIdentification)
+
+
+@pytest.mark.asyncio
+async def test_identify_creature_not_a_creature(mock_min_confidence):
+    """Test an image without a creature returns no name."""
+    llm = mock_image_llm(
+        CreatureIdentification(name="Teapot", is_creature=False, confidence=0.9)
+    )
+
+    result = await identify_creature(
+        ScannerState(image=b"fake"), {"configurable": {"image_llm": llm}}
+    )
+
+    assert result["creature_name"] is None
+
+
+@pytest.mark.asyncio
+async def test_identify_creature_empty_name(mock_min_confidence):
+    """Test a creature verdict without a name returns no name."""
+    llm = mock_image_llm(CreatureIdentification(name="", is_creature=True, confidence=0.9))
+
+    result = await identify_creature(
+        ScannerState(image=b"fake"), {"configurable": {"image_llm": llm}}
+    )
+
+    assert result["creature_name"] is None
+
+
+@pytest.mark.asyncio
+async def test_identify_creature_low_confidence(mock_min_confidence):
+    """Test an identification below the confidence threshold returns no name."""
+    llm = mock_image_llm(
+        CreatureIdentification(name="African Lion", is_creature=True, confidence=0.4)
+    )
+
+    result = await identify_creature(
+        ScannerState(image=b"fake"), {"configurable": {"image_llm": llm}}
+    )
+
+    assert result["creature_name"] is None
+
+
+@pytest.mark.asyncio
+async def test_identify_creature_no_image(mock_min_confidence):
+    """Test identify_creature rejects an empty image."""
+    with pytest.raises(ValueError):
+        await identify_creature(ScannerState(image=b""), {"configurable": {}})
+
+
+@pytest.mark.asyncio
+async def test_fused_scanner_agent(mock_min_confidence):
+    """Test the fused graph makes a single image call and no text call."""
+    image_llm = mock_image_llm(
+        CreatureIdentification(name="African Lion", is_creature=True, confidence=0.9)
+    )
+    llm = Mock()
+
+    result = await fused_scanner_agent.ainvoke(
+        {"image": b"fake"}, {"configurable": {"image_llm": image_llm, "llm": llm}}
+    )
+
+    assert result["creature_name"] == "African Lion"
+    image_llm.with_structured_output.return_value.ainvoke.assert_awaited_once()
+    llm.with_structured_output.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_identify_creature_sends_normalized_image(mocker, mock_min_confidence):
+    """Test the image is normalized and labelled with its real MIME type."""
+    mock_normalize = mocker.patch(
+        "pokedex.agent.scanner.nodes.normalize_image",
+        return_value=(b"small", "image/webp"),
+    )
+    llm = mock_image_llm(
+        CreatureIdentification(name="African Lion", is_creature=True, confidence=0.9)
+    )
+
+    await identify_creature(ScannerState(image=b"large"), {"configurable": {"image_llm": llm}})
+
+    mock_normalize.assert_called_once()
+    assert mock_normalize.call_args.args == (b"large",)
+    message = llm.with_structured_output.return_value.ainvoke.await_args.args[0][0]
+    assert message.content[1]["image_url"]["url"] == "data:image/webp;base64,c21hbGw="
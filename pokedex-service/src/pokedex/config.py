@@ -1,5 +1,6 @@
 from functools import lru_cache
 import os
+from typing import Literal
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -29,6 +30,110 @@ class Settings(BaseSettings):
     image_model_endpoint: str | None = None
     image_model_api_key: SecretStr
 
+    # HTTP connection pooling and concurrency limits of the LLM endpoints
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30
+    llm_timeout_seconds: float = 120
+    llm_connect_timeout_seconds: float = 10
+    llm_http2: bool = False
+    llm_max_concurrency: int = 4
+    llm_model_concurrency: dict[str, int] = {}
+
+    # Resilience of the LLM endpoints: adaptive concurrency, retries and circuit breaking
+    llm_adaptive_min_concurrency: int = 1
+    llm_latency_target_seconds: float = 30
+    llm_retry_attempts: int = 3
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_retry_max_delay_seconds: float = 8
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_recovery_seconds: float = 30
+
+    # Threads running blocking database work off the event loop
+    db_executor_workers: int = 4
+
+    # Database engine: SQL logging, connection pool and SQLite tuning pragmas
+    db_echo: bool = False
+    db_pool_size: int = 8
+    db_max_overflow: int = 8
+    db_pool_timeout_seconds: float = 30
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Negative values are in KiB, positive values in pages
+    sqlite_cache_size: int = -64 * 1024
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+
+    # Page size of the creature listings, when not requested, and the largest allowed
+    page_size: int = 100
+    max_page_size: int = 500
+    # Rows read from the database at a time when streaming listings as NDJSON
+    stream_chunk_size: int = 500
+
+    # Catalogue imports: rows validated and written per transaction, and the
+    # largest accepted export or image tarball
+    import_batch_size: int = 1000
+    max_transfer_bytes: int = 1024 * 1024 * 1024
+
+    # Largest accepted image upload
+    max_upload_bytes: int = 20 * 1024 * 1024
+
+    # Removal of stored images no longer referenced by any creature
+    image_gc_interval_seconds: int = 60 * 60
+    image_gc_grace_seconds: int = 60 * 60
+
+    # Resized variants of creature images served with immutable caching
+    derivative_dir: str = "/derivatives"
+    thumbnail_max_edge: int = 256
+    medium_max_edge: int = 768
+    derivative_format: Literal["JPEG", "PNG", "WEBP"] = "WEBP"
+    derivative_quality: int = 80
+
+    # Scan result cache (keyed by the SHA-256 of the uploaded image)
+    scan_cache_enabled: bool = True
+    scan_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    scan_cache_negative_ttl_seconds: int = 60 * 60
+    scan_cache_max_entries: int = 10_000
+    scan_cache_touch_interval_seconds: int = 60
+    scan_cache_evict_interval_seconds: int = 60
+
+    # Rendered catalogue reads, valid until the next write to the catalogue
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 256
+
+    # Near-duplicate lookup over stored creature images (perceptual hash)
+    image_index_enabled: bool = True
+    image_index_max_distance: int = 6
+
+    # Preprocessing of images sent to the vision model
+    image_max_edge: int = 1024
+    image_format: Literal["JPEG", "PNG", "WEBP"] = "JPEG"
+    image_quality: int = 85
+
+    # Identify and verify the creature in a single vision call instead of two calls
+    fused_scan: bool = False
+    fused_scan_min_confidence: float = 0.5
+
+    # Background identify jobs
+    job_workers: int = 2
+    job_max_queued: int = 100
+    job_spool_dir: str = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../jobs'))
+    # Running jobs hold a lease renewed while they run; jobs whose lease
+    # expired (their process died) are picked up again by any process
+    job_lease_seconds: int = 60
+    # Finished jobs are deleted after the retention period
+    job_retention_seconds: int = 7 * 24 * 60 * 60
+    # Keepalive comments sent on job event streams while nothing changes
+    job_events_heartbeat_seconds: int = 15
+
+    # Batch identification
+    batch_max_images: int = 500
+    batch_max_concurrency: int = 4
+
+    # Start the explainer for unknown creatures while the scan is still being verified
+    speculative_explain: bool = False
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
 
 from pokedex.main import app
 from pokedex.config import get_settings
@@ -28,3 +29,22 @@ def mock_db_session(mocker):
     session.query = mocker.Mock()
     session.get = mocker.Mock()
     return session
+
+
+@pytest.fixture
+def db_engine():
+    """Fixture to provide an engine on a fresh in-memory database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Fixture to provide a session on a fresh in-memory database."""
+    with Session(db_engine) as session:
+        yield session
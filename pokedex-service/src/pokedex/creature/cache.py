@@ -0,0 +1,175 @@
+import time
+
+from loguru import logger
+from sqlalchemy import delete as sql_delete, func, select
+from sqlalchemy.orm import Session
+
+from pokedex.config import get_settings
+from pokedex.creature.models import Creature, ScanCacheEntry
+from pokedex.monitoring.metrics import CACHE_LOOKUPS
+
+
+class ScanCache:
+    """
+    Persistent cache mapping image content hashes to scan verdicts.
+    Entries expire after a TTL and the least recently used ones are evicted
+    once the cache grows beyond max_entries. Access times are only written
+    back once per touch interval so repeat hits stay read-only, and
+    eviction runs at most once per evict interval, so the cache may exceed
+    max_entries by the entries stored in between.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: float = 7 * 24 * 60 * 60,
+        negative_ttl_seconds: float = 60 * 60,
+        max_entries: int = 10_000,
+        touch_interval_seconds: float = 60,
+        evict_interval_seconds: float = 60,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+        self.evict_interval_seconds = evict_interval_seconds
+        self._evicted_at: float | None = None
+
+    def _is_expired(self, entry: ScanCacheEntry, now: float) -> bool:
+        ttl = self.ttl_seconds if entry.creature_id is not None else self.negative_ttl_seconds
+        return now - entry.created_at > ttl
+
+    def lookup(self, db_session: Session, image_hash: str) -> ScanCacheEntry | None:
+        """
+        Look up the cached verdict for an image.
+
+        Args:
+            db_session (Session): Database session
+            image_hash (str): Content hash of the image
+
+        Returns:
+            ScanCacheEntry | None: The cached verdict or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        entry = db_session.get(ScanCacheEntry, image_hash)
+
+        stale = entry is not None and (
+            self._is_expired(entry, now)
+            or (
+                entry.creature_id is not None
+                and db_session.get(Creature, entry.creature_id) is None
+            )
+        )
+        if stale:
+            db_session.delete(entry)
+            db_session.commit()
+            entry = None
+
+        if entry is None:
+            CACHE_LOOKUPS.labels("scan", "miss").inc()
+            return None
+
+        if now - entry.accessed_at >= self.touch_interval_seconds:
+            entry.accessed_at = now
+            db_session.commit()
+        CACHE_LOOKUPS.labels("scan", "hit").inc()
+        logger.debug(f"Scan cache hit for image {image_hash}")
+        return entry
+
+    def store(self, db_session: Session, image_hash: str, creature_id: int | None) -> None:
+        """
+        Record the verdict for an image, evicting old entries when the
+        evict interval has passed.
+
+        Args:
+            db_session (Session): Database session
+            image_hash (str): Content hash of the image
+            creature_id (int | None): The identified creature, or None if no creature was found
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        db_session.merge(
+            ScanCacheEntry(
+                image_hash=image_hash,
+                creature_id=creature_id,
+                created_at=now,
+                accessed_at=now,
+            )
+        )
+        try:
+            db_session.commit()
+            if self._evicted_at is None or now - self._evicted_at >= self.evict_interval_seconds:
+                self.evict(db_session)
+        except Exception:
+            logger.error("Failed to store scan cache entry")
+            db_session.rollback()
+
+    def evict(self, db_session: Session) -> None:
+        """
+        Remove expired entries and trim the cache down to max_entries,
+        dropping the least recently used entries first.
+
+        Args:
+            db_session (Session): Database session
+        """
+        now = time.time()
+        self._evicted_at = now
+        db_session.execute(
+            sql_delete(ScanCacheEntry).where(
+                (ScanCacheEntry.created_at < now - self.ttl_seconds)
+                | (
+                    ScanCacheEntry.creature_id.is_(None)
+                    & (ScanCacheEntry.created_at < now - self.negative_ttl_seconds)
+                )
+            )
+        )
+
+        count = db_session.scalar(select(func.count()).select_from(ScanCacheEntry))
+        overflow = count - self.max_entries
+        if overflow > 0:
+            oldest = (
+                select(ScanCacheEntry.image_hash)
+                .order_by(ScanCacheEntry.accessed_at)
+                .limit(overflow)
+            )
+            db_session.execute(
+                sql_delete(ScanCacheEntry).where(ScanCacheEntry.image_hash.in_(oldest))
+            )
+        db_session.commit()
+
+    def invalidate_creature(self, db_session: Session, creature_id: int) -> None:
+        """
+        Drop every cached verdict pointing at a creature.
+        The caller is responsible for committing the session.
+
+        Args:
+            db_session (Session): Database session
+            creature_id (int): The ID of the creature
+        """
+        db_session.execute(
+            sql_delete(ScanCacheEntry).where(ScanCacheEntry.creature_id == creature_id)
+        )
+
+
+def create_scan_cache() -> ScanCache:
+    """
+    Returns a scan cache configured from the application settings.
+    """
+    settings = get_settings()
+    return ScanCache(
+        enabled=settings.scan_cache_enabled,
+        ttl_seconds=settings.scan_cache_ttl_seconds,
+        negative_ttl_seconds=settings.scan_cache_negative_ttl_seconds,
+        max_entries=settings.scan_cache_max_entries,
+        touch_interval_seconds=settings.scan_cache_touch_interval_seconds,
+        evict_interval_seconds=settings.scan_cache_evict_interval_seconds,
+    )
+
+
+scan_cache = create_scan_cache()
@@ -0,0 +1,29 @@
+import pytest
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.models import Creature
+
+
+@pytest.fixture
+def make_creature():
+    """Fixture to provide a factory of creatures, every field but the name defaulted."""
+
+    def make(name: str, **fields) -> Creature:
+        return Creature(
+            **{
+                "name": name,
+                "scientific_name": "Panthera leo",
+                "description": "A large cat.",
+                "gender_ratio": 0.5,
+                "kingdom": "Animalia",
+                "classification": "Mammal",
+                "family": "Felidae",
+                "height": 120.0,
+                "weight": 190.0,
+                "body_shape": BodyShapeIcon.QUADRUPED,
+                "image_path": f"/uploads/{name}.jpg",
+                **fields,
+            }
+        )
+
+    return make
@@ -1,4 +1,13 @@
-from fastapi import UploadFile, HTTPException
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import Depends, Request, Response, UploadFile, HTTPException
+from fastapi.routing import APIRoute
+
+from pokedex.config import Settings, get_settings
+
+# Room left in request bodies for the multipart framing around the files
+MULTIPART_OVERHEAD = 64 * 1024
 
 
 async def validate_image(image: UploadFile) -> UploadFile:
@@ -20,3 +29,135 @@ async def validate_image(image: UploadFile) -> UploadFile:
             detail=f"File must be an image. Received content-type: {image.content_type}",
         )
     return image
+
+
+async def validate_images(
+    images: list[UploadFile],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> list[UploadFile]:
+    """
+    Dependency to validate a batch of uploaded images.
+
+    Args:
+        images: The uploaded files to validate
+        settings: Application settings
+
+    Returns:
+        list[UploadFile]: The validated image files
+
+    Raises:
+        HTTPException: If the batch is too large or a file is not an image
+    """
+    if len(images) > settings.batch_max_images:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many images. At most {settings.batch_max_images} images can be identified at once.",
+        )
+    for image in images:
+        await validate_image(image)
+    return images
+
+
+def search_filters(
+    q: str = None,
+    id: int = None,
+    name: str = None,
+    scientific_name: str = None,
+    kingdom: str = None,
+    classification: str = None,
+    family: str = None,
+    body_shape: str = None,
+    height_min: float = None,
+    height_max: float = None,
+    weight_min: float = None,
+    weight_max: float = None,
+    gender_ratio_min: float = None,
+    gender_ratio_max: float = None,
+) -> dict[str, Any]:
+    """
+    Dependency collecting the creature filters shared by the search and
+    facets endpoints.
+
+    Args:
+        q: Free-text query over name, scientific name, family and description.
+            Words match as prefixes
+        id: Filter by creature ID
+        name: Filter by creature name (partial match)
+        scientific_name: Filter by scientific name (partial match)
+        kingdom: Filter by kingdom (exact match, ignoring case)
+        classification: Filter by classification (exact match, ignoring case)
+        family: Filter by family (exact match, ignoring case)
+        body_shape: Filter by body shape, as QUADRUPED, bsi:quadruped or quadruped
+        height_min: Minimum height filter
+        height_max: Maximum height filter
+        weight_min: Minimum weight filter
+        weight_max: Maximum weight filter
+        gender_ratio_min: Minimum gender ratio filter
+        gender_ratio_max: Maximum gender ratio filter
+
+    Returns:
+        dict[str, Any]: The filters, as keyword arguments of search_creatures
+    """
+    return dict(locals())
+
+
+SearchFilters = Annotated[dict[str, Any], Depends(search_filters)]
+
+
+def limit_body(max_size: Callable[[Settings], int]) -> Callable:
+    """
+    Decorator limiting the request body of an endpoint to max_size(settings)
+    bytes plus the multipart framing. Dependencies only run once the form has
+    been parsed, and Starlette spools every uploaded file to disk to parse
+    it, so the limit is enforced by LimitedBodyRoute before that.
+
+    Args:
+        max_size: Returns the largest accepted upload from the settings
+
+    Returns:
+        Callable: Decorator for the endpoint
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.max_body_size = max_size
+        return endpoint
+
+    return decorator
+
+
+class LimitedBodyRoute(APIRoute):
+    """
+    Route rejecting request bodies larger than allowed by limit_body with
+    413: up front from their Content-Length, or as soon as more has been
+    received for chunked requests.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        max_size = getattr(self.endpoint, "max_body_size", None)
+        if max_size is None:
+            return handler
+
+        async def limited_handler(request: Request) -> Response:
+            limit = max_size(get_settings()) + MULTIPART_OVERHEAD
+            too_large = HTTPException(
+                status_code=413,
+                detail=f"Request is too large. The maximum size is {limit} bytes.",
+            )
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                raise too_large
+
+            received = 0
+
+            async def receive():
+                nonlocal received
+                message = await request.receive()
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise too_large
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
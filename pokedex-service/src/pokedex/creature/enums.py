@@ -15,3 +15,44 @@ class BodyShapeIcon(Enum):
     HEAD = "bsi:head"
     HEAD_BASE = "bsi:head-base"
     HEAD_LEGS = "bsi:head-legs"
+
+    @classmethod
+    def lookup(cls, value: str) -> "BodyShapeIcon | None":
+        """
+        Returns the body shape given by its name (QUADRUPED), its icon name
+        (bsi:quadruped) or the icon name without prefix, ignoring case.
+        """
+        key = value.strip().lower().removeprefix("bsi:").replace("_", "-")
+        for shape in cls:
+            if shape.value == f"bsi:{key}":
+                return shape
+        return None
+
+
+class IdentifyStage(Enum):
+    """Stages an identification goes through"""
+
+    SCANNING = "scanning"
+    VERIFYING = "verifying"
+    EXPLAINING = "explaining"
+    SAVING = "saving"
+
+
+class CreatureSort(Enum):
+    """Sort orders of creature listings, a leading "-" sorting descending"""
+
+    ID = "id"
+    ID_DESC = "-id"
+    NAME = "name"
+    NAME_DESC = "-name"
+    HEIGHT = "height"
+    HEIGHT_DESC = "-height"
+    WEIGHT = "weight"
+    WEIGHT_DESC = "-weight"
+
+
+class TransferFormat(Enum):
+    """Formats of catalogue exports and imports"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -0,0 +1,226 @@
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import ColumnElement, Connection, Engine, case, func, literal, literal_column, select, text
+from sqlalchemy.orm import Query, Session
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.models import (
+    Creature,
+    CreatureFacet,
+    CreatureFacets,
+    FacetCount,
+    HistogramBucket,
+    NumericFacet,
+)
+
+# Columns counted per distinct value
+TERM_FACETS = ("kingdom", "classification", "family", "body_shape")
+
+# Columns counted per bucket, with the lower edges of their buckets. Values
+# below the first edge fall in an open bucket, as do values from the last.
+HISTOGRAM_EDGES = {
+    # Centimeters
+    "height": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000),
+    # Kilograms
+    "weight": (0.01, 0.1, 1, 10, 100, 1000, 10000),
+    # Males per female
+    "gender_ratio": (0.25, 0.5, 0.75, 1, 1.5, 2, 4),
+}
+
+FACETS = (*TERM_FACETS, *HISTOGRAM_EDGES)
+
+_summary = CreatureFacet.__tablename__
+
+
+def facet_value(name: str, column: Any) -> ColumnElement:
+    """
+    Returns the value a creature is counted under for a facet: the column
+    itself for terms, the index of its bucket for histograms.
+
+    Args:
+        name (str): Name of the facet
+        column: The creature column, or a column of a trigger row
+
+    Returns:
+        ColumnElement: The facet value, as text
+    """
+    edges = HISTOGRAM_EDGES.get(name)
+    if edges is None:
+        return column
+    return case(
+        *((column < edge, literal(str(index))) for index, edge in enumerate(edges)),
+        else_=literal(str(len(edges))),
+    )
+
+
+def _trigger_value(connection: Connection, name: str, row: str) -> str:
+    value = facet_value(name, literal_column(f"{row}.{name}"))
+    return str(value.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _facet_ddl(connection: Connection) -> list[str]:
+    """
+    Returns the triggers applying every write to the creature table to the
+    facet counts, in the same transaction as the write.
+    """
+    add = " ".join(
+        f"INSERT INTO {_summary} (facet, value, count) "
+        f"VALUES ('{name}', {_trigger_value(connection, name, 'new')}, 1) "
+        "ON CONFLICT (facet, value) DO UPDATE SET count = count + 1;"
+        for name in FACETS
+    )
+    remove = " ".join(
+        f"UPDATE {_summary} SET count = count - 1 "
+        f"WHERE facet = '{name}' AND value = {_trigger_value(connection, name, 'old')};"
+        for name in FACETS
+    )
+    prune = f"DELETE FROM {_summary} WHERE count <= 0;"
+    return [
+        f"CREATE TRIGGER creature_facets_insert AFTER INSERT ON creature BEGIN {add} END",
+        f"CREATE TRIGGER creature_facets_delete AFTER DELETE ON creature BEGIN {remove} {prune} END",
+        f"CREATE TRIGGER creature_facets_update AFTER UPDATE OF {', '.join(FACETS)} "
+        f"ON creature BEGIN {remove} {add} {prune} END",
+    ]
+
+
+def create_facet_summary(engine: Engine) -> bool:
+    """
+    Create the triggers keeping the facet counts of the catalogue up to date
+    and count the existing creatures. Both are redone on every start, so
+    changes to the histogram buckets apply to databases counted before.
+    Only SQLite is supported; other databases count facets on every request.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        bool: Whether the facet counts are maintained
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as connection:
+        for event in ("insert", "update", "delete"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS creature_facets_{event}"))
+        for statement in _facet_ddl(connection):
+            connection.execute(text(statement))
+
+        logger.info("Counting creature facets")
+        connection.execute(CreatureFacet.__table__.delete())
+        for name in FACETS:
+            value = facet_value(name, getattr(Creature, name))
+            connection.execute(
+                CreatureFacet.__table__.insert().from_select(
+                    ["facet", "value", "count"],
+                    select(literal(name), value, func.count()).group_by(value),
+                )
+            )
+    return True
+
+
+def has_facet_summary(connection: Connection | Session) -> bool:
+    """
+    Returns whether the facet counts are maintained in the database.
+    """
+    return (
+        connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+            {"name": "creature_facets_insert"},
+        ).first()
+        is not None
+    )
+
+
+def summary_facets(db_session: Session) -> CreatureFacets:
+    """
+    Returns the facets of the whole catalogue from the maintained counts.
+    Each numeric range is read from the ends of the column index.
+
+    Args:
+        db_session (Session): Database session
+
+    Returns:
+        CreatureFacets: Counts and histograms of every creature
+    """
+    counts: dict[str, dict[str, int]] = {name: {} for name in FACETS}
+    for row in db_session.execute(select(CreatureFacet)).scalars():
+        counts[row.facet][row.value] = row.count
+
+    # Separate subqueries, as SQLite only reads min() or max() from an
+    # index when it is the only aggregate of its query
+    ranges = db_session.execute(
+        select(
+            *(
+                select(aggregate(getattr(Creature, name))).scalar_subquery()
+                for name in HISTOGRAM_EDGES
+                for aggregate in (func.min, func.max)
+            )
+        )
+    ).one()
+    return _facets(counts, ranges)
+
+
+def count_facets(query: Query) -> CreatureFacets:
+    """
+    Returns the facets of the creatures matching a query, counted by
+    grouping them.
+
+    Args:
+        query (Query): Query of the creatures to count
+
+    Returns:
+        CreatureFacets: Counts and histograms of the matching creatures
+    """
+    counts: dict[str, dict[str, int]] = {}
+    for name in FACETS:
+        value = facet_value(name, getattr(Creature, name))
+        rows = query.with_entities(value, func.count()).group_by(value).order_by(None).all()
+        counts[name] = {_term(row[0]): row[1] for row in rows}
+
+    ranges = query.with_entities(
+        *(
+            aggregate(getattr(Creature, name))
+            for name in HISTOGRAM_EDGES
+            for aggregate in (func.min, func.max)
+        )
+    ).order_by(None).one()
+    return _facets(counts, ranges)
+
+
+def _term(value: Any) -> str:
+    # Body shapes are loaded as enum members when counted from the table
+    return value.name if isinstance(value, BodyShapeIcon) else value
+
+
+def _facets(counts: dict[str, dict[str, int]], ranges: tuple) -> CreatureFacets:
+    terms = {}
+    for name in TERM_FACETS:
+        values = counts[name]
+        if name == "body_shape":
+            # Stored by member name, served by icon like the creatures are
+            values = {BodyShapeIcon[value].value: count for value, count in values.items()}
+        terms[name] = [
+            FacetCount(value=value, count=count)
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))
+        ]
+
+    histograms = {}
+    for position, (name, edges) in enumerate(HISTOGRAM_EDGES.items()):
+        bounds = (None, *edges, None)
+        histograms[name] = NumericFacet(
+            min=ranges[2 * position],
+            max=ranges[2 * position + 1],
+            buckets=[
+                HistogramBucket(lower=bounds[index], upper=bounds[index + 1], count=count)
+                for index, count in sorted(
+                    (int(value), count) for value, count in counts[name].items()
+                )
+            ],
+        )
+
+    return CreatureFacets(
+        total=sum(counts[TERM_FACETS[0]].values()),
+        **terms,
+        **histograms,
+    )
@@ -0,0 +1,111 @@
+from typing import Any
+
+from pydantic_core import to_json
+from sqlalchemy.orm import Query
+
+from pokedex.creature.models import Creature, CreaturePublic
+from pokedex.image.derivatives import derivative_url
+
+try:
+    import orjson
+except ImportError:  # Optional, installed with the fast-json extra
+    orjson = None
+
+# Image variants served as computed URL fields
+VARIANT_FIELDS = {"thumbnail_url": "thumbnail", "medium_url": "medium"}
+
+# Fields of the public creature schema, in response order, and the columns
+# each of them is read from
+PUBLIC_FIELDS: dict[str, tuple[str, ...]] = {
+    **{name: (name,) for name in CreaturePublic.model_fields},
+    **{name: ("image_sha256",) for name in VARIANT_FIELDS},
+}
+
+# Every public field, for responses without a sparse fieldset
+ALL_FIELDS = tuple(PUBLIC_FIELDS)
+
+
+class InvalidFieldsError(ValueError):
+    """
+    Raised when a sparse fieldset names fields creatures do not have.
+    """
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """
+    Parse a comma-separated sparse fieldset. The ID is always included, as
+    clients need it to address the creatures.
+
+    Args:
+        fields (str | None): Field names separated by commas
+
+    Returns:
+        tuple[str, ...] | None: The fields in response order, or None for
+            every field
+
+    Raises:
+        InvalidFieldsError: If a field is unknown
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested - PUBLIC_FIELDS.keys()
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in PUBLIC_FIELDS if name in requested)
+
+
+def select_fields(query: Query, fields: tuple[str, ...]) -> Query:
+    """
+    Returns a creature query selecting only the columns the fields need, as
+    plain rows instead of Creature objects.
+
+    Args:
+        query (Query): The filtered query of creatures
+        fields (tuple[str, ...]): Fields from parse_fields, or ALL_FIELDS
+
+    Returns:
+        Query: The query of creature rows, always including the ID
+    """
+    columns = dict.fromkeys(column for name in ("id", *fields) for column in PUBLIC_FIELDS[name])
+    return query.with_entities(*(getattr(Creature, column) for column in columns))
+
+
+def project(row: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    """
+    Returns the requested fields of a creature row or object, as served
+    publicly. Rows from the database are trusted and not validated.
+    """
+    return {
+        name: (
+            derivative_url(row.image_sha256, VARIANT_FIELDS[name])
+            if name in VARIANT_FIELDS
+            else getattr(row, name)
+        )
+        for name in fields
+    }
+
+
+def dump_json(value: Any) -> bytes:
+    """
+    Returns value as compact JSON, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value)
+
+
+def render_projection(rows: list, fields: tuple[str, ...]) -> bytes:
+    """
+    Returns the JSON array of the requested fields of creature rows.
+    """
+    return dump_json([project(row, fields) for row in rows])
+
+
+def render_ndjson(rows: list, fields: tuple[str, ...]) -> bytes:
+    """
+    Returns the requested fields of creature rows as newline-delimited JSON,
+    one creature per line.
+    """
+    return b"".join(dump_json(project(row, fields)) + b"\n" for row in rows)
@@ -0,0 +1,173 @@
+import threading
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from pokedex.config import get_settings
+from pokedex.creature.models import Creature
+from pokedex.image.hashing import BKTree, dhash
+from pokedex.monitoring.metrics import CACHE_LOOKUPS
+
+
+def compute_phash(image: bytes) -> int | None:
+    """
+    Compute the perceptual hash of an image, or None if it cannot be decoded.
+
+    Args:
+        image (bytes): The encoded image
+
+    Returns:
+        int | None: The perceptual hash
+    """
+    try:
+        return dhash(image)
+    except Exception as e:
+        logger.warning(f"Could not compute perceptual hash: {str(e)}")
+        return None
+
+
+def compute_file_phash(image_path: str) -> int | None:
+    """
+    Compute the perceptual hash of a stored image file, or None if it cannot
+    be read or decoded.
+
+    Args:
+        image_path (str): Path of the image file
+
+    Returns:
+        int | None: The perceptual hash
+    """
+    try:
+        with open(image_path, "rb") as f:
+            return compute_phash(f.read())
+    except OSError as e:
+        logger.warning(f"Could not read image {image_path}: {str(e)}")
+        return None
+
+
+class ImageIndex:
+    """
+    In-memory nearest-neighbour index of stored creature images keyed by
+    perceptual hash. The index is rebuilt from disk at startup and kept in
+    sync as creatures are created and deleted.
+    """
+
+    def __init__(self, enabled: bool = True, max_distance: int = 6):
+        self.enabled = enabled
+        self.max_distance = max_distance
+        self._tree = BKTree()
+        self._hashes: dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Creatures removed since each running rebuild started, by rebuild generation
+        self._removed_during_rebuilds: dict[int, set[int]] = {}
+        self._rebuild_generation = 0
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, creature_id: int, phash: int | None) -> None:
+        """
+        Add (or replace) the image hash of a creature.
+        """
+        if not self.enabled or phash is None:
+            return
+        with self._lock:
+            self._discard(creature_id)
+            self._tree.add(phash, creature_id)
+            self._hashes[creature_id] = phash
+
+    def remove(self, creature_id: int) -> None:
+        """
+        Drop a creature from the index.
+        """
+        with self._lock:
+            for removed in self._removed_during_rebuilds.values():
+                removed.add(creature_id)
+            self._discard(creature_id)
+
+    def _discard(self, creature_id: int) -> None:
+        phash = self._hashes.pop(creature_id, None)
+        if phash is not None:
+            self._tree.remove(phash, creature_id)
+
+    def nearest(self, phash: int | None) -> int | None:
+        """
+        Find the stored creature whose image is closest to the given hash.
+
+        Args:
+            phash (int | None): Perceptual hash of the uploaded image
+
+        Returns:
+            int | None: The ID of the closest creature within max_distance, if any
+        """
+        if not self.enabled or phash is None:
+            return None
+        with self._lock:
+            matches = self._tree.search(phash, self.max_distance)
+        if not matches:
+            CACHE_LOOKUPS.labels("image_index", "miss").inc()
+            return None
+        CACHE_LOOKUPS.labels("image_index", "hit").inc()
+        distance, creature_id = matches[0]
+        logger.debug(f"Near-duplicate image of creature {creature_id} at distance {distance}")
+        return creature_id
+
+    def rebuild(self, db_session: Session) -> None:
+        """
+        Rebuild the index by hashing the image of every stored creature.
+        This reads and decodes every image, so run it off the event loop.
+        Rebuilds may overlap; each keeps the changes made while it ran.
+
+        Args:
+            db_session (Session): Database session
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._rebuild_generation += 1
+            generation = self._rebuild_generation
+            self._removed_during_rebuilds[generation] = set()
+
+        hashes = {}
+        try:
+            for creature_id, image_path in db_session.execute(
+                select(Creature.id, Creature.image_path)
+            ):
+                phash = compute_file_phash(image_path)
+                if phash is not None:
+                    hashes[creature_id] = phash
+        except BaseException:
+            with self._lock:
+                del self._removed_during_rebuilds[generation]
+            raise
+
+        with self._lock:
+            removed = self._removed_during_rebuilds.pop(generation)
+            # Keep creatures added while rebuilding, drop the ones removed meanwhile
+            for creature_id, phash in self._hashes.items():
+                hashes.setdefault(creature_id, phash)
+            for creature_id in removed:
+                hashes.pop(creature_id, None)
+
+            tree = BKTree()
+            for creature_id, phash in hashes.items():
+                tree.add(phash, creature_id)
+            self._tree = tree
+            self._hashes = hashes
+        logger.info(f"Image index rebuilt with {len(hashes)} images")
+
+
+def create_image_index() -> ImageIndex:
+    """
+    Returns an image index configured from the application settings.
+    """
+    settings = get_settings()
+    return ImageIndex(
+        enabled=settings.image_index_enabled,
+        max_distance=settings.image_index_max_distance,
+    )
+
+
+image_index = create_image_index()
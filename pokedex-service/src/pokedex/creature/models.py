@@ -1,8 +1,11 @@
 from typing import Optional
 
+from pydantic import computed_field
+from sqlalchemy import Index, column
 from sqlmodel import SQLModel, Field
 
 from pokedex.creature.enums import BodyShapeIcon
+from pokedex.image.derivatives import derivative_url
 
 
 class CreatureBase(SQLModel):
@@ -13,23 +16,87 @@ class CreatureBase(SQLModel):
     name: str = Field(unique=True, index=True)
     scientific_name: str
     description: str
-    gender_ratio: float
+    gender_ratio: float = Field(index=True)
     kingdom: str
     classification: str
     family: str
-    height: float
-    weight: float
+    # Indexed for range filters and the keyset pagination of the listings sorted by them
+    height: float = Field(index=True)
+    weight: float = Field(index=True)
     body_shape: BodyShapeIcon
     image_path: str
 
 
-class Creature(CreatureBase, table=True):
+class ImageMetadata(SQLModel):
+    """
+    Base Pydantic model describing a stored creature image
+    """
+
+    image_sha256: str | None = Field(default=None, index=True)
+    image_size: int | None = None
+    image_width: int | None = None
+    image_height: int | None = None
+
+
+class Creature(ImageMetadata, CreatureBase, table=True):
     """
     SQLModel for database operations
     """
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
+    # Taxonomy filters match whole values ignoring case, which SQLite answers
+    # from NOCASE indexes. Filters on a lower rank alone, without the ranks
+    # above it, need an index of their own.
+    __table_args__ = (
+        Index(
+            "ix_creature_taxonomy",
+            column("kingdom").collate("NOCASE"),
+            column("classification").collate("NOCASE"),
+            column("family").collate("NOCASE"),
+        ).ddl_if(dialect="sqlite"),
+        Index(
+            "ix_creature_classification",
+            column("classification").collate("NOCASE"),
+            column("family").collate("NOCASE"),
+        ).ddl_if(dialect="sqlite"),
+        Index("ix_creature_family", column("family").collate("NOCASE")).ddl_if(dialect="sqlite"),
+        Index("ix_creature_body_shape_height", "body_shape", "height"),
+    )
+
+
+class CatalogueVersion(SQLModel, table=True):
+    """
+    SQLModel for the single row counting the changes to the creature
+    catalogue, bumped by triggers on every write to the creature table.
+    """
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = 0
+
+
+class CreatureFacet(SQLModel, table=True):
+    """
+    SQLModel for the number of creatures per value of a facet, or per bucket
+    of a histogram, kept up to date by triggers on the creature table.
+    """
+
+    facet: str = Field(primary_key=True)
+    value: str = Field(primary_key=True)
+    count: int = 0
+
+
+class ScanCacheEntry(SQLModel, table=True):
+    """
+    SQLModel for cached scan verdicts keyed by the image content hash.
+    A missing creature_id records a "no creature" verdict.
+    """
+
+    image_hash: str = Field(primary_key=True)
+    creature_id: Optional[int] = Field(default=None, foreign_key="creature.id", index=True)
+    created_at: float
+    accessed_at: float = Field(index=True)
+
 
 class CreatureCreate(CreatureBase):
     """
@@ -39,13 +106,115 @@ class CreatureCreate(CreatureBase):
     pass
 
 
-class CreaturePublic(CreatureBase):
+class CreaturePublic(ImageMetadata, CreatureBase):
     """
     Schema for reading creature data
     """
 
     id: int
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> str | None:
+        """URL of the thumbnail variant of the image, relative to the API root"""
+        return derivative_url(self.image_sha256, "thumbnail")
+
+    @computed_field
+    @property
+    def medium_url(self) -> str | None:
+        """URL of the medium variant of the image, relative to the API root"""
+        return derivative_url(self.image_sha256, "medium")
+
+
+class CreatureTransfer(ImageMetadata, CreatureBase):
+    """
+    Schema for a creature exported from or imported into a catalogue. The
+    name identifies the creature across catalogues, and the image path is
+    relative to the upload directory.
+    """
+
+    pass
+
+
+class ImportRowError(SQLModel):
+    """
+    Schema for a row of an import that was rejected
+    """
+
+    line: int
+    detail: str
+
+
+class ImportProgress(SQLModel):
+    """
+    Schema for the progress of a catalogue import, reported after every
+    batch and once more when done
+    """
+
+    rows: int = 0
+    imported: int = 0
+    rejected: int = 0
+    done: bool = False
+    errors: list[ImportRowError] = []
+
+
+class IdentifyBatchResult(SQLModel):
+    """
+    Schema for the outcome of one image of a batch identification
+    """
+
+    index: int
+    filename: str | None = None
+    creature: CreaturePublic | None = None
+    error: str | None = None
+
+
+class FacetCount(SQLModel):
+    """
+    Schema for the number of creatures with a value
+    """
+
+    value: str
+    count: int
+
+
+class HistogramBucket(SQLModel):
+    """
+    Schema for the number of creatures with a value from lower, inclusive,
+    to upper, exclusive. Missing bounds are open.
+    """
+
+    lower: float | None = None
+    upper: float | None = None
+    count: int
+
+
+class NumericFacet(SQLModel):
+    """
+    Schema for the range and histogram of a numeric attribute
+    """
+
+    min: float | None = None
+    max: float | None = None
+    buckets: list[HistogramBucket] = []
+
+
+class CreatureFacets(SQLModel):
+    """
+    Schema for the facet counts and histograms of the catalogue, or of the
+    creatures matching a search. Only values with creatures are listed,
+    terms by decreasing count and buckets in order.
+    """
+
+    total: int
+    kingdom: list[FacetCount]
+    classification: list[FacetCount]
+    family: list[FacetCount]
+    body_shape: list[FacetCount]
+    height: NumericFacet
+    weight: NumericFacet
+    gender_ratio: NumericFacet
+
 
 class CreatureUpdate(CreatureBase):
     """
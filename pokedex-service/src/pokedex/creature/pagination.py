@@ -0,0 +1,175 @@
+import base64
+import binascii
+from dataclasses import dataclass
+import json
+from typing import Any
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from pokedex.creature.enums import CreatureSort
+from pokedex.creature.models import Creature
+
+# Name of the sort order of full-text search results, best matches first
+RELEVANCE = "relevance"
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a cursor is malformed or was issued for another sort order.
+    """
+
+
+@dataclass
+class SortKey:
+    """
+    A sort order over one column, with the creature ID breaking ties so
+    every row has a unique position to resume after.
+    """
+
+    name: str
+    column: Any
+    descending: bool = False
+
+
+@dataclass
+class Page:
+    """
+    One page of creatures, or of creature rows, and the cursor of the next
+    page, if any.
+    """
+
+    items: list[Any]
+    next_cursor: str | None = None
+
+
+def sort_key(sort: CreatureSort) -> SortKey:
+    """
+    Returns the sort key of a sort order of the creature listings.
+    """
+    name = sort.value.lstrip("-")
+    return SortKey(name=sort.value, column=getattr(Creature, name), descending=sort.value != name)
+
+
+def relevance_key(rank: Any) -> SortKey:
+    """
+    Returns the sort key ordering full-text matches by their rank.
+    """
+    return SortKey(name=RELEVANCE, column=rank)
+
+
+def encode_cursor(key: SortKey, value: Any, creature_id: int) -> str:
+    """
+    Returns the opaque cursor of the position after a row.
+    """
+    payload = json.dumps([key.name, value, creature_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(key: SortKey, cursor: str) -> tuple[Any, int]:
+    """
+    Returns the sort value and creature ID of the row a cursor points after.
+
+    Args:
+        key (SortKey): The sort order of the requested page
+        cursor (str): The cursor returned with the previous page
+
+    Returns:
+        tuple[Any, int]: The sort value and the ID of the last row seen
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or of another sort order
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, value, creature_id = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if name != key.name:
+        raise InvalidCursorError(f"Cursor is for sort order {name!r}, not {key.name!r}")
+    if not isinstance(creature_id, int) or not isinstance(value, (str, int, float)):
+        raise InvalidCursorError("Invalid cursor")
+    return value, creature_id
+
+
+def keyset(query: Query, key: SortKey, cursor: str | None = None) -> Query:
+    """
+    Order a creature query by a sort key and resume after the row the
+    cursor points to.
+
+    Args:
+        query (Query): The filtered query of creatures or creature columns
+        key (SortKey): The sort order
+        cursor (str | None): The cursor to resume after, None to start from the first row
+
+    Returns:
+        Query: The ordered query
+    """
+    position = tuple_(key.column, Creature.id)
+    if key.descending:
+        query = query.order_by(key.column.desc(), Creature.id.desc())
+    else:
+        query = query.order_by(key.column, Creature.id)
+    if cursor is not None:
+        after = tuple_(*decode_cursor(key, cursor))
+        query = query.filter(position < after if key.descending else position > after)
+    return query
+
+
+def paginate(query: Query, key: SortKey, cursor: str | None = None, limit: int | None = None) -> Page:
+    """
+    Run a creature query one page at a time, resuming after the row the
+    cursor points to (keyset pagination). Unlike OFFSET, the cost of a page
+    does not grow with its depth, and rows added or removed meanwhile never
+    shift the following pages.
+
+    Args:
+        query (Query): The filtered query of creatures
+        key (SortKey): The sort order
+        cursor (str | None): The cursor of the page, None for the first page
+        limit (int | None): Maximum number of creatures, None for all of them
+
+    Returns:
+        Page: The creatures and the cursor of the next page
+    """
+    query = keyset(query, key, cursor)
+    if limit is None:
+        return Page(items=query.all())
+
+    # One more row than requested tells whether there is a next page
+    rows = query.add_columns(key.column).limit(limit + 1).all()
+    items = [row[0] for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last, value = rows[limit - 1]
+        next_cursor = encode_cursor(key, value, last.id)
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def paginate_rows(
+    query: Query, key: SortKey, cursor: str | None = None, limit: int | None = None
+) -> Page:
+    """
+    Run a query of creature columns one page at a time, like paginate. The
+    rows are returned as selected, with the sort value appended as
+    sort_value, and the columns must include the creature ID.
+
+    Args:
+        query (Query): The filtered query of creature columns
+        key (SortKey): The sort order
+        cursor (str | None): The cursor of the page, None for the first page
+        limit (int | None): Maximum number of rows, None for all of them
+
+    Returns:
+        Page: The rows and the cursor of the next page
+    """
+    query = keyset(query, key, cursor)
+    if limit is None:
+        return Page(items=query.all())
+
+    rows = query.add_columns(key.column.label("sort_value")).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(key, last.sort_value, last.id)
+    return Page(items=rows[:limit], next_cursor=next_cursor)
@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from pokedex.config import get_settings
+from pokedex.creature.singleflight import SingleFlight
+from pokedex.creature.version import get_catalogue_version
+from pokedex.database import run_db
+from pokedex.monitoring.metrics import CACHE_LOOKUPS
+
+# Clients may store catalogue responses but must revalidate them every time
+CACHE_CONTROL = "no-cache"
+
+# Renders a response body and its extra headers
+Renderer = Callable[[], Awaitable[tuple[bytes, dict[str, str]]]]
+
+
+@dataclass
+class CachedResponse:
+    """
+    A rendered JSON response with its strong ETag, computed once when it is
+    rendered. Headers must not depend on the request, as the response is
+    served to every request with the same key.
+    """
+
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    version: int | None = None
+    etag: str = field(init=False)
+
+    def __post_init__(self):
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Returns whether an If-None-Match header matches an ETag, comparing
+    weakly as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class ResponseCache:
+    """
+    In-memory cache of rendered catalogue responses, keyed by route and
+    query. Entries are valid for the catalogue version they were rendered
+    at, so any write to the catalogue, from any worker, invalidates them.
+    Responses carry a strong ETag and matching If-None-Match requests get a
+    304 Not Modified without a body. The least recently used entries are
+    evicted beyond max_entries.
+    """
+
+    def __init__(self, enabled: bool = True, max_entries: int = 256):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._renders = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """
+        Returns the cache key of a request: its path and sorted query.
+        """
+        query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    async def respond(self, request: Request, db_session: Session, render: Renderer) -> Response:
+        """
+        Answer a catalogue read from the cache, rendering it on a miss.
+        Concurrent misses for the same key and version render once.
+
+        Args:
+            request (Request): The incoming request
+            db_session (Session): Database session, to read the catalogue version
+            render (Renderer): Renders the body and extra headers of the response
+
+        Returns:
+            Response: The JSON response, or 304 Not Modified if the client has it
+        """
+        version = await run_db(get_catalogue_version, db_session) if self.enabled else None
+        if version is None:
+            body, headers = await render()
+            return self._response(request, CachedResponse(body, headers))
+
+        key = self.key(request)
+        cached = self._entries.get(key)
+        if cached is not None and cached.version == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            CACHE_LOOKUPS.labels("response", "hit").inc()
+            return self._response(request, cached)
+
+        self.misses += 1
+        CACHE_LOOKUPS.labels("response", "miss").inc()
+
+        async def render_and_store() -> CachedResponse:
+            # The version is read before rendering, so the body is at least
+            # as recent as the version it is stored under
+            body, headers = await render()
+            rendered = CachedResponse(body, headers, version)
+            self._store(key, rendered)
+            return rendered
+
+        return self._response(request, await self._renders.do((key, version), render_and_store))
+
+    def _store(self, key: str, rendered: CachedResponse) -> None:
+        current = self._entries.get(key)
+        if current is not None and current.version > rendered.version:
+            return
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _response(self, request: Request, cached: CachedResponse) -> Response:
+        headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        """
+        Drop every cached response.
+        """
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit/miss counters and the size of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+def create_response_cache() -> ResponseCache:
+    """
+    Returns a response cache configured from the application settings.
+    """
+    settings = get_settings()
+    return ResponseCache(
+        enabled=settings.response_cache_enabled,
+        max_entries=settings.response_cache_max_entries,
+    )
+
+
+response_cache = create_response_cache()
@@ -1,27 +1,197 @@
+import asyncio
+from collections.abc import AsyncIterator
+import tarfile
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from langchain_core.runnables import RunnableConfig
+from pydantic import TypeAdapter
 
 from pokedex.config import Settings, get_settings
-from pokedex.database import DbSession
-from pokedex.creature.dependencies import validate_image
-from pokedex.creature.models import CreaturePublic
+from pokedex.database import DbSession, engine, run_db
+from pokedex.creature.dependencies import (
+    LimitedBodyRoute,
+    SearchFilters,
+    limit_body,
+    validate_image,
+    validate_images,
+)
+from pokedex.creature.enums import CreatureSort, TransferFormat
+from pokedex.creature.fields import (
+    ALL_FIELDS,
+    InvalidFieldsError,
+    parse_fields,
+    render_ndjson,
+    render_projection,
+)
+from pokedex.creature.models import (
+    CreatureFacets,
+    CreaturePublic,
+    CreatureTransfer,
+    IdentifyBatchResult,
+    ImportProgress,
+)
+from pokedex.creature.pagination import InvalidCursorError, Page
+from pokedex.creature.response_cache import response_cache
 from pokedex.creature.service import (
+    identify_batch,
     identify_from_image,
     get,
-    get_all,
+    get_facets,
+    get_page,
     delete,
     search_creatures,
+    stream_creatures,
+)
+from pokedex.creature.transfer import (
+    export_catalogue,
+    export_images,
+    extract_images,
+    import_catalogue,
+    schedule_image_refresh,
 )
-from pokedex.llm import get_llm
+from pokedex.creature.utils import spool_upload
+from pokedex.llm import get_agent_config
+
+router = APIRouter(
+    prefix="/creature", tags=["creature-identification"], route_class=LimitedBodyRoute
+)
+
+CACHE_HEADERS = {
+    "ETag": {
+        "description": "Strong validator of the response, send it back in If-None-Match",
+        "schema": {"type": "string"},
+    },
+}
+PAGE_HEADERS = {
+    **CACHE_HEADERS,
+    "X-Next-Cursor": {
+        "description": "Cursor of the next page, absent on the last page",
+        "schema": {"type": "string"},
+    },
+    "Link": {
+        "description": 'URL of the next page with rel="next", absent on the last page',
+        "schema": {"type": "string"},
+    },
+}
+NDJSON_CONTENT = {
+    "application/x-ndjson": {
+        "description": "One creature per line, streamed, with Accept: application/x-ndjson",
+        "schema": CreaturePublic.model_json_schema(),
+    }
+}
+TRANSFER_MEDIA_TYPES = {
+    TransferFormat.NDJSON: "application/x-ndjson",
+    TransferFormat.CSV: "text/csv",
+}
+TOO_LARGE = {
+    413: {
+        "description": "Payload Too Large",
+        "content": {
+            "application/json": {"example": {"detail": "File is too large"}}
+        },
+    },
+}
+NOT_MODIFIED = {304: {"description": "Not Modified, the ETag in If-None-Match is current"}}
+
+
+def page_size(limit: int | None, settings: Settings) -> int:
+    """
+    Returns the requested page size, bounded by the largest allowed.
+    """
+    return min(limit or settings.page_size, settings.max_page_size)
+
+
+def page_headers(page: Page) -> dict[str, str]:
+    """
+    Returns the X-Next-Cursor header with the cursor of the next page.
+    """
+    if page.next_cursor is None:
+        return {}
+    return {"X-Next-Cursor": page.next_cursor}
+
+
+def link_next_page(request: Request, response: Response) -> Response:
+    """
+    Add the Link header pointing to the next page to a page response. It is
+    built from the URL of each request rather than cached with the page, as
+    clients may reach the service under different base URLs.
+    """
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor is not None:
+        next_url = request.url.include_query_params(cursor=cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+_creature_adapter = TypeAdapter(CreaturePublic)
 
-router = APIRouter(prefix="/creature", tags=["creature-identification"])
+
+def render_creature(creature) -> bytes:
+    """
+    Returns the JSON of a creature as served by the catalogue endpoints.
+    """
+    return _creature_adapter.dump_json(
+        _creature_adapter.validate_python(creature, from_attributes=True)
+    )
+
+
+def requested_fields(fields: str | None) -> tuple[str, ...]:
+    """
+    Returns the parsed fields query parameter, every field if it is missing.
+
+    Raises:
+        HTTPException: If a field is unknown
+    """
+    try:
+        return parse_fields(fields) or ALL_FIELDS
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def wants_ndjson(request: Request) -> bool:
+    """
+    Returns whether the client asked for newline-delimited JSON.
+    """
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+async def ndjson_response(chunks: AsyncIterator[list], fields: tuple[str, ...]) -> StreamingResponse:
+    """
+    Returns a response streaming chunks of creature rows as newline-delimited
+    JSON. The first chunk is read before responding, so an invalid cursor is
+    still answered with 400 rather than with a broken stream.
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    try:
+        first = await anext(chunks, [])
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def body():
+        try:
+            yield render_ndjson(first, fields)
+            async for chunk in chunks:
+                yield render_ndjson(chunk, fields)
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 
 @router.get(
     "/search",
     response_model=list[CreaturePublic],
     responses={
+        200: {
+            "description": "One page of matching creatures",
+            "headers": PAGE_HEADERS,
+            "content": NDJSON_CONTENT,
+        },
+        **NOT_MODIFIED,
         400: {
             "description": "Bad Request",
             "content": {
@@ -32,66 +202,173 @@ router = APIRouter(prefix="/creature", tags=["creature-identification"])
 )
 async def search_creature(
     db_session: DbSession,
-    id: int = None,
-    name: str = None,
-    scientific_name: str = None,
-    kingdom: str = None,
-    classification: str = None,
-    family: str = None,
-    body_shape: str = None,
-    height_min: float = None,
-    height_max: float = None,
-    weight_min: float = None,
-    weight_max: float = None,
-    gender_ratio_min: float = None,
-    gender_ratio_max: float = None,
+    settings: Annotated[Settings, Depends(get_settings)],
+    request: Request,
+    filters: SearchFilters,
+    sort: CreatureSort = None,
+    cursor: str = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    fields: str = None,
 ):
     """
-    Search for creatures with multiple filters.
+    Search for creatures with multiple filters, one page at a time.
+    Responses are cached until the catalogue changes. With Accept:
+    application/x-ndjson, every matching creature from the cursor on, up
+    to limit, is streamed instead, one per line and uncached.
 
     Args:
         db_session: Database session
-        id: Filter by creature ID
-        name: Filter by creature name (partial match)
-        scientific_name: Filter by scientific name (partial match)
-        kingdom: Filter by kingdom (exact match)
-        classification: Filter by classification (exact match)
-        family: Filter by family (exact match)
-        body_shape: Filter by body shape (exact match)
-        height_min: Minimum height filter
-        height_max: Maximum height filter
-        weight_min: Minimum weight filter
-        weight_max: Maximum weight filter
-        gender_ratio_min: Minimum gender ratio filter
-        gender_ratio_max: Maximum gender ratio filter
+        settings: Application settings
+        request: The incoming request
+        filters: Creature filters, see search_filters
+        sort: Sort order, by relevance with q and by ID otherwise by default
+        cursor: Cursor of the page, from the X-Next-Cursor header of the previous page
+        limit: Maximum number of creatures in the page
+        fields: Comma-separated fields to return, e.g. name,thumbnail_url,body_shape.
+            The ID is always returned; all fields by default
 
     Returns:
         List of creatures matching the filters
     """
+    projection = requested_fields(fields)
+    if wants_ndjson(request):
+        chunks = stream_creatures(
+            engine,
+            sort=sort,
+            cursor=cursor,
+            limit=limit,
+            fields=projection,
+            chunk_size=settings.stream_chunk_size,
+            **filters,
+        )
+        return await ndjson_response(chunks, projection)
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        try:
+            page = await search_creatures(
+                db_session=db_session,
+                **filters,
+                sort=sort,
+                cursor=cursor,
+                limit=page_size(limit, settings),
+                fields=projection,
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return render_projection(page.items, projection), page_headers(page)
+
+    return link_next_page(request, await response_cache.respond(request, db_session, render))
+
+
+@router.get(
+    "/facets",
+    response_model=CreatureFacets,
+    responses={
+        200: {"description": "Facet counts and histograms", "headers": CACHE_HEADERS},
+        **NOT_MODIFIED,
+    },
+)
+async def get_creature_facets(
+    db_session: DbSession,
+    request: Request,
+    filters: SearchFilters,
+):
+    """
+    Endpoint to count the creatures per kingdom, classification, family and
+    body shape, with the range and histogram of their height, weight and
+    gender ratio, optionally of the creatures matching the search filters.
+    Responses are cached until the catalogue changes.
+
+    Args:
+        db_session: Database session
+        request: The incoming request
+        filters: Creature filters, see search_filters
+
+    Returns:
+        Facet counts and histograms
+    """
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        facets = await get_facets(db_session, **filters)
+        return facets.model_dump_json().encode(), {}
+
+    return await response_cache.respond(request, db_session, render)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Every creature, streamed in ID order",
+            "content": {
+                "application/x-ndjson": {"schema": CreatureTransfer.model_json_schema()},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def export_creatures(
+    settings: Annotated[Settings, Depends(get_settings)],
+    format: TransferFormat = TransferFormat.NDJSON,
+):
+    """
+    Endpoint to export the whole catalogue, for POST /creature/import.
+    Creatures are streamed as they are read, without their IDs, and image
+    paths are relative to the upload directory; export the images with GET
+    /creature/export/images.
+
+    Args:
+        settings: Application settings
+        format: ndjson, one creature per line, or csv with a header row
 
-    creatures = await search_creatures(
-        db_session=db_session,
-        id=id,
-        name=name,
-        scientific_name=scientific_name,
-        kingdom=kingdom,
-        classification=classification,
-        family=family,
-        body_shape=body_shape,
-        height_min=height_min,
-        height_max=height_max,
-        weight_min=weight_min,
-        weight_max=weight_max,
-        gender_ratio_min=gender_ratio_min,
-        gender_ratio_max=gender_ratio_max,
+    Returns:
+        A stream of the creatures
+    """
+    return StreamingResponse(
+        export_catalogue(engine, format, settings.upload_dir, settings.stream_chunk_size),
+        media_type=TRANSFER_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="creatures.{format.value}"'},
+    )
+
+
+@router.get(
+    "/export/images",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Tarball of the creature images, streamed",
+            "content": {"application/x-tar": {"schema": {"type": "string", "format": "binary"}}},
+        },
+    },
+)
+async def export_creature_images(
+    settings: Annotated[Settings, Depends(get_settings)],
+):
+    """
+    Endpoint to export the images of the catalogue as a tarball, for POST
+    /creature/import/images. Members are named by the image paths of GET
+    /creature/export.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        A stream of the tarball
+    """
+    return StreamingResponse(
+        export_images(engine, settings.upload_dir),
+        media_type="application/x-tar",
+        headers={"Content-Disposition": 'attachment; filename="creature-images.tar"'},
     )
-    return creatures
 
 
 @router.get(
     "/{creature_id}",
     response_model=CreaturePublic,
     responses={
+        200: {"description": "The creature", "headers": CACHE_HEADERS},
+        **NOT_MODIFIED,
         404: {
             "description": "Creature not found",
             "content": {
@@ -102,47 +379,100 @@ async def search_creature(
 )
 async def get_creature(
     db_session: DbSession,
+    request: Request,
     creature_id: int,
 ):
     """
-    Endpoint to get a creature by its ID.
+    Endpoint to get a creature by its ID. Responses are cached until the
+    catalogue changes.
 
     Args:
         db_session: Database session
+        request: The incoming request
         creature_id: The ID of the creature to retrieve
 
     Returns:
         Details of the requested creature
     """
 
-    creature = get(db_session, creature_id)
-    if not creature:
-        raise HTTPException(
-            status_code=404,
-            detail="Creature not found",
-        )
-    return creature
+    async def render() -> tuple[bytes, dict[str, str]]:
+        creature = await run_db(get, db_session, creature_id)
+        if not creature:
+            raise HTTPException(
+                status_code=404,
+                detail="Creature not found",
+            )
+        return render_creature(creature), {}
+
+    return await response_cache.respond(request, db_session, render)
 
 
 @router.get(
     "/",
     response_model=list[CreaturePublic],
+    responses={
+        200: {
+            "description": "One page of creatures",
+            "headers": PAGE_HEADERS,
+            "content": NDJSON_CONTENT,
+        },
+        **NOT_MODIFIED,
+        400: {
+            "description": "Bad Request",
+            "content": {"application/json": {"example": {"detail": "Invalid cursor"}}},
+        },
+    },
 )
 async def get_all_creatures(
     db_session: DbSession,
+    settings: Annotated[Settings, Depends(get_settings)],
+    request: Request,
+    sort: CreatureSort = CreatureSort.ID,
+    cursor: str = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    fields: str = None,
 ):
     """
-    Endpoint to get all creatures.
+    Endpoint to get all creatures, one page at a time. Responses are
+    cached until the catalogue changes. With Accept: application/x-ndjson,
+    every creature from the cursor on, up to limit, is streamed instead,
+    one per line and uncached.
 
     Args:
         db_session: Database session
+        settings: Application settings
+        request: The incoming request
+        sort: Sort order
+        cursor: Cursor of the page, from the X-Next-Cursor header of the previous page
+        limit: Maximum number of creatures in the page
+        fields: Comma-separated fields to return, e.g. name,thumbnail_url,body_shape.
+            The ID is always returned; all fields by default
 
     Returns:
         List of creatures
     """
+    projection = requested_fields(fields)
+    if wants_ndjson(request):
+        chunks = stream_creatures(
+            engine,
+            sort=sort,
+            cursor=cursor,
+            limit=limit,
+            fields=projection,
+            chunk_size=settings.stream_chunk_size,
+        )
+        return await ndjson_response(chunks, projection)
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        try:
+            page = await run_db(
+                get_page, db_session, sort, cursor, page_size(limit, settings), projection
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return render_projection(page.items, projection), page_headers(page)
 
-    creatures = get_all(db_session)
-    return creatures
+    return link_next_page(request, await response_cache.respond(request, db_session, render))
 
 
 @router.delete(
@@ -177,7 +507,7 @@ async def delete_creature(
         A message indicating the deletion status
     """
     try:
-        delete(db_session, creature_id)
+        await run_db(delete, db_session, creature_id)
         return {"message": "Creature deleted"}
     except Exception:
         raise HTTPException(
@@ -195,12 +525,28 @@ async def delete_creature(
             "content": {
                 "application/json": {"example": {"detail": "File must be an image"}}
             },
-        }
+        },
+        413: {
+            "description": "Payload Too Large",
+            "content": {
+                "application/json": {"example": {"detail": "File is too large"}}
+            },
+        },
+        503: {
+            "description": "Model backend unavailable, retry after the Retry-After header",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "The model backend is unavailable. Please try again later."}
+                }
+            },
+        },
     },
 )
+@limit_body(lambda settings: settings.max_upload_bytes)
 async def identify_creature(
     db_session: DbSession,
     settings: Annotated[Settings, Depends(get_settings)],
+    config: Annotated[RunnableConfig, Depends(get_agent_config)],
     image: Annotated[UploadFile, Depends(validate_image)],
 ):
     """
@@ -209,18 +555,188 @@ async def identify_creature(
     Args:
         db_session: Database session
         settings: Application settings
+        config: Agent configuration
         image: The validated image file
 
     Returns:
         Details of the identified creature
     """
 
-    config = {
-        "configurable": {
-            "llm": get_llm(settings.model_name, settings.model_endpoint, settings.model_api_key),
-            "image_llm": get_llm(settings.image_model_name, settings.image_model_endpoint, settings.image_model_api_key),
-        }
-    }
-
     creature = await identify_from_image(db_session, image, settings.upload_dir, config)
     return creature
+
+
+@router.post(
+    "/identify/batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "One JSON result per line, in completion order",
+            "content": {
+                "application/x-ndjson": {
+                    "schema": IdentifyBatchResult.model_json_schema(),
+                }
+            },
+        },
+        413: {
+            "description": "Payload Too Large",
+            "content": {
+                "application/json": {"example": {"detail": "File is too large"}}
+            },
+        },
+        422: {
+            "description": "Unprocessable Entity",
+            "content": {
+                "application/json": {"example": {"detail": "File must be an image"}}
+            },
+        },
+    },
+)
+@limit_body(lambda settings: settings.max_upload_bytes * settings.batch_max_images)
+async def identify_creature_batch(
+    settings: Annotated[Settings, Depends(get_settings)],
+    config: Annotated[RunnableConfig, Depends(get_agent_config)],
+    images: Annotated[list[UploadFile], Depends(validate_images)],
+):
+    """
+    Endpoint to identify the creatures in a batch of uploaded images.
+    Results are streamed as newline-delimited JSON as each image completes.
+
+    Args:
+        settings: Application settings
+        config: Agent configuration
+        images: The validated image files
+
+    Returns:
+        A stream of per-image results
+    """
+
+    # The uploads are closed once this handler returns, before the stream is sent
+    spooled_images = []
+    try:
+        for image in images:
+            spooled = await spool_upload(image, settings.upload_dir, settings.max_upload_bytes)
+            spooled_images.append((image.filename, spooled))
+    except BaseException:
+        for _, spooled in spooled_images:
+            spooled.discard()
+        raise
+
+    async def stream_results():
+        async for result in identify_batch(
+            engine,
+            spooled_images,
+            config,
+            settings.batch_max_concurrency,
+        ):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Progress after every batch, one JSON report per line, the last one done",
+            "content": {
+                "application/x-ndjson": {"schema": ImportProgress.model_json_schema()},
+            },
+        },
+        **TOO_LARGE,
+    },
+)
+@limit_body(lambda settings: settings.max_transfer_bytes)
+async def import_creatures(
+    settings: Annotated[Settings, Depends(get_settings)],
+    file: UploadFile,
+    format: TransferFormat = None,
+):
+    """
+    Endpoint to import creatures from an export of GET /creature/export.
+    Creatures are matched by name: new ones are inserted and existing ones
+    updated. Rows are validated and written in batches, each in its own
+    transaction, and invalid rows are skipped and reported. Import the
+    images first with POST /creature/import/images.
+
+    Args:
+        settings: Application settings
+        file: The export
+        format: Format of the export, csv for .csv files and ndjson otherwise by default
+
+    Returns:
+        A stream of progress reports
+    """
+    if format is None:
+        csv = (file.filename or "").lower().endswith(".csv")
+        format = TransferFormat.CSV if csv else TransferFormat.NDJSON
+
+    # The upload is closed once this handler returns, before the stream is sent
+    spooled = await spool_upload(file, settings.upload_dir, settings.max_transfer_bytes)
+
+    async def stream_progress():
+        upserted = []
+        try:
+            with open(spooled.path, "rb") as f:
+                async for progress in import_catalogue(
+                    engine,
+                    f,
+                    format,
+                    settings.upload_dir,
+                    settings.import_batch_size,
+                    on_upserted=upserted.extend,
+                ):
+                    yield progress.model_dump_json() + "\n"
+        finally:
+            spooled.discard()
+            schedule_image_refresh(engine, upserted)
+
+    return StreamingResponse(stream_progress(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/import/images",
+    responses={
+        200: {
+            "description": "Images imported",
+            "content": {
+                "application/json": {"example": {"message": "Imported 151 images"}}
+            },
+        },
+        400: {
+            "description": "Bad Request",
+            "content": {
+                "application/json": {"example": {"detail": "Invalid image archive"}}
+            },
+        },
+        **TOO_LARGE,
+    },
+)
+@limit_body(lambda settings: settings.max_transfer_bytes)
+async def import_creature_images(
+    settings: Annotated[Settings, Depends(get_settings)],
+    archive: UploadFile,
+):
+    """
+    Endpoint to import the images of a tarball from GET
+    /creature/export/images into the upload directory. Image variants and
+    the near-duplicate index are refreshed in the background.
+
+    Args:
+        settings: Application settings
+        archive: The tarball
+
+    Returns:
+        A message with the number of imported images
+    """
+    spooled = await spool_upload(archive, settings.upload_dir, settings.max_transfer_bytes)
+    try:
+        extracted = await asyncio.to_thread(extract_images, spooled.path, settings.upload_dir)
+    except (tarfile.TarError, ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image archive: {str(e)}")
+    finally:
+        spooled.discard()
+
+    schedule_image_refresh(engine, extracted)
+    return {"message": f"Imported {len(extracted)} images"}
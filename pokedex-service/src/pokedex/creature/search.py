@@ -0,0 +1,131 @@
+import re
+
+from loguru import logger
+from sqlalchemy import Connection, Engine, column, func, literal_column, select, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# Name of the FTS5 index over the creature catalogue
+SEARCH_TABLE = "creature_fts"
+
+# Indexed columns and their bm25 weights, in index order
+SEARCH_COLUMNS = {
+    "name": 10.0,
+    "scientific_name": 5.0,
+    "family": 2.0,
+    "description": 1.0,
+}
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_old = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+
+# External content index: the text lives in the creature table only and
+# triggers keep the index in sync with every change to it
+SEARCH_INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    f"{_columns}, content='creature', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON creature BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON creature BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF {_columns} "
+    f"ON creature BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+]
+
+_search_table = table(SEARCH_TABLE, column("rowid"))
+
+
+def create_search_index(engine: Engine) -> bool:
+    """
+    Create the full-text index of the creature catalogue and the triggers
+    keeping it in sync, indexing the existing creatures when the index is
+    new. Only SQLite with FTS5 is supported; other databases keep searching
+    with substring matches.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        bool: Whether the index is available
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as connection:
+        if has_search_index(connection):
+            return True
+        try:
+            for statement in SEARCH_INDEX_DDL:
+                connection.execute(text(statement))
+        except OperationalError as e:
+            logger.warning(f"Full-text search is unavailable: {str(e)}")
+            return False
+        logger.info("Indexing creatures for full-text search")
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def has_search_index(connection: Connection | Session) -> bool:
+    """
+    Returns whether the full-text index exists in the database.
+    """
+    return (
+        connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first()
+        is not None
+    )
+
+
+def search_words(q: str) -> list[str]:
+    """
+    Returns the words of a free-text query.
+    """
+    return re.findall(r"\w+", q)
+
+
+def to_match_query(q: str) -> str | None:
+    """
+    Turn free text into an FTS5 query matching every word as a prefix.
+    Words are quoted so FTS5 operators in user input are matched literally.
+
+    Args:
+        q (str): The free-text query
+
+    Returns:
+        str | None: The FTS5 query, or None if q has no words
+    """
+    words = search_words(q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_matches(match_query: str):
+    """
+    Returns a subquery of the IDs of the creatures matching an FTS5 query
+    with their bm25 rank, lower ranks being better matches.
+
+    Args:
+        match_query (str): The FTS5 query
+
+    Returns:
+        Subquery: Columns id and rank
+    """
+    index = literal_column(SEARCH_TABLE)
+    return (
+        select(
+            _search_table.c.rowid.label("id"),
+            func.bm25(index, *SEARCH_COLUMNS.values()).label("rank"),
+        )
+        .select_from(_search_table)
+        .where(index.op("MATCH")(match_query))
+        .subquery()
+    )
@@ -1,39 +1,98 @@
 from math import e
-import os
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
 from loguru import logger
 from fastapi import HTTPException, UploadFile
 from langchain_core.runnables import RunnableConfig
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from langgraph.graph.state import CompiledStateGraph
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import ColumnElement, Engine, and_, false, func, or_
+from sqlalchemy.exc import IntegrityError
 
 from pokedex.agent.explainer.schema import CreatureExplanation
-from pokedex.creature.models import Creature, CreatureCreate, CreatureUpdate
-from pokedex.creature.utils import upload_file
+from pokedex.config import get_settings
+from pokedex.database import run_db
+from pokedex.creature.enums import BodyShapeIcon, CreatureSort, IdentifyStage
+from pokedex.creature.models import (
+    Creature,
+    CreatureCreate,
+    CreatureFacets,
+    CreaturePublic,
+    CreatureUpdate,
+    IdentifyBatchResult,
+    ImageMetadata,
+)
+from pokedex.creature.cache import scan_cache
+from pokedex.creature.facets import count_facets, has_facet_summary, summary_facets
+from pokedex.creature.fields import ALL_FIELDS, select_fields
+from pokedex.creature.image_index import compute_file_phash, compute_phash, image_index
+from pokedex.creature.pagination import (
+    Page,
+    SortKey,
+    paginate,
+    paginate_rows,
+    relevance_key,
+    sort_key,
+)
+from pokedex.creature.search import (
+    SEARCH_COLUMNS,
+    has_search_index,
+    search_matches,
+    search_words,
+    to_match_query,
+)
+from pokedex.creature.singleflight import SingleFlight
+from pokedex.creature.storage import remove_unreferenced_image
+from pokedex.creature.utils import SpooledFile, spool_upload, store_spooled
 from pokedex.agent.agents import get_agent
+from pokedex.image.derivatives import generate_derivatives
+from pokedex.image.processing import image_dimensions
 
+# In-flight identifications keyed by image hash and by creature name
+inflight = SingleFlight()
 
-def create(db_session: Session, creature: CreatureCreate) -> Creature:
+# Callback notified as an identification moves through its stages
+StageCallback = Callable[[IdentifyStage], Awaitable[None]]
+
+
+def create(
+    db_session: Session,
+    creature: CreatureCreate,
+    phash: int | None = None,
+    image: ImageMetadata | None = None,
+) -> Creature:
     """
-    Create a new creature in the database.
+    Create a new creature in the database and add its image to the image index.
 
     Args:
         db_session (Session): Database session
         creature (CreatureCreate): The creature data to create
+        phash (int | None): Perceptual hash of the image, computed from
+            image_path when not given
+        image (ImageMetadata | None): Metadata of the stored image
 
     Returns:
         Creature: The created creature
     """
-    db_creature = Creature.model_validate(creature)
+    db_creature = Creature.model_validate(
+        creature, update=image.model_dump() if image else None
+    )
     db_session.add(db_creature)
     try:
         db_session.commit()
         db_session.refresh(db_creature)
-        return db_creature
     except Exception:
         logger.error("Failed to create creature")
         db_session.rollback()
         raise
 
+    if image_index.enabled:
+        if phash is None:
+            phash = compute_file_phash(db_creature.image_path)
+        image_index.add(db_creature.id, phash)
+    return db_creature
+
 
 def get(db_session: Session, creature_id: int) -> Creature:
     """
@@ -63,21 +122,32 @@ def get_all(db_session: Session) -> list[Creature]:
     return db_session.query(Creature).all()
 
 
-def get_all_with_pagination(
-    db_session: Session, skip: int = 0, limit: int = 100
-) -> list[Creature]:
+def get_page(
+    db_session: Session,
+    sort: CreatureSort = CreatureSort.ID,
+    cursor: str = None,
+    limit: int = None,
+    fields: tuple[str, ...] = None,
+) -> Page:
     """
-    Get all creatures with pagination.
+    Get one page of all creatures.
 
     Args:
         db_session (Session): Database session
-        skip (int): Number of records to skip
-        limit (int): Maximum number of records to return
+        sort (CreatureSort): Sort order
+        cursor (str, optional): Cursor of the page, from the previous page
+        limit (int, optional): Maximum number of creatures, None for all of them
+        fields (tuple[str, ...], optional): Public fields to select, from
+            parse_fields or ALL_FIELDS, to get rows of these columns instead
+            of Creature objects
 
     Returns:
-        list[Creature]: List of creatures
+        Page: The creatures and the cursor of the next page
     """
-    return db_session.query(Creature).offset(skip).limit(limit).all()
+    query = db_session.query(Creature)
+    if fields is not None:
+        return paginate_rows(select_fields(query, fields), sort_key(sort), cursor, limit)
+    return paginate(query, sort_key(sort), cursor, limit)
 
 
 def update(
@@ -105,15 +175,20 @@ def update(
 
 def delete(db_session: Session, creature_id: int) -> None:
     """
-    Delete a creature by ID.
+    Delete a creature by ID, along with its image unless another creature
+    shares it.
 
     Args:
         db_session (Session): Database session
         creature_id (int): The ID of the creature to delete
     """
     creature = get(db_session, creature_id)
+    image_path = creature.image_path
+    scan_cache.invalidate_creature(db_session, creature_id)
     db_session.delete(creature)
     db_session.commit()
+    image_index.remove(creature_id)
+    remove_unreferenced_image(db_session, image_path)
 
 
 def get_by_name(db_session: Session, name: str) -> Creature | None:
@@ -130,41 +205,310 @@ def get_by_name(db_session: Session, name: str) -> Creature | None:
     return db_session.query(Creature).filter(Creature.name == name).first()
 
 
+def normalize_creature_name(name: str) -> str:
+    """
+    Normalize a creature name for comparisons, ignoring case and spacing.
+
+    Args:
+        name (str): The creature name
+
+    Returns:
+        str: The normalized name
+    """
+    return " ".join(name.split()).casefold()
+
+
 async def identify_from_image(
     db_session: Session,
     image: UploadFile,
     upload_dir: str,
     config: RunnableConfig,
+    on_stage: StageCallback | None = None,
 ) -> Creature:
     """
     Identify a creature from an image and add it to the database if it doesn't exist.
+    The upload is streamed to a temporary file in upload_dir, which is kept as
+    the creature image if a new creature is added and removed otherwise.
 
     Args:
         db_session (Session): Database session
         image (UploadFile): The uploaded image file
         upload_dir (str): Directory path where the file will be saved
+        config (RunnableConfig): Agent configuration
+        on_stage (StageCallback | None): Called as the identification enters each stage
 
     Returns:
         Creature: The created or existing creature
     """
 
+    spooled = await spool_upload(image, upload_dir, get_settings().max_upload_bytes)
+    try:
+        return await identify_from_spooled(db_session, spooled, config, on_stage)
+    finally:
+        await asyncio.to_thread(spooled.discard)
+
+
+async def identify_from_spooled(
+    db_session: Session,
+    spooled: SpooledFile,
+    config: RunnableConfig,
+    on_stage: StageCallback | None = None,
+) -> Creature:
+    """
+    Identify a creature from an image already spooled to disk.
+    Concurrent requests for the same image share a single identification.
+    The spooled file is stored as the creature image if a new creature is
+    added; discarding it otherwise is left to the caller.
+
+    Args:
+        db_session (Session): Database session
+        spooled (SpooledFile): The spooled image file
+        config (RunnableConfig): Agent configuration
+        on_stage (StageCallback | None): Called as the identification enters each stage
+
+    Returns:
+        Creature: The created or existing creature
+    """
+    return await inflight.do(
+        ("image", spooled.sha256),
+        lambda: _identify_image(db_session, spooled, config, on_stage),
+    )
+
+
+async def identify_batch(
+    db_engine: Engine,
+    images: list[tuple[str | None, SpooledFile]],
+    config: RunnableConfig,
+    max_concurrency: int = 4,
+) -> AsyncIterator[IdentifyBatchResult]:
+    """
+    Identify the creatures in a batch of spooled images, yielding the result
+    of each image as soon as it is known. Identical images are identified
+    once, at most max_concurrency images are identified at a time, and images
+    of the same new creature share a single explanation. Spooled files that
+    are not stored as creature images are discarded once the batch ends.
+
+    Args:
+        db_engine (Engine): Database engine, each image gets its own session
+        images (list[tuple[str | None, SpooledFile]]): Filename and spooled file of each image
+        config (RunnableConfig): Agent configuration
+        max_concurrency (int): Maximum number of images identified at once
+
+    Yields:
+        IdentifyBatchResult: The creature or error of each image, in completion order
+    """
+    indices: dict[str, list[int]] = {}
+    unique_images: dict[str, SpooledFile] = {}
+    for index, (_, spooled) in enumerate(images):
+        indices.setdefault(spooled.sha256, []).append(index)
+        unique_images.setdefault(spooled.sha256, spooled)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def identify(image_hash: str, spooled: SpooledFile):
+        async with semaphore:
+            db_session = Session(db_engine, expire_on_commit=False)
+            try:
+                creature = await identify_from_spooled(db_session, spooled, config)
+                return image_hash, CreaturePublic.model_validate(creature), None
+            except HTTPException as e:
+                return image_hash, None, e.detail
+            except Exception as e:
+                logger.error(f"Failed to identify image {spooled.path}: {str(e)}")
+                return image_hash, None, "Failed to identify the image."
+            finally:
+                await run_db(db_session.close)
+
+    tasks = [
+        asyncio.create_task(identify(image_hash, spooled))
+        for image_hash, spooled in unique_images.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            image_hash, creature, error = await next_done
+            for index in indices[image_hash]:
+                yield IdentifyBatchResult(
+                    index=index,
+                    filename=images[index][0],
+                    creature=creature,
+                    error=error,
+                )
+    finally:
+        # Stop identifying when the client goes away
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for _, spooled in images:
+            await asyncio.to_thread(spooled.discard)
+
+
+async def _identify_image(
+    db_session: Session,
+    spooled: SpooledFile,
+    config: RunnableConfig,
+    on_stage: StageCallback | None = None,
+) -> Creature:
+    image_hash = spooled.sha256
+
+    # Re-uploads of the same image skip the scanner and explainer entirely
+    cached = await run_db(scan_cache.lookup, db_session, image_hash)
+    if cached is not None:
+        if cached.creature_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="No creature found in the image. Please try again with a different image.",
+            )
+        logger.info(f"Returning cached scan result for image {image_hash}")
+        return await run_db(get, db_session, cached.creature_id)
+
+    # Only images that miss the cache are loaded into memory
+    image_buffer = await asyncio.to_thread(spooled.read)
+
+    # Near-duplicates of stored images (resized, recompressed) skip the scanner too
+    phash = None
+    if image_index.enabled:
+        phash = await asyncio.to_thread(compute_phash, image_buffer)
+    similar_creature_id = image_index.nearest(phash)
+    if similar_creature_id is not None:
+        similar_creature = await run_db(get, db_session, similar_creature_id)
+        if similar_creature:
+            logger.info(
+                f"Image matches stored image of creature {similar_creature.name}. Returning existing creature."
+            )
+            await run_db(scan_cache.store, db_session, image_hash, similar_creature.id)
+            return similar_creature
+
     # Scan the image using the scanner agent
-    scanner_agent = get_agent("scanner-agent")
+    settings = get_settings()
+    scanner_agent = get_agent("fused-scanner-agent" if settings.fused_scan else "scanner-agent")
 
-    image_buffer = await image.read()
+    speculative = settings.speculative_explain and not settings.fused_scan
 
-    # scanner_agent.ainvoke returns a dict, not a ScannerState instance
-    scanner_result = await scanner_agent.ainvoke({"image": image_buffer}, config)
-    creature_name = scanner_result["creature_name"]
+    await _report_stage(on_stage, IdentifyStage.SCANNING)
+    explanation = None
+    if speculative or on_stage is not None:
+        creature_name, explanation = await _stream_scan(
+            db_session, scanner_agent, image_buffer, config, speculative, on_stage
+        )
+    else:
+        # scanner_agent.ainvoke returns a dict, not a ScannerState instance
+        scanner_result = await scanner_agent.ainvoke({"image": image_buffer}, config)
+        creature_name = scanner_result["creature_name"]
 
     if creature_name is None:
+        await run_db(scan_cache.store, db_session, image_hash, None)
         raise HTTPException(
             status_code=400,
             detail="No creature found in the image. Please try again with a different image.",
         )
 
+    try:
+        # Concurrent requests for the same creature share a single explanation and insert
+        creature = await inflight.do(
+            ("name", normalize_creature_name(creature_name)),
+            lambda: _explain_and_save(
+                db_session, creature_name, spooled, phash, config, explanation, on_stage
+            ),
+        )
+    finally:
+        # The speculative explanation is unused if another request saved the creature
+        if explanation is not None:
+            _discard_task(explanation)
+
+    await run_db(scan_cache.store, db_session, image_hash, creature.id)
+    return creature
+
+
+async def _report_stage(on_stage: StageCallback | None, stage: IdentifyStage) -> None:
+    if on_stage is not None:
+        await on_stage(stage)
+
+
+async def _stream_scan(
+    db_session: Session,
+    scanner_agent: CompiledStateGraph,
+    image_buffer: bytes,
+    config: RunnableConfig,
+    speculative: bool = False,
+    on_stage: StageCallback | None = None,
+) -> tuple[str | None, asyncio.Task | None]:
+    """
+    Run the scanner agent node by node, reporting when verification starts.
+    In speculative mode a new creature is explained as soon as the image has
+    been analyzed, overlapping the explainer with verification.
+
+    Args:
+        db_session (Session): Database session
+        scanner_agent (CompiledStateGraph): The scanner agent graph
+        image_buffer (bytes): The image to scan
+        config (RunnableConfig): Agent configuration
+        speculative (bool): Whether to start the explainer before verification
+        on_stage (StageCallback | None): Called as the scan enters each stage
+
+    Returns:
+        tuple[str | None, asyncio.Task | None]: The verified creature name and
+            the running explanation task, if one was started
+    """
+    creature_name = None
+    explanation = None
+    try:
+        async for update in scanner_agent.astream(
+            {"image": image_buffer}, config, stream_mode="updates"
+        ):
+            for node, node_update in update.items():
+                creature_name = (node_update or {}).get("creature_name")
+                if node != "analyze_image" or not creature_name:
+                    continue
+                await _report_stage(on_stage, IdentifyStage.VERIFYING)
+                if (
+                    speculative
+                    and ("name", normalize_creature_name(creature_name)) not in inflight
+                    and await run_db(get_by_name, db_session, creature_name) is None
+                ):
+                    logger.debug(f"Speculatively explaining creature {creature_name}")
+                    explanation = asyncio.create_task(_explain(creature_name, config))
+    except BaseException:
+        if explanation is not None:
+            _discard_task(explanation)
+        raise
+
+    if creature_name is None and explanation is not None:
+        logger.debug("Scan was not verified as a creature, cancelling explanation")
+        _discard_task(explanation)
+        explanation = None
+
+    return creature_name, explanation
+
+
+def _discard_task(task: asyncio.Task) -> None:
+    """
+    Cancel a task whose result is no longer needed. Any exception it still
+    ends with is retrieved so it is not reported as unhandled.
+    """
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def _explain(creature_name: str, config: RunnableConfig) -> CreatureExplanation:
+    explainer_agent = get_agent("explainer-agent")
+
+    # Get the creature details from the explainer agent
+    creature_details = await explainer_agent.ainvoke({"creature_name": creature_name}, config)
+
+    return creature_details["creature"]
+
+
+async def _explain_and_save(
+    db_session: Session,
+    creature_name: str,
+    spooled: SpooledFile,
+    phash: int | None,
+    config: RunnableConfig,
+    explanation: Awaitable[CreatureExplanation] | None = None,
+    on_stage: StageCallback | None = None,
+) -> Creature:
     # Check if the creature already exists
-    existing_creature = get_by_name(db_session, creature_name)
+    existing_creature = await run_db(get_by_name, db_session, creature_name)
 
     if existing_creature:
         # If it exists, return the existing creature
@@ -173,17 +517,22 @@ async def identify_from_image(
         )
         return existing_creature
 
-    # Save the image to the static directory
-    await image.seek(0)
-    file_path = await upload_file(image, upload_dir)
+    # Keep the spooled image in the static directory
+    file_path = await store_spooled(spooled)
+    dimensions = await asyncio.to_thread(image_dimensions, file_path)
+    image_metadata = ImageMetadata(
+        image_sha256=spooled.sha256,
+        image_size=spooled.size,
+        image_width=dimensions[0] if dimensions else None,
+        image_height=dimensions[1] if dimensions else None,
+    )
+    await asyncio.to_thread(generate_derivatives, file_path, spooled.sha256)
 
     try:
-        explainer_agent = get_agent("explainer-agent")
-
-        # Get the creature details from the explainer agent
-        creature_details = await explainer_agent.ainvoke({"creature_name": creature_name}, config)
-
-        creature_details: CreatureExplanation = creature_details["creature"]
+        await _report_stage(on_stage, IdentifyStage.EXPLAINING)
+        if explanation is None:
+            explanation = _explain(creature_name, config)
+        creature_details = await explanation
 
         # Create a new Creature object
         creature = CreatureCreate(
@@ -203,14 +552,44 @@ async def identify_from_image(
         logger.info(f"Adding new creature to the database: {creature.model_dump()}")
 
         # If it doesn't exist, create a new one and return it
-        return create(db_session, creature)
+        await _report_stage(on_stage, IdentifyStage.SAVING)
+        db_creature = await run_db(create, db_session, creature, phash, image_metadata)
+    except IntegrityError:
+        await run_db(remove_unreferenced_image, db_session, file_path)
+        # Another worker process inserted the same creature first
+        existing_creature = await run_db(get_by_name, db_session, creature_name)
+        if existing_creature is None:
+            raise
+        logger.info(f"Creature with name {creature_name} was added concurrently. Returning it.")
+        return existing_creature
     except Exception:
-        os.remove(file_path) # Clean up the uploaded file in case of error
+        await run_db(remove_unreferenced_image, db_session, file_path) # Clean up the uploaded file in case of error
         raise
 
+    return db_creature
+
+
+def _equals_ignoring_case(column: Any, value: str, dialect: str) -> ColumnElement[bool]:
+    """
+    Returns a case-insensitive equality filter. On SQLite it compares with the
+    NOCASE collation, which the NOCASE indexes of the column can answer.
+    """
+    if dialect == "sqlite":
+        return column.collate("NOCASE") == value
+    return func.lower(column) == value.lower()
+
+
+def _has_search_index(db_session: Session) -> bool:
+    return db_session.get_bind().dialect.name == "sqlite" and has_search_index(db_session)
+
+
+def _has_facet_summary(db_session: Session) -> bool:
+    return db_session.get_bind().dialect.name == "sqlite" and has_facet_summary(db_session)
+
 
 async def search_creatures(
     db_session: Session,
+    q: str = None,
     id: int = None,
     name: str = None,
     scientific_name: str = None,
@@ -224,32 +603,186 @@ async def search_creatures(
     weight_max: float = None,
     gender_ratio_min: float = None,
     gender_ratio_max: float = None,
-) -> list[Creature]:
+    sort: CreatureSort = None,
+    cursor: str = None,
+    limit: int = None,
+    fields: tuple[str, ...] = None,
+) -> Page:
     """
     Search for creatures based on various filters.
 
     Args:
         db_session (Session): Database session
+        q (str, optional): Free-text query over name, scientific name, family
+            and description, matching words as prefixes and ranking by relevance
         id (int, optional): Filter by creature ID
         name (str, optional): Filter by name
         scientific_name (str, optional): Filter by scientific name
-        kingdom (str, optional): Filter by kingdom
-        classification (str, optional): Filter by classification
-        family (str, optional): Filter by family
-        body_shape (str, optional): Filter by body shape
+        kingdom (str, optional): Filter by kingdom, ignoring case
+        classification (str, optional): Filter by classification, ignoring case
+        family (str, optional): Filter by family, ignoring case
+        body_shape (str, optional): Filter by body shape name or icon name
         height_min (float, optional): Minimum height filter
         height_max (float, optional): Maximum height filter
         weight_min (float, optional): Minimum weight filter
         weight_max (float, optional): Maximum weight filter
         gender_ratio_min (float, optional): Minimum gender ratio filter
         gender_ratio_max (float, optional): Maximum gender ratio filter
-    
+        sort (CreatureSort, optional): Sort order, by default by relevance
+            when searching with q and by ID otherwise
+        cursor (str, optional): Cursor of the page, from the previous page
+        limit (int, optional): Maximum number of creatures, None for all of them
+        fields (tuple[str, ...], optional): Public fields to select, from
+            parse_fields or ALL_FIELDS, to get rows of these columns instead
+            of Creature objects
+
     Returns:
-        list[Creature]: List of creatures matching the filters
+        Page: The creatures matching the filters and the cursor of the next page
+    """
+
+    query, rank = await _filtered_query(
+        db_session,
+        q=q,
+        id=id,
+        name=name,
+        scientific_name=scientific_name,
+        kingdom=kingdom,
+        classification=classification,
+        family=family,
+        body_shape=body_shape,
+        height_min=height_min,
+        height_max=height_max,
+        weight_min=weight_min,
+        weight_max=weight_max,
+        gender_ratio_min=gender_ratio_min,
+        gender_ratio_max=gender_ratio_max,
+    )
+    key = _search_key(sort, rank)
+    if fields is not None:
+        return await run_db(paginate_rows, select_fields(query, fields), key, cursor, limit)
+    return await run_db(paginate, query, key, cursor, limit)
+
+
+async def stream_creatures(
+    db_engine: Engine,
+    sort: CreatureSort = None,
+    cursor: str = None,
+    limit: int = None,
+    fields: tuple[str, ...] = ALL_FIELDS,
+    chunk_size: int = 500,
+    **filters,
+) -> AsyncIterator[list]:
     """
+    Stream the creatures matching the filters of search_creatures as rows,
+    in chunks read from the database as they are consumed, so the first
+    rows can be sent before the last ones are read. Every chunk is a short
+    keyset query resuming after the previous one, run on its own session,
+    so no connection, snapshot or worker thread is held while a slow
+    client catches up. Request sessions close before a streamed body is
+    sent.
 
+    Args:
+        db_engine (Engine): Database engine
+        sort (CreatureSort, optional): Sort order, by default by relevance
+            when searching with q and by ID otherwise
+        cursor (str, optional): Cursor to resume after, from a previous page
+        limit (int, optional): Maximum number of creatures, None for all of them
+        fields (tuple[str, ...]): Public fields to select
+        chunk_size (int): Rows read from the database at a time
+        **filters: Filters of search_creatures, all optional
+
+    Yields:
+        list: Chunks of creature rows
+
+    Raises:
+        InvalidCursorError: On the first iteration, if the cursor is invalid
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        db_session = Session(db_engine)
+        try:
+            query, rank = await _filtered_query(db_session, **filters)
+            key = _search_key(sort, rank)
+            chunk = await run_db(paginate_rows, select_fields(query, fields), key, cursor, size)
+        finally:
+            await run_db(db_session.close)
+        if chunk.items:
+            yield chunk.items
+        if chunk.next_cursor is None:
+            return
+        cursor = chunk.next_cursor
+        if remaining is not None:
+            remaining -= len(chunk.items)
+
+
+async def get_facets(db_session: Session, **filters) -> CreatureFacets:
+    """
+    Get the facet counts and numeric histograms of the catalogue, or of the
+    creatures matching the filters. The whole catalogue is read from the
+    counts the database keeps up to date; filtered facets are counted from
+    the matching creatures.
+
+    Args:
+        db_session (Session): Database session
+        **filters: Filters of search_creatures, all optional
+
+    Returns:
+        CreatureFacets: Counts per kingdom, classification, family and body
+            shape, and ranges and histograms of height, weight and gender ratio
+    """
+    if not any(value not in (None, "") for value in filters.values()):
+        if await run_db(_has_facet_summary, db_session):
+            return await run_db(summary_facets, db_session)
+
+    query, _ = await _filtered_query(db_session, **filters)
+    return await run_db(count_facets, query)
+
+
+def _search_key(sort: CreatureSort | None, rank: Any) -> SortKey:
+    if sort is None and rank is not None:
+        return relevance_key(rank)
+    return sort_key(sort or CreatureSort.ID)
+
+
+async def _filtered_query(
+    db_session: Session,
+    q: str = None,
+    id: int = None,
+    name: str = None,
+    scientific_name: str = None,
+    kingdom: str = None,
+    classification: str = None,
+    family: str = None,
+    body_shape: str = None,
+    height_min: float = None,
+    height_max: float = None,
+    weight_min: float = None,
+    weight_max: float = None,
+    gender_ratio_min: float = None,
+    gender_ratio_max: float = None,
+) -> tuple[Query, Any]:
+    """
+    Returns the query of the creatures matching the filters of
+    search_creatures, with the relevance rank column when searching the
+    full-text index.
+    """
     query = db_session.query(Creature)
     filters = []
+    rank = None
+
+    match_query = to_match_query(q) if q else None
+    if match_query is not None:
+        if await run_db(_has_search_index, db_session):
+            matches = search_matches(match_query)
+            query = query.join(matches, Creature.id == matches.c.id)
+            rank = matches.c.rank
+        else:
+            # Without the full-text index every word must appear in one of the fields
+            for word in search_words(q):
+                filters.append(
+                    or_(*(getattr(Creature, name).ilike(f"%{word}%") for name in SEARCH_COLUMNS))
+                )
 
     if id is not None:
         filters.append(Creature.id == id)
@@ -257,14 +790,16 @@ async def search_creatures(
         filters.append(Creature.name.ilike(f"%{name}%"))
     if scientific_name:
         filters.append(Creature.scientific_name.ilike(f"%{scientific_name}%"))
+    dialect = db_session.get_bind().dialect.name
     if kingdom:
-        filters.append(Creature.kingdom.ilike(f"%{kingdom}%"))
+        filters.append(_equals_ignoring_case(Creature.kingdom, kingdom, dialect))
     if classification:
-        filters.append(Creature.classification.ilike(f"%{classification}%"))
+        filters.append(_equals_ignoring_case(Creature.classification, classification, dialect))
     if family:
-        filters.append(Creature.family.ilike(f"%{family}%"))
+        filters.append(_equals_ignoring_case(Creature.family, family, dialect))
     if body_shape:
-        filters.append(Creature.body_shape.ilike(f"%{body_shape}%"))
+        shape = BodyShapeIcon.lookup(body_shape)
+        filters.append(Creature.body_shape == shape if shape is not None else false())
     if height_min is not None:
         filters.append(Creature.height >= height_min)
     if height_max is not None:
@@ -281,4 +816,4 @@ async def search_creatures(
     if filters:
         query = query.filter(and_(*filters))
 
-    return query.all()
\ No newline at end of file
+    return query, rank
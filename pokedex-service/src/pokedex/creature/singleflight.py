@@ -0,0 +1,56 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from loguru import logger
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key so that only one of them runs.
+    Callers arriving while a call is in flight await its outcome and receive
+    the same result (or exception) instead of doing the work again.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn unless a call with the same key is already in flight.
+
+        Args:
+            key (Hashable): Key identifying the work
+            fn (Callable[[], Awaitable[Any]]): Coroutine factory doing the work
+
+        Returns:
+            Any: The result of the (possibly shared) call
+        """
+        while (future := self._calls.get(key)) is not None:
+            logger.debug(f"Joining in-flight call for {key}")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Retry when the leader was cancelled rather than this caller
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
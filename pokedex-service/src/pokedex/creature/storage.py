@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import os
+import time
+
+from loguru import logger
+from sqlalchemy import Engine, func, select
+from sqlalchemy.orm import Session
+
+from pokedex.creature.models import Creature
+from pokedex.creature.utils import CHUNK_SIZE
+from pokedex.image.derivatives import generate_derivatives
+from pokedex.image.processing import image_dimensions
+
+
+def remove_unreferenced_image(db_session: Session, image_path: str) -> None:
+    """
+    Remove a stored image unless a creature still refers to it. Stored images
+    are content-addressed, so several creatures may share one file.
+
+    Args:
+        db_session (Session): Database session
+        image_path (str): Path of the image file
+    """
+    references = db_session.scalar(
+        select(func.count()).select_from(Creature).where(Creature.image_path == image_path)
+    )
+    if references:
+        return
+    try:
+        os.remove(image_path)
+    except FileNotFoundError:
+        pass
+
+
+def find_image_path(db_session: Session, sha256: str) -> str | None:
+    """
+    Returns the path of a stored image from its content hash, or None if no
+    creature refers to it.
+
+    Args:
+        db_session (Session): Database session
+        sha256 (str): Hex encoded SHA-256 of the image
+
+    Returns:
+        str | None: The path of the image
+    """
+    return db_session.scalar(
+        select(Creature.image_path).where(Creature.image_sha256 == sha256).limit(1)
+    )
+
+
+def backfill_images(db_session: Session, image_paths: list[str] | None = None) -> None:
+    """
+    Record the image metadata of creatures stored without it and generate
+    their image variants. Only those creatures are read, the missing
+    variants of the others are generated when first requested. This reads
+    their images, so run it off the event loop.
+
+    Args:
+        db_session (Session): Database session
+        image_paths (list[str] | None): Only backfill the creatures with
+            these images, all of them by default
+    """
+    query = select(Creature).where(Creature.image_sha256.is_(None))
+    if image_paths is not None:
+        query = query.where(Creature.image_path.in_(image_paths))
+    for creature in db_session.scalars(query).all():
+        try:
+            creature.image_sha256, creature.image_size = _hash_file(creature.image_path)
+        except OSError as e:
+            logger.warning(f"Could not read image {creature.image_path}: {str(e)}")
+            continue
+        dimensions = image_dimensions(creature.image_path)
+        if dimensions:
+            creature.image_width, creature.image_height = dimensions
+        db_session.commit()
+        generate_derivatives(creature.image_path, creature.image_sha256)
+
+
+def _hash_file(file_path: str) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def collect_orphaned_images(
+    db_session: Session, upload_dir: str, grace_seconds: float = 60 * 60
+) -> int:
+    """
+    Mark and sweep the upload directory: every file not referenced by a
+    creature is removed, along with empty shard directories. Files modified
+    within grace_seconds are kept so that uploads still being identified are
+    not swept from under them.
+
+    Args:
+        db_session (Session): Database session
+        upload_dir (str): Directory holding the stored images
+        grace_seconds (float): Minimum age of a file before it can be removed
+
+    Returns:
+        int: The number of removed files
+    """
+    referenced = {
+        os.path.abspath(image_path)
+        for image_path in db_session.scalars(select(Creature.image_path))
+    }
+    cutoff = time.time() - grace_seconds
+    root = os.path.abspath(upload_dir)
+
+    removed = 0
+    for directory, _, filenames in os.walk(root, topdown=False):
+        for filename in filenames:
+            file_path = os.path.join(directory, filename)
+            try:
+                if file_path in referenced or os.path.getmtime(file_path) > cutoff:
+                    continue
+                os.remove(file_path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+        if directory != root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass  # Not empty
+
+    if removed:
+        logger.info(f"Removed {removed} orphaned images from {upload_dir}")
+    return removed
+
+
+async def run_image_gc(
+    engine: Engine, upload_dir: str, interval_seconds: float, grace_seconds: float
+) -> None:
+    """
+    Periodically remove orphaned images until cancelled.
+
+    Args:
+        engine (Engine): Database engine
+        upload_dir (str): Directory holding the stored images
+        interval_seconds (float): Time between two collections
+        grace_seconds (float): Minimum age of a file before it can be removed
+    """
+
+    def collect():
+        with Session(engine) as session:
+            collect_orphaned_images(session, upload_dir, grace_seconds)
+
+    while True:
+        try:
+            await asyncio.to_thread(collect)
+        except Exception as e:
+            logger.error(f"Image garbage collection failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
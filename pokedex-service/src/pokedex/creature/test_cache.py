@@ -0,0 +1,147 @@
+import pytest
+
+from pokedex.creature.cache import ScanCache
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.models import Creature, ScanCacheEntry
+
+
+@pytest.fixture
+def stored_creature(db_session):
+    creature = Creature(
+        name="African Lion",
+        scientific_name="Panthera leo",
+        description="A large wild cat species found in Africa and India.",
+        gender_ratio=0.5,
+        kingdom="Animalia",
+        classification="Mammal",
+        family="Felidae",
+        height=1.2,
+        weight=190.0,
+        body_shape=BodyShapeIcon.QUADRUPED,
+        image_path="path/to/image.jpg",
+    )
+    db_session.add(creature)
+    db_session.commit()
+    db_session.refresh(creature)
+    return creature
+
+
+def test_lookup_miss(db_session):
+    """Test looking up an unknown image returns nothing."""
+    cache = ScanCache()
+
+    assert cache.lookup(db_session, "unknown") is None
+
+
+def test_store_and_lookup(db_session, stored_creature):
+    """Test a stored verdict is returned on lookup."""
+    cache = ScanCache()
+    cache.store(db_session, "hash", stored_creature.id)
+
+    entry = cache.lookup(db_session, "hash")
+
+    assert entry.creature_id == stored_creature.id
+
+
+def test_store_no_creature_verdict(db_session):
+    """Test a "no creature" verdict is cached."""
+    cache = ScanCache()
+    cache.store(db_session, "hash", None)
+
+    entry = cache.lookup(db_session, "hash")
+
+    assert entry is not None
+    assert entry.creature_id is None
+
+
+def test_lookup_expired(mocker, db_session, stored_creature):
+    """Test expired entries are dropped on lookup."""
+    cache = ScanCache(ttl_seconds=10)
+    mock_time = mocker.patch("pokedex.creature.cache.time.time")
+    mock_time.return_value = 1000.0
+    cache.store(db_session, "hash", stored_creature.id)
+
+    mock_time.return_value = 1011.0
+
+    assert cache.lookup(db_session, "hash") is None
+    assert db_session.get(ScanCacheEntry, "hash") is None
+
+
+def test_lookup_deleted_creature(db_session, stored_creature):
+    """Test entries pointing at a removed creature are treated as misses."""
+    cache = ScanCache()
+    cache.store(db_session, "hash", stored_creature.id)
+    db_session.delete(stored_creature)
+    db_session.commit()
+
+    assert cache.lookup(db_session, "hash") is None
+
+
+def test_evict_least_recently_used(mocker, db_session):
+    """Test the least recently used entries are evicted first."""
+    cache = ScanCache(max_entries=2, touch_interval_seconds=1, evict_interval_seconds=0)
+    mock_time = mocker.patch("pokedex.creature.cache.time.time")
+    for now, image_hash in enumerate(["a", "b"]):
+        mock_time.return_value = float(now)
+        cache.store(db_session, image_hash, None)
+
+    mock_time.return_value = 2.0
+    cache.lookup(db_session, "a")
+    mock_time.return_value = 3.0
+    cache.store(db_session, "c", None)
+
+    assert db_session.get(ScanCacheEntry, "a") is not None
+    assert db_session.get(ScanCacheEntry, "b") is None
+    assert db_session.get(ScanCacheEntry, "c") is not None
+
+
+def test_evict_throttled(mocker, db_session):
+    """Test eviction runs at most once per evict interval."""
+    cache = ScanCache(max_entries=1, evict_interval_seconds=60)
+    mock_time = mocker.patch("pokedex.creature.cache.time.time")
+    evict = mocker.spy(cache, "evict")
+    for now, image_hash in [(0.0, "a"), (30.0, "b"), (61.0, "c")]:
+        mock_time.return_value = now
+        cache.store(db_session, image_hash, None)
+
+    assert evict.call_count == 2
+    assert db_session.get(ScanCacheEntry, "c") is not None
+    assert db_session.get(ScanCacheEntry, "a") is None
+
+
+def test_invalidate_creature(db_session, stored_creature):
+    """Test invalidating a creature removes its cached verdicts."""
+    cache = ScanCache()
+    cache.store(db_session, "hash", stored_creature.id)
+
+    cache.invalidate_creature(db_session, stored_creature.id)
+    db_session.commit()
+
+    assert db_session.get(ScanCacheEntry, "hash") is None
+
+
+def test_disabled_cache(db_session):
+    """Test a disabled cache never stores or returns verdicts."""
+    cache = ScanCache(enabled=False)
+    cache.store(db_session, "hash", None)
+
+    assert cache.lookup(db_session, "hash") is None
+
+
+def test_lookup_throttles_access_time_writes(mocker, db_session, stored_creature):
+    """Test repeat hits within the touch interval do not write to the database."""
+    cache = ScanCache(touch_interval_seconds=60)
+    mock_time = mocker.patch("pokedex.creature.cache.time.time")
+    mock_time.return_value = 1000.0
+    cache.store(db_session, "hash", stored_creature.id)
+    commit = mocker.spy(db_session, "commit")
+
+    mock_time.return_value = 1030.0
+    cache.lookup(db_session, "hash")
+    commit.assert_not_called()
+    assert db_session.get(ScanCacheEntry, "hash").accessed_at == 1000.0
+
+    mock_time.return_value = 1061.0
+    cache.lookup(db_session, "hash")
+    commit.assert_called_once()
+    assert db_session.get(ScanCacheEntry, "hash").accessed_at == 1061.0
@@ -1,7 +1,15 @@
-from fastapi import UploadFile, HTTPException
+from fastapi import APIRouter, FastAPI, UploadFile, HTTPException
+from fastapi.testclient import TestClient
 import pytest
 
-from pokedex.creature.dependencies import validate_image
+from pokedex.config import Settings
+from pokedex.creature.dependencies import (
+    MULTIPART_OVERHEAD,
+    LimitedBodyRoute,
+    limit_body,
+    validate_image,
+    validate_images,
+)
 
 
 @pytest.fixture
@@ -56,3 +64,75 @@ async def test_validate_image_different_image_types():
         )
         result = await validate_image(mock_image)
         assert result == mock_image
+
+
+@pytest.mark.asyncio
+async def test_validate_images_too_many(mock_valid_image):
+    """Test validate_images rejects batches over the configured limit."""
+    settings = Settings(batch_max_images=1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await validate_images([mock_valid_image, mock_valid_image], settings)
+
+    assert exc_info.value.status_code == 422
+
+
+@pytest.fixture
+def limited_client(mocker):
+    mocker.patch(
+        "pokedex.creature.dependencies.get_settings",
+        return_value=Settings(max_upload_bytes=16),
+    )
+    received = []
+    router = APIRouter(route_class=LimitedBodyRoute)
+
+    @router.post("/upload")
+    @limit_body(lambda settings: settings.max_upload_bytes)
+    async def upload(file: UploadFile):
+        received.append(await file.read())
+        return {"size": len(received[-1])}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app), received
+
+
+def test_limited_body_accepts_small_uploads(limited_client):
+    """Test uploads within the limit reach the endpoint."""
+    client, received = limited_client
+
+    response = client.post("/upload", files={"file": ("test.jpg", b"image_data")})
+
+    assert response.status_code == 200
+    assert received == [b"image_data"]
+
+
+def test_limited_body_rejects_large_content_length(limited_client):
+    """Test requests declaring a larger body are rejected before it is parsed."""
+    client, received = limited_client
+    data = b"x" * (MULTIPART_OVERHEAD + 17)
+
+    response = client.post("/upload", files={"file": ("test.jpg", data)})
+
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_limited_body_rejects_large_chunked_body(limited_client):
+    """Test requests without a Content-Length are cut off once they grow too large."""
+    client, received = limited_client
+
+    def chunks():
+        yield b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"test.jpg\"\r\n\r\n"
+        for _ in range(MULTIPART_OVERHEAD // 1024 + 1):
+            yield b"x" * 1024
+        yield b"\r\n--boundary--\r\n"
+
+    response = client.post(
+        "/upload",
+        content=chunks(),
+        headers={"content-type": "multipart/form-data; boundary=boundary"},
+    )
+
+    assert response.status_code == 413
+    assert received == []
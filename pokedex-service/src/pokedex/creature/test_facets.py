@@ -0,0 +1,141 @@
+import pytest
+from sqlmodel import Session
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.facets import count_facets, create_facet_summary, summary_facets
+from pokedex.creature.models import Creature
+from pokedex.creature.search import create_search_index
+from pokedex.creature.service import get_facets
+
+
+def counts(facet) -> dict:
+    return {item.value: item.count for item in facet}
+
+
+def buckets(facet) -> list[tuple]:
+    return [(bucket.lower, bucket.upper, bucket.count) for bucket in facet.buckets]
+
+
+@pytest.fixture
+def facet_session(db_engine):
+    """Fixture to provide a session on a database maintaining facet counts."""
+    assert create_facet_summary(db_engine)
+    with Session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def add_creatures(make_creature):
+    """Fixture to provide a function adding a lion, a tiger and an eagle to a session."""
+
+    def add(session: Session) -> None:
+        session.add(make_creature("African Lion", height=120.0, weight=190.0, gender_ratio=1.0))
+        session.add(make_creature("Bengal Tiger", height=110.0, weight=220.0, gender_ratio=1.0))
+        session.add(
+            make_creature(
+                "Bald Eagle",
+                classification="Bird",
+                family="Accipitridae",
+                height=90.0,
+                weight=6.0,
+                gender_ratio=0.5,
+                body_shape=BodyShapeIcon.WINGED,
+            )
+        )
+        session.commit()
+
+    return add
+
+
+def test_create_facet_summary_counts_existing(db_engine, add_creatures):
+    """Test creatures stored before the summary was created are counted."""
+    with Session(db_engine) as session:
+        add_creatures(session)
+
+    assert create_facet_summary(db_engine)
+    assert create_facet_summary(db_engine)
+    with Session(db_engine) as session:
+        facets = summary_facets(session)
+
+    assert facets.total == 3
+    assert counts(facets.kingdom) == {"Animalia": 3}
+    assert [item.value for item in facets.classification] == ["Mammal", "Bird"]
+    assert counts(facets.body_shape) == {"bsi:quadruped": 2, "bsi:winged": 1}
+    assert buckets(facets.height) == [(50, 100, 1), (100, 200, 2)]
+    assert buckets(facets.weight) == [(1, 10, 1), (100, 1000, 2)]
+    assert (facets.weight.min, facets.weight.max) == (6.0, 220.0)
+
+
+def test_summary_matches_counting(facet_session, add_creatures):
+    """Test the maintained counts equal a count of the table after every change."""
+    add_creatures(facet_session)
+    assert summary_facets(facet_session) == count_facets(facet_session.query(Creature))
+
+    lion = facet_session.query(Creature).filter(Creature.name == "African Lion").one()
+    lion.family = "Pantheridae"
+    lion.height = 2500.0
+    lion.gender_ratio = 0.1
+    facet_session.commit()
+    facets = summary_facets(facet_session)
+    assert facets == count_facets(facet_session.query(Creature))
+    assert counts(facets.family) == {"Accipitridae": 1, "Felidae": 1, "Pantheridae": 1}
+    assert buckets(facets.height) == [(50, 100, 1), (100, 200, 1), (2000, None, 1)]
+    assert buckets(facets.gender_ratio)[0] == (None, 0.25, 1)
+
+    facet_session.delete(lion)
+    facet_session.commit()
+    facets = summary_facets(facet_session)
+    assert facets == count_facets(facet_session.query(Creature))
+    assert counts(facets.family) == {"Accipitridae": 1, "Felidae": 1}
+    assert facets.height.max == 110.0
+
+
+def test_summary_of_empty_catalogue(facet_session):
+    """Test an empty catalogue has no counts and no ranges."""
+    facets = summary_facets(facet_session)
+
+    assert facets.total == 0
+    assert facets.kingdom == []
+    assert facets.height.min is None
+    assert facets.height.buckets == []
+
+
+@pytest.mark.asyncio
+async def test_get_facets_filtered(facet_session, db_engine, add_creatures):
+    """Test filtered facets count only the matching creatures."""
+    assert create_search_index(db_engine)
+    add_creatures(facet_session)
+
+    facets = await get_facets(facet_session, classification="mammal", weight_min=200)
+    assert facets.total == 1
+    assert counts(facets.family) == {"Felidae": 1}
+    assert (facets.weight.min, facets.weight.max) == (220.0, 220.0)
+
+    facets = await get_facets(facet_session, q="eagle")
+    assert counts(facets.classification) == {"Bird": 1}
+
+    facets = await get_facets(facet_session, q=None, body_shape="unknown")
+    assert facets.total == 0
+
+
+@pytest.mark.asyncio
+async def test_get_facets_reads_summary(mocker, facet_session, add_creatures):
+    """Test unfiltered facets are read from the summary instead of counted."""
+    add_creatures(facet_session)
+    count = mocker.patch("pokedex.creature.service.count_facets")
+
+    facets = await get_facets(facet_session, q=None, kingdom="")
+
+    assert facets.total == 3
+    count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_facets_without_summary(db_session, add_creatures):
+    """Test facets are counted from the table when no summary is maintained."""
+    add_creatures(db_session)
+
+    facets = await get_facets(db_session)
+
+    assert facets.total == 3
+    assert counts(facets.classification) == {"Mammal": 2, "Bird": 1}
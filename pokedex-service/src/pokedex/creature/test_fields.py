@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.fields import (
+    ALL_FIELDS,
+    InvalidFieldsError,
+    dump_json,
+    parse_fields,
+    render_ndjson,
+    render_projection,
+)
+from pokedex.creature.models import Creature, CreaturePublic
+from pokedex.creature.service import get_page, search_creatures
+from pokedex.image.derivatives import derivative_url
+
+
+@pytest.fixture
+def stored_creature(db_session, make_creature):
+    """Fixture to store a creature with a known image hash."""
+    creature = make_creature("African Lion", image_sha256="ab" * 32)
+    db_session.add(creature)
+    db_session.commit()
+    db_session.expunge_all()
+    return creature
+
+
+def test_parse_fields():
+    """Test fieldsets are deduplicated, put in response order and include the ID."""
+    assert parse_fields(None) is None
+    assert parse_fields("thumbnail_url, name,name,") == ("name", "id", "thumbnail_url")
+    assert parse_fields("") == ("id",)
+    with pytest.raises(InvalidFieldsError, match="nope"):
+        parse_fields("name,nope")
+
+
+def test_get_page_selects_only_fields(db_session, stored_creature):
+    """Test only the columns of the requested fields are read, as rows."""
+    page = get_page(db_session, limit=10, fields=parse_fields("name,thumbnail_url"))
+
+    assert set(page.items[0]._fields) == {"id", "name", "image_sha256", "sort_value"}
+
+
+@pytest.mark.asyncio
+async def test_search_creatures_selects_only_fields(db_session, stored_creature):
+    """Test searches read only the columns of the requested fields too."""
+    page = await search_creatures(db_session, name="lion", fields=parse_fields("body_shape"))
+
+    assert set(page.items[0]._fields) == {"id", "body_shape"}
+
+
+def test_render_projection_matches_public_schema(db_session, stored_creature):
+    """Test rows of every field render as the full public creature would."""
+    creature = db_session.query(Creature).one()
+    rows = get_page(db_session, fields=ALL_FIELDS).items
+
+    assert json.loads(render_projection(rows, ALL_FIELDS)) == [
+        json.loads(CreaturePublic.model_validate(creature).model_dump_json())
+    ]
+
+
+def test_render_ndjson(db_session, stored_creature, make_creature):
+    """Test NDJSON has one creature per line."""
+    db_session.add(make_creature("Bengal Tiger"))
+    db_session.commit()
+    fields = parse_fields("name")
+    rows = get_page(db_session, fields=fields).items
+
+    lines = render_ndjson(rows, fields).decode().splitlines()
+
+    assert [json.loads(line)["name"] for line in lines] == ["African Lion", "Bengal Tiger"]
+
+
+def test_dump_json_without_orjson(mocker):
+    """Test the JSON encoder falls back to pydantic without orjson."""
+    value = [{"body_shape": BodyShapeIcon.QUADRUPED, "height": 120.0, "image_size": None}]
+    fast = dump_json(value)
+    mocker.patch("pokedex.creature.fields.orjson", None)
+
+    assert dump_json(value) == fast == b'[{"body_shape":"bsi:quadruped","height":120.0,"image_size":null}]'
+
+
+def test_render_projection(db_session, stored_creature):
+    """Test projected creatures carry only the requested fields, serialized as public."""
+    fields = parse_fields("body_shape,thumbnail_url,name")
+    page = get_page(db_session, fields=fields)
+
+    rows = json.loads(render_projection(page.items, fields))
+
+    assert rows == [
+        {
+            "id": page.items[0].id,
+            "name": "African Lion",
+            "body_shape": "bsi:quadruped",
+            "thumbnail_url": derivative_url("ab" * 32, "thumbnail"),
+        }
+    ]
@@ -0,0 +1,163 @@
+from io import BytesIO
+
+from PIL import Image
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.image_index import ImageIndex, compute_phash
+from pokedex.creature.models import Creature
+
+
+def test_compute_phash_invalid_image():
+    """Test compute_phash returns None for undecodable bytes."""
+    assert compute_phash(b"not an image") is None
+
+
+def test_nearest():
+    """Test nearest returns the closest creature within the distance."""
+    index = ImageIndex(max_distance=1)
+    index.add(1, 0b0000)
+    index.add(2, 0b1111)
+
+    assert index.nearest(0b0001) == 1
+    assert index.nearest(0b0110) is None
+    assert index.nearest(None) is None
+
+
+def test_add_replaces_previous_hash():
+    """Test adding a creature again replaces its hash."""
+    index = ImageIndex(max_distance=0)
+    index.add(1, 0b0000)
+    index.add(1, 0b1111)
+
+    assert index.nearest(0b0000) is None
+    assert index.nearest(0b1111) == 1
+    assert len(index) == 1
+
+
+def test_remove():
+    """Test removed creatures are no longer matched."""
+    index = ImageIndex()
+    index.add(1, 0b0000)
+
+    index.remove(1)
+
+    assert index.nearest(0b0000) is None
+
+
+def test_disabled_index():
+    """Test a disabled index never matches."""
+    index = ImageIndex(enabled=False)
+    index.add(1, 0b0000)
+
+    assert index.nearest(0b0000) is None
+
+
+def test_rebuild(tmp_path, db_session):
+    """Test rebuild hashes the stored image of every creature."""
+    image_path = tmp_path / "lion.png"
+    buffer = BytesIO()
+    Image.linear_gradient("L").save(buffer, format="PNG")
+    image_path.write_bytes(buffer.getvalue())
+
+    for name, path in [("African Lion", str(image_path)), ("Ghost", "missing.png")]:
+        db_session.add(
+            Creature(
+                name=name,
+                scientific_name="Panthera leo",
+                description="A large wild cat species found in Africa and India.",
+                gender_ratio=0.5,
+                kingdom="Animalia",
+                classification="Mammal",
+                family="Felidae",
+                height=1.2,
+                weight=190.0,
+                body_shape=BodyShapeIcon.QUADRUPED,
+                image_path=path,
+            )
+        )
+    db_session.commit()
+
+    index = ImageIndex()
+    index.rebuild(db_session)
+
+    assert len(index) == 1
+    assert index.nearest(compute_phash(buffer.getvalue())) == 1
+
+
+def test_rebuild_keeps_concurrent_changes(mocker, db_session):
+    """Test creatures added or removed while rebuilding are reflected afterwards."""
+    index = ImageIndex(max_distance=0)
+    index.add(7, 0b0011)
+
+    def hash_during_rebuild(image_path):
+        index.add(42, 0b1111)
+        index.remove(7)
+        return None
+
+    mocker.patch(
+        "pokedex.creature.image_index.compute_file_phash",
+        side_effect=hash_during_rebuild,
+    )
+    db_session.add(
+        Creature(
+            name="African Lion",
+            scientific_name="Panthera leo",
+            description="A large wild cat species found in Africa and India.",
+            gender_ratio=0.5,
+            kingdom="Animalia",
+            classification="Mammal",
+            family="Felidae",
+            height=1.2,
+            weight=190.0,
+            body_shape=BodyShapeIcon.QUADRUPED,
+            image_path="lion.png",
+        )
+    )
+    db_session.commit()
+
+    index.rebuild(db_session)
+
+    assert len(index) == 1
+    assert index.nearest(0b1111) == 42
+    assert index.nearest(0b0011) is None
+
+
+def test_overlapping_rebuilds(mocker, db_session):
+    """Test a rebuild started during another one keeps removals made meanwhile."""
+    index = ImageIndex(max_distance=0)
+    index.add(7, 0b0011)
+    rebuilding = []
+
+    def hash_during_rebuild(image_path):
+        if not rebuilding:
+            rebuilding.append(True)
+            index.rebuild(db_session)
+            index.remove(7)
+        return 0b1111
+
+    mocker.patch(
+        "pokedex.creature.image_index.compute_file_phash",
+        side_effect=hash_during_rebuild,
+    )
+    db_session.add(
+        Creature(
+            name="African Lion",
+            scientific_name="Panthera leo",
+            description="A large wild cat species found in Africa and India.",
+            gender_ratio=0.5,
+            kingdom="Animalia",
+            classification="Mammal",
+            family="Felidae",
+            height=1.2,
+            weight=190.0,
+            body_shape=BodyShapeIcon.QUADRUPED,
+            image_path="lion.png",
+        )
+    )
+    db_session.commit()
+
+    index.rebuild(db_session)
+
+    assert len(index) == 1
+    assert index.nearest(0b0011) is None
+    assert index._removed_during_rebuilds == {}
@@ -0,0 +1,216 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from pokedex.creature.enums import BodyShapeIcon, CreatureSort
+from pokedex.creature.models import Creature
+from pokedex.creature.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    sort_key,
+)
+from pokedex.creature.search import create_search_index
+from pokedex.creature.service import get_page, search_creatures, stream_creatures
+
+
+@pytest.fixture
+def catalogue(db_session):
+    """Fixture to provide a session on creatures sharing heights and weights."""
+    for index in range(10):
+        db_session.add(
+            Creature(
+                name=f"Creature {9 - index}",
+                scientific_name="Benchmarkus",
+                description="A creature.",
+                gender_ratio=0.5,
+                kingdom="Animalia",
+                classification="Mammal",
+                family="Testidae",
+                height=float(index % 3),
+                weight=float(index // 4),
+                body_shape=BodyShapeIcon.QUADRUPED,
+                image_path=f"/uploads/{index}.jpg",
+            )
+        )
+    db_session.commit()
+    return db_session
+
+
+def walk(session: Session, sort: CreatureSort, limit: int, fields=None) -> list[Creature]:
+    creatures, cursor = [], None
+    while True:
+        page = get_page(session, sort, cursor, limit, fields)
+        assert len(page.items) <= limit
+        creatures.extend(page.items)
+        if page.next_cursor is None:
+            return creatures
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize("sort", list(CreatureSort))
+@pytest.mark.parametrize("limit", [1, 3, 10])
+@pytest.mark.parametrize("fields", [None, ("name",)])
+def test_pages_follow_sort_order(catalogue, sort, limit, fields):
+    """Test walking the pages returns every creature once, in sort order with ties by ID."""
+    creatures = walk(catalogue, sort, limit, fields)
+
+    name = sort.value.lstrip("-")
+    expected = sorted(
+        catalogue.query(Creature).all(),
+        key=lambda creature: (getattr(creature, name), creature.id),
+        reverse=sort.value.startswith("-"),
+    )
+    assert [creature.id for creature in creatures] == [creature.id for creature in expected]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", [CreatureSort.ID, CreatureSort.HEIGHT_DESC])
+async def test_stream_follows_sort_order(db_engine, catalogue, sort):
+    """Test streaming returns every creature in chunks, in the order of the pages."""
+    chunks = [
+        chunk
+        async for chunk in stream_creatures(db_engine, sort=sort, fields=("name",), chunk_size=4)
+    ]
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    expected = [creature.id for creature in walk(catalogue, sort, 3)]
+    assert [row.id for chunk in chunks for row in chunk] == expected
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_after_cursor(db_engine, catalogue):
+    """Test streaming starts after the cursor and stops at the limit."""
+    page = get_page(catalogue, CreatureSort.NAME, None, 3)
+
+    chunks = stream_creatures(
+        db_engine, sort=CreatureSort.NAME, cursor=page.next_cursor, limit=2, fields=("name",)
+    )
+    rows = [row async for chunk in chunks for row in chunk]
+
+    assert [row.name for row in rows] == ["Creature 3", "Creature 4"]
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_each_chunk_afresh(db_engine, catalogue):
+    """Test every chunk is a new query, seeing what was written since the previous one."""
+    chunks = stream_creatures(db_engine, sort=CreatureSort.ID, fields=("name",), chunk_size=4)
+    first = await anext(chunks)
+    first_ids = [row.id for row in first]
+    later = catalogue.get(Creature, first_ids[-1] + 1)
+    catalogue.delete(later)
+    catalogue.add(Creature(**{**later.model_dump(exclude={"id"}), "name": "Latecomer"}))
+    catalogue.commit()
+
+    rows = [row async for chunk in chunks for row in chunk]
+
+    assert [row.name for row in rows][-1] == "Latecomer"
+    assert first_ids[-1] + 1 not in [row.id for row in rows]
+    assert len(first) + len(rows) == 10
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_invalid_cursor(db_engine, catalogue):
+    """Test an invalid cursor fails on the first chunk."""
+    with pytest.raises(InvalidCursorError):
+        await anext(stream_creatures(db_engine, cursor="nope", fields=("name",)))
+
+
+def test_last_page_has_no_cursor(catalogue):
+    """Test a page holding the remaining creatures has no next cursor."""
+    assert get_page(catalogue, CreatureSort.ID, None, 10).next_cursor is None
+    assert get_page(catalogue, CreatureSort.ID, None, 9).next_cursor is not None
+
+
+def test_pages_are_stable_under_inserts(catalogue):
+    """Test creatures inserted before the cursor do not shift the next page."""
+    first = get_page(catalogue, CreatureSort.NAME, None, 3)
+    catalogue.add(
+        Creature(
+            name="Aardvark",
+            scientific_name="Orycteropus afer",
+            description="An early creature.",
+            gender_ratio=0.5,
+            kingdom="Animalia",
+            classification="Mammal",
+            family="Orycteropodidae",
+            height=0.6,
+            weight=60.0,
+            body_shape=BodyShapeIcon.QUADRUPED,
+            image_path="/uploads/aardvark.jpg",
+        )
+    )
+    catalogue.commit()
+
+    second = get_page(catalogue, CreatureSort.NAME, first.next_cursor, 3)
+
+    assert [creature.name for creature in second.items] == [
+        "Creature 3",
+        "Creature 4",
+        "Creature 5",
+    ]
+
+
+def test_decode_cursor_rejects_invalid():
+    """Test malformed cursors and cursors of another sort order are rejected."""
+    height = sort_key(CreatureSort.HEIGHT)
+    cursor = encode_cursor(height, 1.5, 7)
+
+    assert decode_cursor(height, cursor) == (1.5, 7)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(sort_key(CreatureSort.WEIGHT), cursor)
+    for invalid in ["nope", "", encode_cursor(height, [1], 7), encode_cursor(height, 1.5, "7")]:
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(height, invalid)
+
+
+@pytest.mark.asyncio
+async def test_search_pages_by_relevance(db_engine):
+    """Test full-text results are paged in relevance order."""
+    create_search_index(db_engine)
+    with Session(db_engine) as session:
+        for index, description in enumerate(["tiger", "tiger tiger", "tiger tiger tiger", "lion"]):
+            session.add(
+                Creature(
+                    name=f"Creature {index}",
+                    scientific_name="Benchmarkus",
+                    description=description,
+                    gender_ratio=0.5,
+                    kingdom="Animalia",
+                    classification="Mammal",
+                    family="Testidae",
+                    height=1.0,
+                    weight=1.0,
+                    body_shape=BodyShapeIcon.QUADRUPED,
+                    image_path=f"/uploads/{index}.jpg",
+                )
+            )
+        session.commit()
+
+        first = await search_creatures(session, q="tiger", limit=2)
+        second = await search_creatures(session, q="tiger", cursor=first.next_cursor, limit=2)
+
+    assert [creature.name for creature in first.items] == ["Creature 2", "Creature 1"]
+    assert [creature.name for creature in second.items] == ["Creature 0"]
+    assert second.next_cursor is None
+
+
+@pytest.mark.parametrize("sort", list(CreatureSort))
+def test_pages_use_indexes(db_engine, catalogue, sort):
+    """Test every sort order reads a page from an index, without sorting."""
+    first = get_page(catalogue, sort, None, 3)
+    statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, context, executemany: statements.append(
+            (statement, parameters)
+        ),
+    )
+    get_page(catalogue, sort, first.next_cursor, 3)
+
+    statement, parameters = statements[-1]
+    plan = catalogue.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    details = " ".join(row[3] for row in plan)
+    assert "SEARCH creature" in details
+    assert "TEMP B-TREE" not in details
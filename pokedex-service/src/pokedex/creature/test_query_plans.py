@@ -0,0 +1,105 @@
+import itertools
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from pokedex.creature.enums import CreatureSort
+from pokedex.creature.search import create_search_index
+from pokedex.creature.service import search_creatures
+
+# Filters search_creatures can answer from an index, by the parameters they take
+# to do so. Combinations of up to three of them are checked; adding filters
+# to a combination only narrows the rows read through its index.
+INDEXED_FILTERS = {
+    "id": {"id": 1},
+    "q": {"q": "tiger"},
+    "kingdom": {"kingdom": "Animalia"},
+    "classification": {"classification": "mammal"},
+    "family": {"family": "Felidae"},
+    "body_shape": {"body_shape": "quadruped"},
+    "height": {"height_min": 1.0, "height_max": 2.0},
+    "weight": {"weight_min": 100.0, "weight_max": 200.0},
+    "gender_ratio": {"gender_ratio_min": 0.4, "gender_ratio_max": 0.6},
+}
+
+
+@pytest.fixture
+def plan_session(db_engine):
+    """Fixture to provide a session and the plans of the queries it runs."""
+    create_search_index(db_engine)
+    statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, context, executemany: statements.append(
+            (statement, parameters)
+        ),
+    )
+
+    async def plan(session: Session, **filters) -> str:
+        statements.clear()
+        await search_creatures(session, limit=100, **filters)
+        statement, parameters = statements[-1]
+        rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return " | ".join(row[3] for row in rows)
+
+    with Session(db_engine) as session:
+        yield session, plan
+
+
+def uses_index(plan: str) -> bool:
+    return (
+        "USING INDEX" in plan
+        or "USING COVERING INDEX" in plan
+        or "USING INTEGER PRIMARY KEY" in plan
+        or "VIRTUAL TABLE INDEX" in plan
+    ) and "SCAN creature " not in f"{plan} "
+
+
+@pytest.mark.asyncio
+async def test_every_filter_combination_uses_an_index(plan_session):
+    """Test combinations of the indexed filters are answered from an index."""
+    session, plan = plan_session
+    failures = []
+    for size in range(1, 4):
+        for combination in itertools.combinations(INDEXED_FILTERS, size):
+            filters = {}
+            for name in combination:
+                filters.update(INDEXED_FILTERS[name])
+            # Substring filters on the name are checked row by row on top
+            for extra in ({}, {"name": "lion"}):
+                query_plan = await plan(session, **filters, **extra)
+                if not uses_index(query_plan):
+                    failures.append(f"{combination} {extra}: {query_plan}")
+
+    assert failures == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters",
+    [{"height_min": 1.0}, {"weight_max": 200.0}, {"gender_ratio_min": 0.4}],
+)
+async def test_one_sided_range_reads_in_page_order(plan_session, filters):
+    """
+    Test a lone one-sided range either uses its index or, when the planner
+    expects it to match most rows, walks the primary key in page order and
+    stops at the end of the page instead of sorting.
+    """
+    session, plan = plan_session
+
+    query_plan = await plan(session, **filters)
+
+    assert uses_index(query_plan) or query_plan == "SCAN creature"
+
+
+@pytest.mark.asyncio
+async def test_sorted_range_needs_no_sort(plan_session):
+    """Test a range filter sorted by the same column reads the index in order."""
+    session, plan = plan_session
+
+    query_plan = await plan(session, height_min=1.0, sort=CreatureSort.HEIGHT)
+
+    assert "ix_creature_height" in query_plan
+    assert "TEMP B-TREE" not in query_plan
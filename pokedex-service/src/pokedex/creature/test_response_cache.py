@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+
+import pytest
+from sqlmodel import Session
+from starlette.requests import Request
+
+from pokedex.creature.response_cache import ResponseCache, etag_matches
+from pokedex.creature.version import create_version_triggers, get_catalogue_version
+
+
+def make_request(path: str = "/creature/", query: str = "", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request(
+        {"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers}
+    )
+
+
+@pytest.fixture
+def versioned_session(db_engine):
+    """Fixture to provide a session on a database with a catalogue version."""
+    assert create_version_triggers(db_engine)
+    with Session(db_engine, expire_on_commit=False) as session:
+        yield session
+
+
+class Renderer:
+    """Counts renders and returns a body per catalogue state."""
+
+    def __init__(self, body: bytes = b"[]", delay: float = 0.0):
+        self.body = body
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> tuple[bytes, dict[str, str]]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.body, {"X-Next-Cursor": "abc"}
+
+
+def test_writes_bump_version(versioned_session, make_creature):
+    """Test every insert, update and delete of a creature bumps the version."""
+    versions = [get_catalogue_version(versioned_session)]
+    creature = make_creature("African Lion")
+    versioned_session.add(creature)
+    versioned_session.commit()
+    versions.append(get_catalogue_version(versioned_session))
+    creature.weight = 200.0
+    versioned_session.add(creature)
+    versioned_session.commit()
+    versions.append(get_catalogue_version(versioned_session))
+    versioned_session.delete(creature)
+    versioned_session.commit()
+    versions.append(get_catalogue_version(versioned_session))
+
+    assert versions == [0, 1, 2, 3]
+
+
+def test_unversioned_catalogue(db_session):
+    """Test a database without the version row has no catalogue version."""
+    assert get_catalogue_version(db_session) is None
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, weak validators and wildcards."""
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+@pytest.mark.asyncio
+async def test_hit_and_not_modified(versioned_session):
+    """Test repeat reads are served from the cache and revalidate with a 304."""
+    cache = ResponseCache()
+    render = Renderer(b'[{"id":1}]')
+
+    first = await cache.respond(make_request(query="limit=1&sort=id"), versioned_session, render)
+    again = await cache.respond(make_request(query="sort=id&limit=1"), versioned_session, render)
+    etag = first.headers["ETag"]
+    not_modified = await cache.respond(
+        make_request(query="limit=1&sort=id", if_none_match=etag), versioned_session, render
+    )
+
+    assert render.calls == 1
+    assert first.status_code == again.status_code == 200
+    assert first.body == again.body == b'[{"id":1}]'
+    assert again.headers["ETag"] == etag
+    assert first.headers["X-Next-Cursor"] == "abc"
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["ETag"] == etag
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 1}
+
+
+@pytest.mark.asyncio
+async def test_etag_computed_once(mocker, versioned_session):
+    """Test the ETag is computed when a response is rendered, not on every hit."""
+    cache = ResponseCache()
+    sha256 = mocker.spy(hashlib, "sha256")
+
+    for _ in range(3):
+        response = await cache.respond(make_request(), versioned_session, Renderer(b"[]"))
+
+    assert sha256.call_count == 1
+    assert response.headers["ETag"] == f'"{hashlib.sha256(b"[]").hexdigest()[:32]}"'
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates(versioned_session, make_creature):
+    """Test a write to the catalogue invalidates the cached responses."""
+    cache = ResponseCache()
+    before = await cache.respond(make_request(), versioned_session, Renderer(b"[]"))
+
+    versioned_session.add(make_creature("African Lion"))
+    versioned_session.commit()
+    render = Renderer(b'[{"id":1}]')
+    after = await cache.respond(make_request(if_none_match=before.headers["ETag"]), versioned_session, render)
+
+    assert render.calls == 1
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_render_once(db_engine):
+    """Test concurrent misses of the same response share one render."""
+    create_version_triggers(db_engine)
+    cache = ResponseCache()
+    render = Renderer(delay=0.05)
+
+    async def read():
+        with Session(db_engine) as session:
+            return await cache.respond(make_request(), session, render)
+
+    responses = await asyncio.gather(*(read() for _ in range(5)))
+
+    assert render.calls == 1
+    assert {response.status_code for response in responses} == {200}
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(versioned_session):
+    """Test the cache keeps at most max_entries responses."""
+    cache = ResponseCache(max_entries=2)
+    render = Renderer()
+
+    for query in ["limit=1", "limit=2", "limit=1", "limit=3", "limit=1", "limit=2"]:
+        await cache.respond(make_request(query=query), versioned_session, render)
+
+    # limit=2 was evicted by limit=3, and read again
+    assert render.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_unversioned_still_revalidates(db_session):
+    """Test responses without a catalogue version render every time but keep their ETag."""
+    cache = ResponseCache()
+    render = Renderer()
+
+    first = await cache.respond(make_request(), db_session, render)
+    second = await cache.respond(make_request(if_none_match=first.headers["ETag"]), db_session, render)
+
+    assert render.calls == 2
+    assert second.status_code == 304
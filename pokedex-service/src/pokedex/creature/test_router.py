@@ -1,8 +1,31 @@
+import json
+
 from fastapi import HTTPException
 import pytest
 
-from pokedex.creature.models import Creature
-from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.models import (
+    Creature,
+    CreatureFacets,
+    CreaturePublic,
+    FacetCount,
+    IdentifyBatchResult,
+    ImportProgress,
+    ImportRowError,
+    NumericFacet,
+)
+from pokedex.creature.enums import BodyShapeIcon, CreatureSort, TransferFormat
+from pokedex.creature.fields import ALL_FIELDS
+from pokedex.creature.pagination import InvalidCursorError, Page
+from pokedex.creature.response_cache import response_cache
+from pokedex.resilience import CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Fixture to keep cached responses from leaking between tests."""
+    response_cache.clear()
+    yield
+    response_cache.clear()
 
 
 @pytest.fixture
@@ -44,9 +67,27 @@ def test_get_creature_success(mocker, test_client, mock_creature):
         "weight": 190.0,
         "body_shape": BodyShapeIcon.QUADRUPED.value,
         "image_path": "path/to/image.jpg",
+        "image_sha256": None,
+        "image_size": None,
+        "image_width": None,
+        "image_height": None,
+        "thumbnail_url": None,
+        "medium_url": None,
     }
 
 
+def test_get_creature_image_variants(mocker, test_client, mock_creature):
+    """Test creatures with a known image hash expose their variant URLs."""
+    mock_creature.image_sha256 = "abcdef"
+    mocker.patch("pokedex.creature.router.get", return_value=mock_creature)
+
+    response = test_client.get("/api/v1/creature/1")
+
+    assert response.status_code == 200
+    assert response.json()["thumbnail_url"].startswith("/media/thumbnail/ab/abcdef-")
+    assert response.json()["medium_url"].startswith("/media/medium/ab/abcdef-")
+
+
 def test_get_creature_not_found(mocker, test_client):
     """Test the get_creature endpoint with a non-existent creature ID."""
     mock_get = mocker.patch("pokedex.creature.router.get")
@@ -71,13 +112,29 @@ def test_get_creature_error(mocker, test_client):
     assert response.json() == {"detail": "Internal Server Error"}
 
 
+def test_get_creature_not_modified(mocker, test_client, mock_creature):
+    """Test the get_creature endpoint revalidates with its ETag."""
+    mock_get = mocker.patch("pokedex.creature.router.get")
+    mock_get.return_value = mock_creature
+
+    response = test_client.get("/api/v1/creature/1")
+    revalidated = test_client.get(
+        "/api/v1/creature/1", headers={"If-None-Match": response.headers["ETag"]}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
 def test_get_all_creatures(mocker, test_client, mock_creature):
     """Test the get_all_creatures endpoint with multiple creatures."""
-    mock_get_all = mocker.patch("pokedex.creature.router.get_all")
+    mock_get_all = mocker.patch("pokedex.creature.router.get_page")
     mock_creature_2 = mock_creature.model_copy()
     mock_creature_2.id = 2
     mock_creature_2.name = "African Elephant"
-    mock_get_all.return_value = [mock_creature, mock_creature_2]
+    mock_get_all.return_value = Page(items=[mock_creature, mock_creature_2])
 
     response = test_client.get("/api/v1/creature/")
 
@@ -87,12 +144,135 @@ def test_get_all_creatures(mocker, test_client, mock_creature):
     assert response.json()[0]["name"] == "African Lion"
     assert response.json()[1]["id"] == 2
     assert response.json()[1]["name"] == "African Elephant"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_all_creatures_next_page(mocker, test_client, mock_creature):
+    """Test the get_all_creatures endpoint links to the next page."""
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_page.return_value = Page(items=[mock_creature], next_cursor="abc")
+
+    response = test_client.get("/api/v1/creature/", params={"sort": "-height", "limit": 1})
+
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["Link"] == (
+        '<http://testserver/api/v1/creature/?sort=-height&limit=1&cursor=abc>; rel="next"'
+    )
+    mock_get_page.assert_called_once_with(mocker.ANY, CreatureSort.HEIGHT_DESC, None, 1, ALL_FIELDS)
+
+
+def test_get_all_creatures_next_page_per_host(mocker, test_client, mock_creature):
+    """Test cached pages link to the next page under the base URL of each request."""
+    mocker.patch("pokedex.creature.response_cache.get_catalogue_version", return_value=1)
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_page.return_value = Page(items=[mock_creature], next_cursor="abc")
+
+    first = test_client.get("/api/v1/creature/", params={"limit": 1}, headers={"Host": "one.example"})
+    second = test_client.get("/api/v1/creature/", params={"limit": 1}, headers={"Host": "two.example"})
+
+    assert first.headers["Link"] == '<http://one.example/api/v1/creature/?limit=1&cursor=abc>; rel="next"'
+    assert second.headers["Link"] == '<http://two.example/api/v1/creature/?limit=1&cursor=abc>; rel="next"'
+    mock_get_page.assert_called_once()
+
+
+def test_get_all_creatures_fields(mocker, test_client, mock_creature):
+    """Test the get_all_creatures endpoint returns only the requested fields."""
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_page.return_value = Page(items=[mock_creature])
+
+    response = test_client.get("/api/v1/creature/", params={"fields": "name,body_shape"})
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "name": "African Lion", "body_shape": "bsi:quadruped"}]
+    assert mock_get_page.call_args.args[4] == ("name", "body_shape", "id")
+
+
+def test_get_all_creatures_unknown_fields(mocker, test_client):
+    """Test the get_all_creatures endpoint rejects unknown fields."""
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+
+    response = test_client.get("/api/v1/creature/", params={"fields": "name,secret"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown fields: secret"}
+    mock_get_page.assert_not_called()
+
+
+def test_get_all_creatures_ndjson(mocker, test_client, mock_creature):
+    """Test the get_all_creatures endpoint streams NDJSON when asked to."""
+
+    async def chunks():
+        yield [mock_creature]
+        yield [mock_creature]
+
+    mock_stream = mocker.patch("pokedex.creature.router.stream_creatures")
+    mock_stream.return_value = chunks()
+
+    response = test_client.get(
+        "/api/v1/creature/",
+        params={"fields": "name", "limit": 2},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"name": "African Lion", "id": 1}
+    ] * 2
+    assert mock_stream.call_args.kwargs["limit"] == 2
+    assert mock_stream.call_args.kwargs["fields"] == ("name", "id")
+
+
+def test_search_creature_ndjson_invalid_cursor(mocker, test_client):
+    """Test an invalid cursor is rejected before the NDJSON stream starts."""
+
+    async def chunks():
+        raise InvalidCursorError("Invalid cursor")
+        yield
+
+    mock_stream = mocker.patch("pokedex.creature.router.stream_creatures")
+    mock_stream.return_value = chunks()
+
+    response = test_client.get(
+        "/api/v1/creature/search",
+        params={"q": "lion", "cursor": "nope"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+    assert mock_stream.call_args.kwargs["q"] == "lion"
+
+
+def test_get_all_creatures_page_size(mocker, test_client, mock_settings):
+    """Test the page size defaults to and is bounded by the settings."""
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_page.return_value = Page(items=[])
+
+    test_client.get("/api/v1/creature/")
+    test_client.get("/api/v1/creature/", params={"limit": 10**6})
+
+    assert mock_get_page.call_args_list[0].args[3] == mock_settings.page_size
+    assert mock_get_page.call_args_list[1].args[3] == mock_settings.max_page_size
+    assert test_client.get("/api/v1/creature/", params={"limit": 0}).status_code == 422
+
+
+def test_get_all_creatures_invalid_cursor(mocker, test_client):
+    """Test the get_all_creatures endpoint rejects invalid cursors."""
+    mock_get_page = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_page.side_effect = InvalidCursorError("Invalid cursor")
+
+    response = test_client.get("/api/v1/creature/", params={"cursor": "nope"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
 
 
 def test_get_all_creatures_empty(mocker, test_client):
     """Test the get_all_creatures endpoint with no creatures."""
-    mock_get_all = mocker.patch("pokedex.creature.router.get_all")
-    mock_get_all.return_value = []
+    mock_get_all = mocker.patch("pokedex.creature.router.get_page")
+    mock_get_all.return_value = Page(items=[])
 
     response = test_client.get("/api/v1/creature/")
 
@@ -102,7 +282,7 @@ def test_get_all_creatures_empty(mocker, test_client):
 
 def test_get_all_creatures_error(mocker, test_client):
     """Test the get_all_creatures endpoint when an error occurs."""
-    mock_get_all = mocker.patch("pokedex.creature.router.get_all")
+    mock_get_all = mocker.patch("pokedex.creature.router.get_page")
     mock_get_all.side_effect = HTTPException(
         status_code=500, detail="Internal Server Error"
     )
@@ -127,9 +307,25 @@ def test_identify_creature(mocker, test_client, mock_creature):
     assert response.json() == {
         **mock_creature.model_dump(),
         "body_shape": mock_creature.body_shape.value,
+        "thumbnail_url": None,
+        "medium_url": None,
     }
 
 
+def test_identify_creature_circuit_open(mocker, test_client):
+    """Test the identify_creature endpoint fails fast while the model backend is unhealthy."""
+    mock_identify = mocker.patch("pokedex.creature.router.identify_from_image")
+    mock_identify.side_effect = CircuitOpenError("http://model", retry_after=12.5)
+
+    response = test_client.post(
+        "/api/v1/creature/identify",
+        files={"image": ("lion.png", b"image_data", "image/png")},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
+
+
 def test_identify_creature_invalid_image(mocker, test_client):
     """Test the identify_creature endpoint with an invalid image."""
     mock_identify = mocker.patch("pokedex.creature.router.identify_from_image")
@@ -146,10 +342,60 @@ def test_identify_creature_invalid_image(mocker, test_client):
     }
 
 
+def test_identify_creature_batch(mocker, test_client, mock_creature):
+    """Test the batch endpoint streams one JSON line per image."""
+
+    async def identify_batch(db_engine, images, config, max_concurrency):
+        assert [filename for filename, _ in images] == ["one.png", "two.png"]
+        assert [spooled.read() for _, spooled in images] == [b"image_one", b"image_two"]
+        yield IdentifyBatchResult(index=1, filename="two.png", error="No creature found in the image.")
+        yield IdentifyBatchResult(
+            index=0, filename="one.png", creature=CreaturePublic.model_validate(mock_creature)
+        )
+
+    mocker.patch("pokedex.creature.router.identify_batch", identify_batch)
+
+    response = test_client.post(
+        "/api/v1/creature/identify/batch",
+        files=[
+            ("images", ("one.png", b"image_one", "image/png")),
+            ("images", ("two.png", b"image_two", "image/png")),
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {
+        "index": 1,
+        "filename": "two.png",
+        "creature": None,
+        "error": "No creature found in the image.",
+    }
+    assert lines[1]["index"] == 0
+    assert lines[1]["creature"]["name"] == mock_creature.name
+
+
+def test_identify_creature_batch_invalid_image(test_client):
+    """Test the batch endpoint rejects a batch containing a non-image file."""
+    response = test_client.post(
+        "/api/v1/creature/identify/batch",
+        files=[
+            ("images", ("one.png", b"image_one", "image/png")),
+            ("images", ("notes.txt", b"not an image", "text/plain")),
+        ],
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {
+        "detail": "File must be an image. Received content-type: text/plain"
+    }
+
+
 def test_search_creature_no_filters(mocker, test_client, mock_creature):
     """Test the search_creature endpoint with no filters."""
     mock_search = mocker.patch("pokedex.creature.router.search_creatures")
-    mock_search.return_value = [mock_creature]
+    mock_search.return_value = Page(items=[mock_creature])
 
     response = test_client.get("/api/v1/creature/search")
 
@@ -158,6 +404,8 @@ def test_search_creature_no_filters(mocker, test_client, mock_creature):
         {
             **mock_creature.model_dump(),
             "body_shape": mock_creature.body_shape.value,
+            "thumbnail_url": None,
+            "medium_url": None,
         }
     ]
     mock_search.assert_called_once()
@@ -166,9 +414,10 @@ def test_search_creature_no_filters(mocker, test_client, mock_creature):
 def test_search_creature_with_filters(mocker, test_client, mock_creature):
     """Test the search_creature endpoint with multiple filters."""
     mock_search = mocker.patch("pokedex.creature.router.search_creatures")
-    mock_search.return_value = [mock_creature]
+    mock_search.return_value = Page(items=[mock_creature])
 
     params = {
+        "q": "big cat",
         "name": "Lion",
         "scientific_name": "Panthera",
         "kingdom": "Animalia",
@@ -189,15 +438,47 @@ def test_search_creature_with_filters(mocker, test_client, mock_creature):
         {
             **mock_creature.model_dump(),
             "body_shape": mock_creature.body_shape.value,
+            "thumbnail_url": None,
+            "medium_url": None,
         }
     ]
     mock_search.assert_called_once()
+    assert mock_search.call_args.kwargs["q"] == "big cat"
+
+
+def test_search_creature_pagination(mocker, test_client, mock_creature):
+    """Test the search_creature endpoint passes the page and links to the next one."""
+    mock_search = mocker.patch("pokedex.creature.router.search_creatures")
+    mock_search.return_value = Page(items=[mock_creature], next_cursor="abc")
+
+    response = test_client.get(
+        "/api/v1/creature/search", params={"name": "Lion", "sort": "name", "cursor": "xyz", "limit": 5}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert 'name=Lion' in response.headers["Link"]
+    assert 'cursor=abc' in response.headers["Link"]
+    kwargs = mock_search.call_args.kwargs
+    assert (kwargs["sort"], kwargs["cursor"], kwargs["limit"]) == (CreatureSort.NAME, "xyz", 5)
+
+
+def test_search_creature_fields(mocker, test_client, mock_creature):
+    """Test the search_creature endpoint returns only the requested fields."""
+    mock_search = mocker.patch("pokedex.creature.router.search_creatures")
+    mock_search.return_value = Page(items=[mock_creature])
+
+    response = test_client.get("/api/v1/creature/search", params={"q": "lion", "fields": "name"})
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "name": "African Lion"}]
+    assert mock_search.call_args.kwargs["fields"] == ("name", "id")
 
 
 def test_search_creature_empty(mocker, test_client):
     """Test the search_creature endpoint returns empty list."""
     mock_search = mocker.patch("pokedex.creature.router.search_creatures")
-    mock_search.return_value = []
+    mock_search.return_value = Page(items=[])
 
     response = test_client.get("/api/v1/creature/search")
 
@@ -219,6 +500,34 @@ def test_search_creature_error(mocker, test_client):
     assert response.json() == {"detail": "Internal Server Error"}
 
 
+def test_get_creature_facets(mocker, test_client):
+    """Test the get_creature_facets endpoint passes the filters and returns the facets."""
+    mock_facets = mocker.patch("pokedex.creature.router.get_facets")
+    mock_facets.return_value = CreatureFacets(
+        total=1,
+        kingdom=[FacetCount(value="Animalia", count=1)],
+        classification=[FacetCount(value="Mammal", count=1)],
+        family=[FacetCount(value="Felidae", count=1)],
+        body_shape=[FacetCount(value="bsi:quadruped", count=1)],
+        height=NumericFacet(min=120.0, max=120.0),
+        weight=NumericFacet(min=190.0, max=190.0),
+        gender_ratio=NumericFacet(min=0.5, max=0.5),
+    )
+
+    response = test_client.get(
+        "/api/v1/creature/facets", params={"q": "lion", "height_min": 100}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["family"] == [{"value": "Felidae", "count": 1}]
+    assert "ETag" in response.headers
+    kwargs = mock_facets.call_args.kwargs
+    assert kwargs["q"] == "lion"
+    assert kwargs["height_min"] == 100
+    assert kwargs["kingdom"] is None
+
+
 def test_delete_creature_success(mocker, test_client):
     """Test the delete_creature endpoint with a valid creature ID."""
     mock_delete = mocker.patch("pokedex.creature.router.delete")
@@ -240,3 +549,104 @@ def test_delete_creature_not_found(mocker, test_client):
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Creature not found"}
+
+
+@pytest.mark.parametrize(
+    "format, media_type",
+    [(TransferFormat.NDJSON, "application/x-ndjson"), (TransferFormat.CSV, "text/csv")],
+)
+def test_export_creatures(mocker, test_client, mock_settings, format, media_type):
+    """Test the export endpoint streams the catalogue as an attachment."""
+
+    async def export_catalogue(db_engine, export_format, upload_dir, chunk_size):
+        assert export_format is format
+        assert upload_dir == mock_settings.upload_dir
+        yield b"first\n"
+        yield b"second\n"
+
+    mocker.patch("pokedex.creature.router.export_catalogue", export_catalogue)
+
+    response = test_client.get("/api/v1/creature/export", params={"format": format.value})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    assert f'filename="creatures.{format.value}"' in response.headers["content-disposition"]
+    assert response.text == "first\nsecond\n"
+
+
+def test_import_creatures(mocker, test_client):
+    """Test the import endpoint streams one progress report per line."""
+
+    async def import_catalogue(db_engine, file, format, upload_dir, batch_size, on_upserted):
+        assert format is TransferFormat.CSV
+        assert file.read() == b"name\nMew\n"
+        on_upserted(["/uploads/ab/cd/mew.jpg"])
+        yield ImportProgress(rows=1, rejected=1)
+        yield ImportProgress(
+            rows=1, rejected=1, done=True, errors=[ImportRowError(line=2, detail="invalid")]
+        )
+
+    mocker.patch("pokedex.creature.router.import_catalogue", import_catalogue)
+    mock_refresh = mocker.patch("pokedex.creature.router.schedule_image_refresh")
+
+    response = test_client.post(
+        "/api/v1/creature/import",
+        files={"file": ("creatures.csv", b"name\nMew\n", "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["done"] for line in lines] == [False, True]
+    assert lines[1]["errors"] == [{"line": 2, "detail": "invalid"}]
+    mock_refresh.assert_called_once_with(mocker.ANY, ["/uploads/ab/cd/mew.jpg"])
+
+
+def test_import_creature_images_invalid_archive(mocker, test_client):
+    """Test the image import endpoint rejects files that are not tarballs."""
+    mock_refresh = mocker.patch("pokedex.creature.router.schedule_image_refresh")
+
+    response = test_client.post(
+        "/api/v1/creature/import/images",
+        files={"archive": ("images.tar", b"not a tarball", "application/x-tar")},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid image archive")
+    mock_refresh.assert_not_called()
+
+
+def test_import_creature_images(mocker, test_client, mock_settings):
+    """Test the image import endpoint refreshes the extracted images only."""
+    mock_extract = mocker.patch(
+        "pokedex.creature.router.extract_images", return_value=["/uploads/ab/cd/mew.jpg"]
+    )
+    mock_refresh = mocker.patch("pokedex.creature.router.schedule_image_refresh")
+
+    response = test_client.post(
+        "/api/v1/creature/import/images",
+        files={"archive": ("images.tar", b"tarball", "application/x-tar")},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Imported 1 images"}
+    mock_extract.assert_called_once_with(mocker.ANY, mock_settings.upload_dir)
+    mock_refresh.assert_called_once_with(mocker.ANY, ["/uploads/ab/cd/mew.jpg"])
+
+
+@pytest.mark.parametrize(
+    "error", [ValueError("x.jpg is not the content-addressed path of an image"), OSError("No space left")]
+)
+def test_import_creature_images_rejected(mocker, test_client, error):
+    """Test images that cannot be extracted fail the image import with 400."""
+    mocker.patch("pokedex.creature.router.extract_images", side_effect=error)
+    mock_refresh = mocker.patch("pokedex.creature.router.schedule_image_refresh")
+
+    response = test_client.post(
+        "/api/v1/creature/import/images",
+        files={"archive": ("images.tar", b"tarball", "application/x-tar")},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Invalid image archive: {str(error)}"
+    mock_refresh.assert_not_called()
@@ -0,0 +1,100 @@
+import pytest
+from sqlmodel import Session
+
+from pokedex.creature.search import create_search_index, has_search_index, to_match_query
+from pokedex.creature.service import search_creatures
+
+
+async def names(session: Session, **filters) -> list[str]:
+    return [creature.name for creature in (await search_creatures(session, **filters)).items]
+
+
+@pytest.fixture
+def search_session(db_engine):
+    """Fixture to provide a session on a database with the full-text index."""
+    assert create_search_index(db_engine)
+    with Session(db_engine) as session:
+        yield session
+
+
+def test_to_match_query():
+    """Test free text becomes quoted prefix terms, dropping FTS5 syntax."""
+    assert to_match_query("Snow leo") == '"Snow"* "leo"*'
+    assert to_match_query('cat" OR "dog*') == '"cat"* "OR"* "dog"*'
+    assert to_match_query("  -*  ") is None
+
+
+@pytest.mark.asyncio
+async def test_create_search_index_indexes_existing(db_engine, make_creature):
+    """Test creatures stored before the index was created are searchable."""
+    with Session(db_engine) as session:
+        session.add(make_creature("African Lion"))
+        session.commit()
+
+    assert create_search_index(db_engine)
+    assert create_search_index(db_engine)
+    with Session(db_engine) as session:
+        assert has_search_index(session)
+        assert await names(session, q="afric") == ["African Lion"]
+
+
+@pytest.mark.asyncio
+async def test_search_prefix_and_diacritics(search_session, make_creature):
+    """Test words match as prefixes, ignoring case and diacritics."""
+    search_session.add(make_creature("Pokémon Trainer Pikachu", family="Mousidae"))
+    search_session.add(make_creature("African Lion"))
+    search_session.commit()
+
+    assert await names(search_session, q="pik") == ["Pokémon Trainer Pikachu"]
+    assert await names(search_session, q="POKEMON mous") == ["Pokémon Trainer Pikachu"]
+    assert await names(search_session, q="pik lion") == []
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_name_matches_first(search_session, make_creature):
+    """Test a match on the name ranks above matches in other fields."""
+    search_session.add(make_creature("Cave Bear", description="Lives near tigers."))
+    search_session.add(make_creature("Bengal Tiger"))
+    search_session.add(make_creature("Snow Leopard", scientific_name="Tigerus nivalis"))
+    search_session.commit()
+
+    assert await names(search_session, q="tiger") == ["Bengal Tiger", "Snow Leopard", "Cave Bear"]
+
+
+@pytest.mark.asyncio
+async def test_search_combines_with_filters(search_session, make_creature):
+    """Test the full-text query combines with the other filters."""
+    search_session.add(make_creature("Bengal Tiger", weight=220.0))
+    search_session.add(make_creature("Sumatran Tiger", weight=110.0))
+    search_session.commit()
+
+    assert await names(search_session, q="tiger", weight_max=150.0) == ["Sumatran Tiger"]
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_changes(search_session, make_creature):
+    """Test the triggers keep the index in sync with updates and deletes."""
+    creature = make_creature("Bengal Tiger")
+    search_session.add(creature)
+    search_session.commit()
+
+    creature.name = "Siberian Tiger"
+    search_session.add(creature)
+    search_session.commit()
+    assert await names(search_session, q="bengal") == []
+    assert await names(search_session, q="siber") == ["Siberian Tiger"]
+
+    search_session.delete(creature)
+    search_session.commit()
+    assert await names(search_session, q="tiger") == []
+
+
+@pytest.mark.asyncio
+async def test_search_without_index(db_session, make_creature):
+    """Test every word must appear in one of the fields without the index."""
+    db_session.add(make_creature("Bengal Tiger"))
+    db_session.add(make_creature("African Lion", family="Lionidae"))
+    db_session.commit()
+
+    assert await names(db_session, q="tig felid") == ["Bengal Tiger"]
+    assert await names(db_session, q="tig lionidae") == []
@@ -1,23 +1,59 @@
+import asyncio
+import gc
+import os
+import hashlib
+from uuid import uuid4
 from unittest.mock import AsyncMock, Mock
 
 import pytest
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.exc import IntegrityError
 
-from pokedex.creature.models import Creature, CreatureCreate, CreatureUpdate
+from pokedex.creature.models import Creature, CreatureCreate, CreatureUpdate, ImageMetadata
+from pokedex.creature.utils import SpooledFile
 from pokedex.creature.enums import BodyShapeIcon
 from pokedex.agent.explainer.schema import CreatureExplanation
 from pokedex.creature.service import (
     create,
     get,
     get_all,
-    get_all_with_pagination,
+    get_page,
     update,
     delete,
     get_by_name,
+    identify_batch,
     identify_from_image,
+    normalize_creature_name,
+    _discard_task,
 )
 
 
+@pytest.fixture(autouse=True)
+def mock_scan_cache(mocker):
+    scan_cache = mocker.patch("pokedex.creature.service.scan_cache")
+    scan_cache.lookup.return_value = None
+    return scan_cache
+
+
+def make_spooled(directory, contents: bytes) -> SpooledFile:
+    path = directory / f"{uuid4()}.jpg.part"
+    path.write_bytes(contents)
+    return SpooledFile(
+        path=str(path),
+        extension=".jpg",
+        sha256=hashlib.sha256(contents).hexdigest(),
+        size=len(contents),
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_spool_upload(mocker, tmp_path):
+    async def spool_upload(image, upload_dir, max_size=None):
+        return make_spooled(tmp_path, await image.read())
+
+    return mocker.patch("pokedex.creature.service.spool_upload", side_effect=spool_upload)
+
+
 @pytest.fixture
 def mock_creature():
     return Creature(
@@ -106,17 +142,18 @@ def test_get_all(mock_db_session, mock_creature):
     assert result[0] == mock_creature
 
 
-def test_get_all_with_pagination(mock_db_session, mock_creature):
-    """Test getting creatures with pagination."""
-    mock_query = mock_db_session.query.return_value
-    mock_query.offset.return_value.limit.return_value.all.return_value = [mock_creature]
+def test_get_page(mock_db_session, mock_creature):
+    """Test getting a page of creatures in a stable order."""
+    mock_ordered = mock_db_session.query.return_value.order_by.return_value
+    mock_ordered.add_columns.return_value.limit.return_value.all.return_value = [
+        (mock_creature, mock_creature.id)
+    ]
 
-    result = get_all_with_pagination(mock_db_session, skip=0, limit=10)
+    result = get_page(mock_db_session, limit=10)
 
-    mock_query.offset.assert_called_once_with(0)
-    mock_query.offset.return_value.limit.assert_called_once_with(10)
-    assert len(result) == 1
-    assert result[0] == mock_creature
+    mock_ordered.add_columns.return_value.limit.assert_called_once_with(11)
+    assert result.items == [mock_creature]
+    assert result.next_cursor is None
 
 
 def test_update(mock_db_session, mock_creature):
@@ -155,6 +192,7 @@ def test_get_by_name(mock_db_session, mock_creature):
 async def test_identify_from_image_existing(mocker, mock_db_session, mock_creature):
     """Test identifying an existing creature from image."""
     mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
     mock_db_session.query.return_value.filter.return_value.first.return_value = (
         mock_creature
     )
@@ -188,11 +226,10 @@ async def test_identify_from_image_existing(mocker, mock_db_session, mock_creatu
 async def test_identify_from_image_new(mocker, mock_db_session):
     """Test identifying a new creature from image."""
     mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
     mock_db_session.query.return_value.filter.return_value.first.return_value = None
 
-    mock_upload = mocker.patch(
-        "pokedex.creature.service.upload_file", new_callable=AsyncMock
-    )
+    mock_upload = mocker.patch("pokedex.creature.service.store_spooled", new_callable=AsyncMock)
     mock_upload.return_value = "new/image/path.jpg"
 
     # Mock the scanner agent to return a valid dict
@@ -243,33 +280,34 @@ async def test_identify_from_image_new(mocker, mock_db_session):
 @pytest.mark.asyncio
 async def test_search_creatures_no_filters(mock_db_session, mock_creature):
     """Test search_creatures with no filters returns all creatures."""
-    mock_db_session.query.return_value.all.return_value = [mock_creature]
+    mock_ordered = mock_db_session.query.return_value.order_by.return_value
+    mock_ordered.all.return_value = [mock_creature]
     import pokedex.creature.service as service
 
     result = await service.search_creatures(mock_db_session)
-    assert result == [mock_creature]
+    assert result.items == [mock_creature]
     mock_db_session.query.assert_called_once_with(Creature)
-    mock_db_session.query.return_value.all.assert_called_once()
+    mock_ordered.all.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_search_creatures_name_filter(mock_db_session, mock_creature):
     """Test search_creatures with name filter."""
     mock_query = mock_db_session.query.return_value
-    mock_query.filter.return_value.all.return_value = [mock_creature]
+    mock_query.filter.return_value.order_by.return_value.all.return_value = [mock_creature]
     import pokedex.creature.service as service
 
     result = await service.search_creatures(mock_db_session, name="Lion")
-    assert result == [mock_creature]
+    assert result.items == [mock_creature]
     mock_query.filter.assert_called_once()
-    mock_query.filter.return_value.all.assert_called_once()
+    mock_query.filter.return_value.order_by.return_value.all.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_search_creatures_multiple_filters(mock_db_session, mock_creature):
     """Test search_creatures with multiple filters."""
     mock_query = mock_db_session.query.return_value
-    mock_query.filter.return_value.all.return_value = [mock_creature]
+    mock_query.filter.return_value.order_by.return_value.all.return_value = [mock_creature]
     import pokedex.creature.service as service
 
     result = await service.search_creatures(
@@ -287,16 +325,16 @@ async def test_search_creatures_multiple_filters(mock_db_session, mock_creature)
         gender_ratio_min=0.4,
         gender_ratio_max=0.6,
     )
-    assert result == [mock_creature]
+    assert result.items == [mock_creature]
     mock_query.filter.assert_called_once()
-    mock_query.filter.return_value.all.assert_called_once()
+    mock_query.filter.return_value.order_by.return_value.all.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_search_creatures_min_max_filters(mock_db_session, mock_creature):
     """Test search_creatures with only min/max filters."""
     mock_query = mock_db_session.query.return_value
-    mock_query.filter.return_value.all.return_value = [mock_creature]
+    mock_query.filter.return_value.order_by.return_value.all.return_value = [mock_creature]
     import pokedex.creature.service as service
 
     result = await service.search_creatures(
@@ -308,19 +346,490 @@ async def test_search_creatures_min_max_filters(mock_db_session, mock_creature):
         gender_ratio_min=0.4,
         gender_ratio_max=0.6,
     )
-    assert result == [mock_creature]
+    assert result.items == [mock_creature]
     mock_query.filter.assert_called_once()
-    mock_query.filter.return_value.all.assert_called_once()
+    mock_query.filter.return_value.order_by.return_value.all.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_search_creatures_no_results(mock_db_session):
     """Test search_creatures returns empty list if no match."""
     mock_query = mock_db_session.query.return_value
-    mock_query.filter.return_value.all.return_value = []
+    mock_query.filter.return_value.order_by.return_value.all.return_value = []
     import pokedex.creature.service as service
 
     result = await service.search_creatures(mock_db_session, name="NotFound")
-    assert result == []
+    assert result.items == []
     mock_query.filter.assert_called_once()
-    mock_query.filter.return_value.all.assert_called_once()
+    mock_query.filter.return_value.order_by.return_value.all.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_search_creatures_exact_filters(db_session, mock_creature):
+    """Test taxonomy and body shape filters match whole values, ignoring case."""
+    db_session.add(mock_creature)
+    db_session.commit()
+    import pokedex.creature.service as service
+
+    async def ids(**filters) -> list[int]:
+        page = await service.search_creatures(db_session, **filters)
+        return [creature.id for creature in page.items]
+
+    assert await ids(kingdom="animalia", classification="MAMMAL", family="Felidae") == [1]
+    assert await ids(family="Feli") == []
+    for body_shape in ["QUADRUPED", "quadruped", "bsi:quadruped"]:
+        assert await ids(body_shape=body_shape) == [1]
+    assert await ids(body_shape="bipedal") == []
+    assert await ids(body_shape="unknown") == []
+
+
+def test_body_shape_lookup():
+    """Test body shapes are found by name or icon name, ignoring case."""
+    assert BodyShapeIcon.lookup("bipedal-tail") is BodyShapeIcon.BIPEDAL_TAIL
+    assert BodyShapeIcon.lookup("BIPEDAL_TAIL") is BodyShapeIcon.BIPEDAL_TAIL
+    assert BodyShapeIcon.lookup(" bsi:Head ") is BodyShapeIcon.HEAD
+    assert BodyShapeIcon.lookup("bipedal tail") is None
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_cache_hit(
+    mocker, tmp_path, mock_db_session, mock_creature, mock_scan_cache
+):
+    """Test identifying a previously scanned image skips the agents and keeps no file."""
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_scan_cache.lookup.return_value = Mock(creature_id=mock_creature.id)
+    mock_db_session.get.return_value = mock_creature
+    mock_get_agent = mocker.patch("pokedex.creature.service.get_agent")
+
+    result = await identify_from_image(
+        mock_db_session, mock_image, "upload_dir", config={}
+    )
+
+    assert result == mock_creature
+    mock_get_agent.assert_not_called()
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_cached_no_creature(mocker, mock_db_session, mock_scan_cache):
+    """Test a cached "no creature" verdict is returned without scanning."""
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_scan_cache.lookup.return_value = Mock(creature_id=None)
+    mock_get_agent = mocker.patch("pokedex.creature.service.get_agent")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    assert exc_info.value.status_code == 400
+    mock_get_agent.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_no_creature_is_cached(mocker, mock_db_session, mock_scan_cache):
+    """Test a "no creature" scan result is stored in the cache."""
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_scanner_agent = Mock()
+    mock_scanner_agent.ainvoke = AsyncMock(
+        return_value={"image": b"fake", "creature_name": None}
+    )
+    mocker.patch("pokedex.creature.service.get_agent", return_value=mock_scanner_agent)
+
+    with pytest.raises(HTTPException):
+        await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    mock_scan_cache.store.assert_called_once_with(mock_db_session, mocker.ANY, None)
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_near_duplicate(mocker, mock_db_session, mock_creature, mock_scan_cache):
+    """Test a near-duplicate of a stored image returns its creature without scanning."""
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mocker.patch("pokedex.creature.service.compute_phash", return_value=0b1010)
+    mock_index = mocker.patch("pokedex.creature.service.image_index")
+    mock_index.nearest.return_value = mock_creature.id
+    mock_db_session.get.return_value = mock_creature
+    mock_get_agent = mocker.patch("pokedex.creature.service.get_agent")
+
+    result = await identify_from_image(
+        mock_db_session, mock_image, "upload_dir", config={}
+    )
+
+    assert result == mock_creature
+    mock_index.nearest.assert_called_once_with(0b1010)
+    mock_scan_cache.store.assert_called_once_with(mock_db_session, mocker.ANY, mock_creature.id)
+    mock_get_agent.assert_not_called()
+
+
+@pytest.fixture
+def mock_creature_explanation():
+    return CreatureExplanation(
+        scientific_name="Panthera leo",
+        description="A large wild cat species found in Africa and India.",
+        gender_ratio=0.5,
+        kingdom="Animalia",
+        classification="Mammal",
+        family="Felidae",
+        height=1.2,
+        weight=190.0,
+        body_shape=BodyShapeIcon.QUADRUPED,
+    )
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_concurrent_same_creature(
+    mocker, mock_db_session, mock_creature_explanation
+):
+    """Test concurrent uploads of the same creature run the explainer once."""
+    mock_db_session.query.return_value.filter.return_value.first.return_value = None
+    mock_upload = mocker.patch("pokedex.creature.service.store_spooled", new_callable=AsyncMock)
+    mock_upload.return_value = "new/image/path.jpg"
+
+    mock_scanner_agent = Mock()
+    mock_scanner_agent.ainvoke = AsyncMock(
+        return_value={"image": b"fake", "creature_name": "African Lion"}
+    )
+
+    async def explain(state, config):
+        await asyncio.sleep(0.01)
+        return {"creature_name": "African Lion", "creature": mock_creature_explanation}
+
+    mock_explainer_agent = Mock()
+    mock_explainer_agent.ainvoke = AsyncMock(side_effect=explain)
+    mocker.patch(
+        "pokedex.creature.service.get_agent",
+        side_effect=lambda name: mock_scanner_agent if name == "scanner-agent" else mock_explainer_agent,
+    )
+
+    images = []
+    for data in [b"photo one", b"photo two", b"photo two"]:
+        image = Mock(spec=UploadFile)
+        image.read = AsyncMock(return_value=data)
+        images.append(image)
+
+    results = await asyncio.gather(
+        *(identify_from_image(mock_db_session, image, "upload_dir", config={}) for image in images)
+    )
+
+    assert results[0] is results[1] is results[2]
+    assert mock_scanner_agent.ainvoke.await_count == 2
+    mock_explainer_agent.ainvoke.assert_awaited_once()
+    mock_db_session.add.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_lost_insert_race(
+    mocker, mock_db_session, mock_creature, mock_creature_explanation
+):
+    """Test a unique-name conflict on insert returns the concurrently added creature."""
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_db_session.query.return_value.filter.return_value.first.side_effect = [
+        None,
+        mock_creature,
+    ]
+    mock_db_session.commit.side_effect = IntegrityError("INSERT", {}, Exception())
+    mock_upload = mocker.patch("pokedex.creature.service.store_spooled", new_callable=AsyncMock)
+    mock_upload.return_value = "new/image/path.jpg"
+    mock_remove = mocker.patch("pokedex.creature.service.remove_unreferenced_image")
+
+    mock_agent = Mock()
+    mock_agent.ainvoke = AsyncMock(
+        side_effect=[
+            {"image": b"fake", "creature_name": "African Lion"},
+            {"creature_name": "African Lion", "creature": mock_creature_explanation},
+        ]
+    )
+    mocker.patch("pokedex.creature.service.get_agent", return_value=mock_agent)
+
+    result = await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    assert result == mock_creature
+    mock_remove.assert_called_once_with(mock_db_session, "new/image/path.jpg")
+
+
+@pytest.mark.asyncio
+async def test_identify_batch(mocker, tmp_path, db_engine, mock_creature_explanation):
+    """Test a batch identifies duplicates once and explains each new species once."""
+    mock_upload = mocker.patch("pokedex.creature.service.store_spooled", new_callable=AsyncMock)
+    mock_upload.return_value = "new/image/path.jpg"
+
+    names = {b"lion one": "African Lion", b"lion two": "African Lion", b"no creature": None}
+
+    async def scan(state, config):
+        await asyncio.sleep(0.01)
+        return {"image": state["image"], "creature_name": names[state["image"]]}
+
+    mock_scanner_agent = Mock()
+    mock_scanner_agent.ainvoke = AsyncMock(side_effect=scan)
+    mock_explainer_agent = Mock()
+    mock_explainer_agent.ainvoke = AsyncMock(
+        return_value={"creature_name": "African Lion", "creature": mock_creature_explanation}
+    )
+    mocker.patch(
+        "pokedex.creature.service.get_agent",
+        side_effect=lambda name: mock_scanner_agent if name == "scanner-agent" else mock_explainer_agent,
+    )
+
+    images = [
+        (f"{index}.jpg", make_spooled(tmp_path, data))
+        for index, data in enumerate([b"lion one", b"lion two", b"lion one", b"no creature"])
+    ]
+
+    results = [
+        result
+        async for result in identify_batch(db_engine, images, config={}, max_concurrency=2)
+    ]
+
+    results.sort(key=lambda result: result.index)
+    assert [result.filename for result in results] == ["0.jpg", "1.jpg", "2.jpg", "3.jpg"]
+    assert results[0].creature.name == "African Lion"
+    assert results[0].creature == results[1].creature == results[2].creature
+    assert results[3].creature is None
+    assert results[3].error.startswith("No creature found in the image.")
+    assert mock_scanner_agent.ainvoke.await_count == 3
+    mock_explainer_agent.ainvoke.assert_awaited_once()
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_identify_batch_error(mocker, tmp_path, db_engine):
+    """Test an unexpected failure is reported for its image without ending the batch."""
+    mocker.patch(
+        "pokedex.creature.service.identify_from_spooled",
+        side_effect=[RuntimeError("boom")],
+    )
+    images = [("lion.jpg", make_spooled(tmp_path, b"lion"))]
+
+    results = [result async for result in identify_batch(db_engine, images, config={})]
+
+    assert len(results) == 1
+    assert results[0].creature is None
+    assert results[0].error == "Failed to identify the image."
+
+
+def test_normalize_creature_name():
+    """Test names differing only in case and spacing normalize equally."""
+    assert normalize_creature_name("  African   Lion ") == normalize_creature_name("african lion")
+
+
+def mock_streaming_scanner(*updates):
+    async def astream(input, config, stream_mode):
+        for update in updates:
+            await asyncio.sleep(0)
+            yield update
+
+    scanner_agent = Mock()
+    scanner_agent.astream = astream
+    return scanner_agent
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_speculative(
+    mocker, mock_db_session, mock_creature_explanation
+):
+    """Test speculative mode explains a new creature while it is being verified."""
+    mock_settings = mocker.patch("pokedex.creature.service.get_settings").return_value
+    mock_settings.speculative_explain = True
+    mock_settings.fused_scan = False
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_db_session.query.return_value.filter.return_value.first.return_value = None
+    mock_upload = mocker.patch("pokedex.creature.service.store_spooled", new_callable=AsyncMock)
+    mock_upload.return_value = "new/image/path.jpg"
+
+    events = []
+    mock_scanner_agent = mock_streaming_scanner(
+        {"analyze_image": {"creature_name": "African Lion"}},
+        {"verify_creature": {"creature_name": "African Lion"}},
+    )
+
+    async def explain(state, config):
+        events.append("explain")
+        return {"creature_name": "African Lion", "creature": mock_creature_explanation}
+
+    mock_explainer_agent = Mock()
+    mock_explainer_agent.ainvoke = AsyncMock(side_effect=explain)
+    mocker.patch(
+        "pokedex.creature.service.get_agent",
+        side_effect=lambda name: mock_scanner_agent if name == "scanner-agent" else mock_explainer_agent,
+    )
+
+    result = await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    assert isinstance(result, Creature)
+    assert result.name == "African Lion"
+    mock_explainer_agent.ainvoke.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_speculative_not_a_creature(mocker, mock_db_session):
+    """Test speculative mode cancels the explainer when verification fails."""
+    mock_settings = mocker.patch("pokedex.creature.service.get_settings").return_value
+    mock_settings.speculative_explain = True
+    mock_settings.fused_scan = False
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_db_session.query.return_value.filter.return_value.first.return_value = None
+
+    explainer_cancelled = asyncio.Event()
+    mock_scanner_agent = mock_streaming_scanner(
+        {"analyze_image": {"creature_name": "Teapot"}},
+        {"verify_creature": {"creature_name": None}},
+    )
+
+    async def explain(state, config):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            explainer_cancelled.set()
+            raise
+
+    mock_explainer_agent = Mock()
+    mock_explainer_agent.ainvoke = AsyncMock(side_effect=explain)
+    mocker.patch(
+        "pokedex.creature.service.get_agent",
+        side_effect=lambda name: mock_scanner_agent if name == "scanner-agent" else mock_explainer_agent,
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    await asyncio.wait_for(explainer_cancelled.wait(), timeout=1)
+    assert exc_info.value.status_code == 400
+    mock_db_session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_speculative_existing(mocker, mock_db_session, mock_creature):
+    """Test speculative mode does not explain creatures already stored."""
+    mock_settings = mocker.patch("pokedex.creature.service.get_settings").return_value
+    mock_settings.speculative_explain = True
+    mock_settings.fused_scan = False
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_creature
+
+    mock_scanner_agent = mock_streaming_scanner(
+        {"analyze_image": {"creature_name": mock_creature.name}},
+        {"verify_creature": {"creature_name": mock_creature.name}},
+    )
+    mock_explainer_agent = Mock()
+    mock_explainer_agent.ainvoke = AsyncMock()
+    mocker.patch(
+        "pokedex.creature.service.get_agent",
+        side_effect=lambda name: mock_scanner_agent if name == "scanner-agent" else mock_explainer_agent,
+    )
+
+    result = await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    assert result == mock_creature
+    mock_explainer_agent.ainvoke.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_identify_from_image_fused_scan(mocker, mock_db_session, mock_creature):
+    """Test the fused scanner is used, without speculation, when fused_scan is on."""
+    mock_settings = mocker.patch("pokedex.creature.service.get_settings").return_value
+    mock_settings.fused_scan = True
+    mock_settings.speculative_explain = True
+    mock_image = Mock(spec=UploadFile)
+    mock_image.read = AsyncMock(return_value=b"fake")
+    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_creature
+
+    mock_scanner_agent = Mock()
+    mock_scanner_agent.ainvoke = AsyncMock(
+        return_value={"image": b"fake", "creature_name": mock_creature.name}
+    )
+    mock_get_agent = mocker.patch(
+        "pokedex.creature.service.get_agent", return_value=mock_scanner_agent
+    )
+
+    result = await identify_from_image(mock_db_session, mock_image, "upload_dir", config={})
+
+    assert result == mock_creature
+    mock_get_agent.assert_called_once_with("fused-scanner-agent")
+    mock_scanner_agent.ainvoke.assert_awaited_once()
+    mock_scanner_agent.astream.assert_not_called()
+
+
+def test_create_with_image_metadata(db_session, mock_creature_create):
+    """Test the stored image metadata is persisted with the creature."""
+    image = ImageMetadata(image_sha256="abcd", image_size=1234, image_width=40, image_height=30)
+
+    result = create(db_session, mock_creature_create, image=image)
+
+    db_session.expire_all()
+    stored = db_session.get(Creature, result.id)
+    assert stored.image_sha256 == "abcd"
+    assert stored.image_size == 1234
+    assert (stored.image_width, stored.image_height) == (40, 30)
+
+
+def test_delete_removes_image(db_session, tmp_path, mock_creature_create):
+    """Test deleting a creature removes its image unless another creature shares it."""
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(b"image")
+    first = create(db_session, mock_creature_create.model_copy(update={"image_path": str(image_path)}))
+    second = create(
+        db_session,
+        mock_creature_create.model_copy(update={"name": "Lion", "image_path": str(image_path)}),
+    )
+
+    delete(db_session, first.id)
+    assert image_path.exists()
+
+    delete(db_session, second.id)
+    assert not image_path.exists()
+
+
+def test_create_adds_to_image_index(mocker, mock_db_session, mock_creature_create):
+    """Test creating a creature hashes its stored image into the image index."""
+    mock_index = mocker.patch("pokedex.creature.service.image_index")
+    mock_file_phash = mocker.patch(
+        "pokedex.creature.service.compute_file_phash", return_value=0b1010
+    )
+
+    result = create(mock_db_session, mock_creature_create)
+
+    mock_file_phash.assert_called_once_with("path/to/image.jpg")
+    mock_index.add.assert_called_once_with(result.id, 0b1010)
+
+
+def test_create_with_known_phash(mocker, mock_db_session, mock_creature_create):
+    """Test a precomputed perceptual hash is used without re-reading the image."""
+    mock_index = mocker.patch("pokedex.creature.service.image_index")
+    mock_file_phash = mocker.patch("pokedex.creature.service.compute_file_phash")
+
+    result = create(mock_db_session, mock_creature_create, phash=0b0110)
+
+    mock_file_phash.assert_not_called()
+    mock_index.add.assert_called_once_with(result.id, 0b0110)
+
+
+@pytest.mark.asyncio
+async def test_discard_task_retrieves_failure():
+    """Test a task failing while being discarded does not report an unhandled exception."""
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+
+    async def fail_on_cancel():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            raise RuntimeError("explainer failed while cancelling")
+
+    task = asyncio.create_task(fail_on_cancel())
+    await asyncio.sleep(0)
+    _discard_task(task)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    del task
+    gc.collect()
+    loop.set_exception_handler(None)
+
+    assert unhandled == []
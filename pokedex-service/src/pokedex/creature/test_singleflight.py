@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from pokedex.creature.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_concurrent_calls():
+    """Test concurrent calls with the same key run the work once."""
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return object()
+
+    tasks = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert "key" in flight
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert results[0] is results[1] is results[2]
+    assert "key" not in flight
+
+
+@pytest.mark.asyncio
+async def test_do_different_keys():
+    """Test calls with different keys run independently."""
+    flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))
+    )
+
+    assert results == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_do_shares_exceptions():
+    """Test waiting callers receive the exception raised by the leader."""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        flight.do("key", work), flight.do("key", work), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert "key" not in flight
+
+
+@pytest.mark.asyncio
+async def test_do_retries_when_leader_cancelled():
+    """Test a waiting caller takes over when the leader is cancelled."""
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def blocking():
+        started.set()
+        await asyncio.Event().wait()
+
+    async def work():
+        return "done"
+
+    leader = asyncio.create_task(flight.do("key", blocking))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import time
+
+from PIL import Image
+
+from pokedex.creature.enums import BodyShapeIcon
+from pokedex.creature.models import Creature
+from pokedex.creature.storage import (
+    backfill_images,
+    collect_orphaned_images,
+    find_image_path,
+    remove_unreferenced_image,
+)
+
+
+def add_creature(db_session, name, image_path):
+    creature = Creature(
+        name=name,
+        scientific_name="Panthera leo",
+        description="A large wild cat species found in Africa and India.",
+        gender_ratio=0.5,
+        kingdom="Animalia",
+        classification="Mammal",
+        family="Felidae",
+        height=1.2,
+        weight=190.0,
+        body_shape=BodyShapeIcon.QUADRUPED,
+        image_path=image_path,
+    )
+    db_session.add(creature)
+    db_session.commit()
+    return creature
+
+
+def write_file(path, age_seconds=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"image")
+    mtime = time.time() - age_seconds
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_remove_unreferenced_image(db_session, tmp_path):
+    """Test an image is only removed once no creature refers to it."""
+    image_path = write_file(tmp_path / "ab" / "cd" / "abcd.jpg")
+    add_creature(db_session, "African Lion", image_path)
+
+    remove_unreferenced_image(db_session, image_path)
+    assert os.path.exists(image_path)
+
+    remove_unreferenced_image(db_session, write_file(tmp_path / "other.jpg"))
+    assert not os.path.exists(tmp_path / "other.jpg")
+
+
+def test_remove_unreferenced_image_missing_file(db_session, tmp_path):
+    """Test removing an image that is already gone is a no-op."""
+    remove_unreferenced_image(db_session, str(tmp_path / "missing.jpg"))
+
+
+def test_collect_orphaned_images(db_session, tmp_path):
+    """Test orphaned images past the grace period are swept with their empty shards."""
+    referenced = write_file(tmp_path / "ab" / "cd" / "abcd.jpg", age_seconds=7200)
+    orphaned = write_file(tmp_path / "ef" / "01" / "ef01.jpg", age_seconds=7200)
+    legacy = write_file(tmp_path / "1234-uuid.jpg", age_seconds=7200)
+    stale_part = write_file(tmp_path / ".5678-uuid.jpg.part", age_seconds=7200)
+    recent = write_file(tmp_path / "99" / "88" / "9988.jpg")
+    add_creature(db_session, "African Lion", referenced)
+
+    removed = collect_orphaned_images(db_session, str(tmp_path), grace_seconds=3600)
+
+    assert removed == 3
+    assert os.path.exists(referenced)
+    assert os.path.exists(recent)
+    assert not os.path.exists(orphaned)
+    assert not os.path.exists(legacy)
+    assert not os.path.exists(stale_part)
+    assert not os.path.exists(tmp_path / "ef")
+    assert os.path.exists(tmp_path)
+
+
+def test_backfill_images(mocker, db_session, tmp_path):
+    """Test creatures stored without image metadata get it recorded along with their variants."""
+    image_path = tmp_path / "legacy.png"
+    Image.new("RGB", (40, 30), "orange").save(image_path, format="PNG")
+    legacy = add_creature(db_session, "African Lion", str(image_path))
+    missing = add_creature(db_session, "Lion", str(tmp_path / "missing.png"))
+    add_creature(db_session, "Cat", str(tmp_path / "unread.png")).image_sha256 = "ab" * 32
+    db_session.commit()
+    mock_generate = mocker.patch("pokedex.creature.storage.generate_derivatives")
+
+    backfill_images(db_session)
+
+    contents = image_path.read_bytes()
+    assert legacy.image_sha256 == hashlib.sha256(contents).hexdigest()
+    assert legacy.image_size == len(contents)
+    assert (legacy.image_width, legacy.image_height) == (40, 30)
+    assert missing.image_sha256 is None
+    mock_generate.assert_called_once_with(str(image_path), legacy.image_sha256)
+
+
+def test_find_image_path(db_session, tmp_path):
+    """Test stored images are found by their content hash."""
+    lion = add_creature(db_session, "African Lion", str(tmp_path / "lion.png"))
+    lion.image_sha256 = "ab" * 32
+    db_session.commit()
+
+    assert find_image_path(db_session, "ab" * 32) == str(tmp_path / "lion.png")
+    assert find_image_path(db_session, "cd" * 32) is None
@@ -0,0 +1,311 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+from PIL import Image
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from pokedex.creature.enums import BodyShapeIcon, TransferFormat
+from pokedex.creature.image_index import ImageIndex, compute_file_phash
+from pokedex.creature.models import Creature
+from pokedex.creature.transfer import (
+    export_catalogue,
+    export_images,
+    extract_images,
+    import_catalogue,
+    portable_path,
+    refresh_images,
+)
+from pokedex.creature.utils import content_path
+from pokedex.creature.version import create_version_triggers, get_catalogue_version
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    return str(directory)
+
+
+@pytest.fixture
+def catalogue(db_session, upload_dir, make_creature):
+    """Fixture to provide a session on creatures with images in the upload directory."""
+    for name, fields in [
+        ("Pikachu", dict(gender_ratio=1.0)),
+        ("Bulbasaur", dict(image_sha256="ab" * 32, image_size=3)),
+        ("Eevee", dict(body_shape=BodyShapeIcon.WINGED)),
+    ]:
+        image_path = os.path.join(upload_dir, "ab", "cd", f"{name.lower()}.jpg")
+        db_session.add(make_creature(name, image_path=image_path, **fields))
+    db_session.commit()
+    return db_session
+
+
+@pytest.fixture
+def target_engine():
+    """Fixture to provide an engine on a second, empty database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+async def export(db_engine, format: TransferFormat, upload_dir: str) -> bytes:
+    return b"".join(
+        [chunk async for chunk in export_catalogue(db_engine, format, upload_dir, chunk_size=2)]
+    )
+
+
+async def run_import(db_engine, data: bytes, format: TransferFormat, upload_dir: str, batch_size=2):
+    return [
+        progress
+        async for progress in import_catalogue(
+            db_engine, io.BytesIO(data), format, upload_dir, batch_size
+        )
+    ]
+
+
+def creatures(db_engine) -> list[dict]:
+    with Session(db_engine) as session:
+        return [
+            creature.model_dump(exclude={"id"})
+            for creature in session.exec(select(Creature).order_by(Creature.name))
+        ]
+
+
+def test_portable_path(upload_dir):
+    """Test image paths are made relative to the upload directory when inside it."""
+    assert portable_path(os.path.join(upload_dir, "ab", "x.jpg"), upload_dir) == "ab/x.jpg"
+    assert portable_path("/elsewhere/x.jpg", upload_dir) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format", list(TransferFormat))
+async def test_export_import_roundtrip(db_engine, catalogue, target_engine, upload_dir, format):
+    """Test an export imported into an empty catalogue reproduces every creature."""
+    data = await export(db_engine, format, upload_dir)
+
+    reports = await run_import(target_engine, data, format, upload_dir)
+
+    assert creatures(target_engine) == creatures(db_engine)
+    assert reports[-1].done
+    assert (reports[-1].rows, reports[-1].imported, reports[-1].rejected) == (3, 3, 0)
+
+
+@pytest.mark.asyncio
+async def test_export_has_relative_image_paths(db_engine, catalogue, upload_dir):
+    """Test exported creatures have no ID and image paths relative to the upload directory."""
+    lines = (await export(db_engine, TransferFormat.NDJSON, upload_dir)).splitlines()
+
+    first = json.loads(lines[0])
+    assert "id" not in first
+    assert first["name"] == "Pikachu"
+    assert first["image_path"] == "ab/cd/pikachu.jpg"
+    assert first["body_shape"] == BodyShapeIcon.QUADRUPED.value
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_header(db_engine, catalogue, upload_dir):
+    """Test CSV exports start with a header and leave missing values empty."""
+    lines = (await export(db_engine, TransferFormat.CSV, upload_dir)).decode().splitlines()
+
+    assert lines[0].startswith("name,scientific_name,description")
+    assert len(lines) == 4
+    assert lines[1].endswith(",,,,")
+
+
+@pytest.mark.asyncio
+async def test_import_updates_existing_by_name(db_engine, catalogue, upload_dir):
+    """Test imported creatures replace the ones with the same name and keep their ID."""
+    pikachu = catalogue.exec(select(Creature).where(Creature.name == "Pikachu")).one()
+    exported = json.loads((await export(db_engine, TransferFormat.NDJSON, upload_dir)).splitlines()[0])
+    data = json.dumps({**exported, "weight": 6.0}).encode()
+
+    await run_import(db_engine, data, TransferFormat.NDJSON, upload_dir)
+
+    catalogue.expire_all()
+    updated = catalogue.exec(select(Creature).where(Creature.name == "Pikachu")).one()
+    assert updated.id == pikachu.id
+    assert updated.weight == 6.0
+    assert len(creatures(db_engine)) == 3
+
+
+@pytest.mark.asyncio
+async def test_import_leaves_unchanged_creatures_alone(db_engine, catalogue, upload_dir):
+    """Test re-importing an export writes nothing, so the catalogue version stays the same."""
+    create_version_triggers(db_engine)
+    data = await export(db_engine, TransferFormat.NDJSON, upload_dir)
+    version = get_catalogue_version(catalogue)
+
+    reports = await run_import(db_engine, data, TransferFormat.NDJSON, upload_dir)
+
+    assert reports[-1].imported == 3
+    assert get_catalogue_version(catalogue) == version
+
+
+@pytest.mark.asyncio
+async def test_import_reports_upserted_images(db_engine, catalogue, upload_dir):
+    """Test the image paths of inserted and updated creatures are reported, not of unchanged ones."""
+    lines = (await export(db_engine, TransferFormat.NDJSON, upload_dir)).splitlines()
+    changed = json.dumps({**json.loads(lines[0]), "weight": 6.0}).encode()
+    added = json.dumps({**json.loads(lines[1]), "name": "Ivysaur", "image_path": "ef/01/ivysaur.jpg"}).encode()
+    upserted = []
+
+    async for _ in import_catalogue(
+        db_engine,
+        io.BytesIO(b"\n".join([changed, lines[1], lines[2], added])),
+        TransferFormat.NDJSON,
+        upload_dir,
+        batch_size=2,
+        on_upserted=upserted.append,
+    ):
+        pass
+
+    assert upserted == [
+        [os.path.join(upload_dir, "ab", "cd", "pikachu.jpg")],
+        [os.path.join(upload_dir, "ef", "01", "ivysaur.jpg")],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_reports_rejected_rows(db_engine, catalogue, target_engine, upload_dir):
+    """Test invalid rows are skipped and reported by line, while the others are imported."""
+    lines = (await export(db_engine, TransferFormat.NDJSON, upload_dir)).splitlines()
+    escaping = json.dumps({**json.loads(lines[1]), "image_path": "../../etc/passwd"}).encode()
+    data = b"\n".join([lines[0], b"{not json", b"", escaping, b'{"name": "Mew"}', lines[2]])
+
+    reports = await run_import(target_engine, data, TransferFormat.NDJSON, upload_dir)
+
+    assert [(report.rows, report.imported, report.done) for report in reports] == [
+        (2, 1, False),
+        (4, 1, False),
+        (5, 2, False),
+        (5, 2, True),
+    ]
+    errors = reports[-1].errors
+    assert [error.line for error in errors] == [2, 4, 5]
+    assert "Invalid JSON" in errors[0].detail
+    assert "upload directory" in errors[1].detail
+    assert "scientific_name: Field required" in errors[2].detail
+    assert [creature["name"] for creature in creatures(target_engine)] == ["Eevee", "Pikachu"]
+
+
+@pytest.mark.asyncio
+async def test_import_joins_image_paths_with_upload_dir(db_engine, catalogue, target_engine, upload_dir):
+    """Test relative image paths are stored within the upload directory of the importer."""
+    data = await export(db_engine, TransferFormat.NDJSON, upload_dir)
+    elsewhere = os.path.join(upload_dir, "restored")
+
+    await run_import(target_engine, data, TransferFormat.NDJSON, elsewhere)
+
+    assert creatures(target_engine)[0]["image_path"] == os.path.join(elsewhere, "ab", "cd", "bulbasaur.jpg")
+
+
+def store_image(upload_dir: str, contents: bytes) -> str:
+    file_path = content_path(upload_dir, hashlib.sha256(contents).hexdigest(), ".jpg")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(contents)
+    return file_path
+
+
+def write_archive(path, members: dict[str, bytes]) -> str:
+    with tarfile.open(path, "w") as tar:
+        for name, contents in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            tar.addfile(info, io.BytesIO(contents))
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_images_roundtrip(db_engine, catalogue, upload_dir, tmp_path):
+    """Test exported images are extracted at the same relative paths, missing ones skipped."""
+    for name in ("Pikachu", "Eevee"):
+        creature = catalogue.exec(select(Creature).where(Creature.name == name)).one()
+        creature.image_path = store_image(upload_dir, name.encode())
+    catalogue.commit()
+    archive = tmp_path / "images.tar"
+    archive.write_bytes(b"".join([chunk async for chunk in export_images(db_engine, upload_dir)]))
+
+    restored = tmp_path / "restored"
+    extracted = extract_images(str(archive), str(restored))
+
+    assert len(extracted) == 2
+    for name in (b"Pikachu", b"Eevee"):
+        restored_path = content_path(str(restored), hashlib.sha256(name).hexdigest(), ".jpg")
+        with open(restored_path, "rb") as f:
+            assert f.read() == name
+
+
+def test_extract_images_refuses_unsafe_members(tmp_path):
+    """Test members leading out of the upload directory are refused."""
+    archive = write_archive(tmp_path / "images.tar", {"../escaped.jpg": b"evil"})
+
+    with pytest.raises(tarfile.TarError):
+        extract_images(archive, str(tmp_path / "uploads"))
+    assert not (tmp_path / "escaped.jpg").exists()
+
+
+@pytest.mark.parametrize("name", ["ab/cd/pikachu.jpg", "pikachu.jpg", "x/y/{sha256}.jpg", "{sha256}.jpg"])
+def test_extract_images_refuses_other_names(tmp_path, name):
+    """Test members not named by the content-addressed path of an image are refused."""
+    sha256 = hashlib.sha256(b"image").hexdigest()
+    archive = write_archive(tmp_path / "images.tar", {name.format(sha256=sha256): b"image"})
+
+    with pytest.raises(ValueError):
+        extract_images(archive, str(tmp_path / "uploads"))
+    assert not [path for path in (tmp_path / "uploads").rglob("*") if path.is_file()]
+
+
+def test_extract_images_refuses_other_contents(tmp_path):
+    """Test members whose contents do not match the hash in their name are refused."""
+    name = content_path("", hashlib.sha256(b"image").hexdigest(), ".jpg")
+    archive = write_archive(tmp_path / "images.tar", {name: b"other"})
+
+    with pytest.raises(ValueError):
+        extract_images(archive, str(tmp_path / "uploads"))
+    assert not [path for path in (tmp_path / "uploads").rglob("*") if path.is_file()]
+
+
+def test_extract_images_keeps_stored_images(upload_dir, tmp_path):
+    """Test images already stored are not rewritten, only dated now."""
+    file_path = store_image(upload_dir, b"image")
+    os.utime(file_path, (1, 1))
+    archive = write_archive(tmp_path / "images.tar", {os.path.relpath(file_path, upload_dir): b"image"})
+
+    assert extract_images(archive, upload_dir) == []
+    assert os.path.getmtime(file_path) > 1
+
+
+def test_refresh_images(mocker, db_engine, catalogue, upload_dir):
+    """Test only the creatures with the given images are backfilled, given variants and indexed."""
+    index = ImageIndex()
+    mocker.patch("pokedex.creature.transfer.image_index", index)
+    mock_generate = mocker.patch("pokedex.creature.transfer.generate_derivatives")
+    mocker.patch("pokedex.creature.storage.generate_derivatives")
+    paths = {}
+    for name, color in [("Pikachu", "yellow"), ("Eevee", "brown")]:
+        image = io.BytesIO()
+        Image.new("RGB", (32, 32), color).save(image, format="PNG")
+        creature = catalogue.exec(select(Creature).where(Creature.name == name)).one()
+        creature.image_path = paths[name] = store_image(upload_dir, image.getvalue())
+    catalogue.commit()
+
+    refresh_images(db_engine, [paths["Pikachu"], paths["Pikachu"]])
+
+    catalogue.expire_all()
+    pikachu = catalogue.exec(select(Creature).where(Creature.name == "Pikachu")).one()
+    eevee = catalogue.exec(select(Creature).where(Creature.name == "Eevee")).one()
+    assert pikachu.image_sha256 is not None
+    assert eevee.image_sha256 is None
+    mock_generate.assert_called_once_with(paths["Pikachu"], pikachu.image_sha256)
+    assert len(index) == 1
+    assert index.nearest(compute_file_phash(paths["Pikachu"])) == pikachu.id
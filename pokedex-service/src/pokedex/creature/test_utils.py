@@ -1,10 +1,12 @@
 from io import BytesIO
+import hashlib
+import os
 from unittest.mock import patch
 
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 import pytest
 
-from pokedex.creature.utils import upload_file
+from pokedex.creature.utils import content_path, spool_upload, store_spooled, upload_file
 
 
 @pytest.fixture
@@ -17,20 +19,17 @@ def mock_valid_image():
 
 
 @pytest.mark.asyncio
-async def test_upload_file(mocker, mock_valid_image):
+async def test_upload_file(mocker, tmp_path, mock_valid_image):
     """Test upload_file with a valid image"""
     mock_uuid1 = mocker.patch("pokedex.creature.utils.uuid1")
     mock_uuid1.return_value = "random_uuid"
 
-    mock_make_dir = mocker.patch("os.makedirs")
-    mock_make_dir.return_value = None
-
-    with patch("pokedex.creature.utils.open") as mock_open:
-        mock_open.return_value = BytesIO()
-        image_path = await upload_file(mock_valid_image, "upload/dir/")
+    image_path = await upload_file(mock_valid_image, str(tmp_path))
 
-    assert image_path == "upload/dir/random_uuid.jpg"
-    mock_open.assert_called_once_with(image_path, "wb")
+    assert image_path == os.path.join(tmp_path, "random_uuid.jpg")
+    with open(image_path, "rb") as f:
+        assert f.read() == b"test_image_data"
+    assert os.listdir(tmp_path) == ["random_uuid.jpg"]
 
 
 @pytest.mark.asyncio
@@ -48,3 +47,66 @@ async def test_upload_file_error(mocker, mock_valid_image):
             await upload_file(mock_valid_image, "upload/dir/")
 
     assert str(exc_info.value) == "Failed to upload file: Error uploading file"
+
+
+@pytest.mark.asyncio
+async def test_spool_upload(mocker, tmp_path):
+    """Test spool_upload writes the upload in chunks and hashes it on the way."""
+    mocker.patch("pokedex.creature.utils.CHUNK_SIZE", 4)
+    contents = b"a larger test image"
+    image = UploadFile(filename="test.png", file=BytesIO(contents))
+
+    spooled = await spool_upload(image, str(tmp_path))
+
+    assert spooled.sha256 == hashlib.sha256(contents).hexdigest()
+    assert spooled.size == len(contents)
+    assert spooled.extension == ".png"
+    assert spooled.read() == contents
+
+    file_path = await store_spooled(spooled)
+    spooled.discard()
+
+    assert file_path == content_path(str(tmp_path), spooled.sha256, ".png")
+    with open(file_path, "rb") as f:
+        assert f.read() == contents
+    assert os.listdir(tmp_path) == [spooled.sha256[:2]]
+
+
+@pytest.mark.asyncio
+async def test_store_spooled_deduplicates(tmp_path):
+    """Test storing identical contents twice keeps a single file."""
+    paths = []
+    for filename in ["first.JPG", "second.jpg"]:
+        image = UploadFile(filename=filename, file=BytesIO(b"same image"))
+        paths.append(await store_spooled(await spool_upload(image, str(tmp_path))))
+
+    assert paths[0] == paths[1]
+    assert paths[0].endswith(".jpg")
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".part")] == []
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_too_large(mocker, tmp_path):
+    """Test spool_upload stops reading once the upload exceeds max_size."""
+    mocker.patch("pokedex.creature.utils.CHUNK_SIZE", 4)
+    image = UploadFile(filename="test.png", file=BytesIO(b"a larger test image"))
+    read = mocker.spy(image, "read")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await spool_upload(image, str(tmp_path), max_size=6)
+
+    assert exc_info.value.status_code == 413
+    assert read.call_count == 2
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_known_size_too_large(tmp_path, mock_valid_image):
+    """Test spool_upload rejects uploads with a known size before reading them."""
+    mock_valid_image.size = 100
+
+    with pytest.raises(HTTPException) as exc_info:
+        await spool_upload(mock_valid_image, str(tmp_path), max_size=10)
+
+    assert exc_info.value.status_code == 413
+    assert not os.path.exists(tmp_path / "test.jpg")
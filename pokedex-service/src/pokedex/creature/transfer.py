@@ -0,0 +1,429 @@
+import asyncio
+import csv
+from collections.abc import AsyncIterator, Callable, Iterator
+from enum import Enum
+import hashlib
+import io
+from itertools import islice
+import os
+import re
+import tarfile
+import threading
+from typing import IO, Any
+from uuid import uuid1
+
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import Engine, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from pokedex.creature.enums import CreatureSort, TransferFormat
+from pokedex.creature.fields import dump_json, project
+from pokedex.creature.image_index import compute_file_phash, image_index
+from pokedex.creature.models import Creature, CreatureTransfer, ImportProgress, ImportRowError
+from pokedex.creature.service import stream_creatures
+from pokedex.creature.storage import backfill_images
+from pokedex.creature.utils import CHUNK_SIZE, content_path
+from pokedex.database import run_db
+from pokedex.image.derivatives import generate_derivatives
+
+# Columns of exported and imported creatures, in file order
+TRANSFER_FIELDS = tuple(CreatureTransfer.model_fields)
+
+# Rejected rows listed in the final progress report, the others are counted
+MAX_REPORTED_ERRORS = 100
+
+# INSERT statements supporting ON CONFLICT DO UPDATE, per dialect
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# File name of a content-addressed image, its SHA-256 and extension
+_CONTENT_NAME = re.compile(r"([0-9a-f]{64})(\.[0-9a-z]+)?")
+
+# Image paths read from the database at a time when refreshing images
+REFRESH_BATCH_SIZE = 500
+
+# Image refreshes running after imports, referenced until they finish
+_refresh_tasks: set[asyncio.Task] = set()
+_refresh_lock = threading.Lock()
+
+
+def portable_path(image_path: str, upload_dir: str) -> str | None:
+    """
+    Returns an image path relative to the upload directory, or None if the
+    image is stored elsewhere.
+    """
+    root = os.path.abspath(upload_dir)
+    path = os.path.abspath(image_path)
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return os.path.relpath(path, root)
+
+
+def local_path(image_path: str, upload_dir: str) -> str:
+    """
+    Returns where an imported image path points in the upload directory.
+
+    Raises:
+        ValueError: If the path leads out of the upload directory
+    """
+    path = os.path.abspath(os.path.join(upload_dir, image_path))
+    if portable_path(path, upload_dir) is None:
+        raise ValueError("image_path: Must be inside the upload directory")
+    return path
+
+
+def export_row(row: Any, upload_dir: str) -> dict[str, Any]:
+    """
+    Returns a creature row as exported, with its image path relative to the
+    upload directory when the image is stored there.
+    """
+    values = project(row, TRANSFER_FIELDS)
+    values["image_path"] = portable_path(row.image_path, upload_dir) or row.image_path
+    return values
+
+
+def render_csv(rows: list[dict[str, Any]], header: bool = False) -> bytes:
+    """
+    Returns exported rows as CSV, empty cells standing for missing values.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, TRANSFER_FIELDS)
+    if header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow(
+            {
+                name: value.value if isinstance(value, Enum) else value
+                for name, value in row.items()
+            }
+        )
+    return buffer.getvalue().encode()
+
+
+async def export_catalogue(
+    db_engine: Engine, format: TransferFormat, upload_dir: str, chunk_size: int = 500
+) -> AsyncIterator[bytes]:
+    """
+    Stream the whole catalogue in ID order, reading it in chunks.
+
+    Args:
+        db_engine (Engine): Database engine
+        format (TransferFormat): NDJSON, one creature per line, or CSV with a header
+        upload_dir (str): Directory holding the stored images
+        chunk_size (int): Creatures read from the database at a time
+
+    Yields:
+        bytes: Chunks of the export
+    """
+    if format is TransferFormat.CSV:
+        yield render_csv([], header=True)
+    async for chunk in stream_creatures(
+        db_engine, sort=CreatureSort.ID, fields=TRANSFER_FIELDS, chunk_size=chunk_size
+    ):
+        rows = [export_row(row, upload_dir) for row in chunk]
+        if format is TransferFormat.CSV:
+            yield render_csv(rows)
+        else:
+            yield b"".join(dump_json(row) + b"\n" for row in rows)
+
+
+class _TarBuffer:
+    """
+    File object collecting what tarfile writes, taken out as it is streamed.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.data += data
+        return len(data)
+
+    def take(self) -> bytes:
+        data = bytes(self.data)
+        self.data.clear()
+        return data
+
+
+async def export_images(db_engine: Engine, upload_dir: str) -> AsyncIterator[bytes]:
+    """
+    Stream a tarball of the images of the catalogue, named by their path
+    relative to the upload directory as in catalogue exports. Images stored
+    elsewhere or missing are skipped.
+
+    Args:
+        db_engine (Engine): Database engine
+        upload_dir (str): Directory holding the stored images
+
+    Yields:
+        bytes: Chunks of the tarball
+    """
+
+    def image_paths() -> list[str]:
+        with Session(db_engine) as session:
+            return session.scalars(select(Creature.image_path).distinct()).all()
+
+    buffer = _TarBuffer()
+    tar = tarfile.open(fileobj=buffer, mode="w|")
+    for image_path in await run_db(image_paths):
+        name = portable_path(image_path, upload_dir)
+        if name is None:
+            logger.warning(f"Not exporting image {image_path} stored outside {upload_dir}")
+            continue
+        try:
+            await asyncio.to_thread(tar.add, image_path, name, recursive=False)
+        except OSError as e:
+            logger.warning(f"Could not export image {image_path}: {str(e)}")
+            continue
+        if buffer.data:
+            yield buffer.take()
+    tar.close()
+    yield buffer.take()
+
+
+def read_rows(file: IO[bytes], format: TransferFormat) -> Iterator[tuple[int, Any]]:
+    """
+    Returns the line number and raw contents of every row of an import:
+    the JSON text of NDJSON lines, or the non-empty cells of CSV rows.
+    """
+    if format is TransferFormat.CSV:
+        reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8", newline=""))
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if value}
+        return
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def validate_row(raw: Any, upload_dir: str) -> dict[str, Any]:
+    """
+    Returns the column values of an imported row.
+
+    Raises:
+        ValidationError: If the row is not a valid creature
+        ValueError: If its image path leads out of the upload directory
+    """
+    if isinstance(raw, dict):
+        creature = CreatureTransfer.model_validate(raw)
+    else:
+        creature = CreatureTransfer.model_validate_json(raw)
+    values = creature.model_dump()
+    values["image_path"] = local_path(creature.image_path, upload_dir)
+    return values
+
+
+def _error_detail(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+            for e in error.errors()
+        )
+    return str(error)
+
+
+def _read_batch(
+    rows: Iterator[tuple[int, Any]], batch_size: int, upload_dir: str
+) -> tuple[list[dict[str, Any]], list[ImportRowError], int]:
+    valid, errors, count = [], [], 0
+    for line, raw in islice(rows, batch_size):
+        count += 1
+        try:
+            valid.append(validate_row(raw, upload_dir))
+        except ValueError as e:
+            errors.append(ImportRowError(line=line, detail=_error_detail(e)))
+    return valid, errors, count
+
+
+def upsert_creatures(db_engine: Engine, rows: list[dict[str, Any]]) -> list[str]:
+    """
+    Insert creatures in one transaction, updating the ones whose name
+    already exists, with a single executemany of INSERT ... ON CONFLICT.
+    Unchanged creatures are left alone, so re-importing an export does not
+    rewrite their search index entries and facet counts.
+
+    Args:
+        db_engine (Engine): Database engine
+        rows (list[dict[str, Any]]): Column values of the creatures
+
+    Returns:
+        list[str]: The image paths of the inserted and updated creatures
+
+    Raises:
+        ValueError: If the database does not support upserts
+    """
+    insert = _UPSERTS.get(db_engine.dialect.name)
+    if insert is None:
+        raise ValueError(f"Bulk import is not supported on {db_engine.dialect.name}")
+
+    table = Creature.__table__
+    statement = insert(table)
+    columns = [name for name in TRANSFER_FIELDS if name != "name"]
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={name: statement.excluded[name] for name in columns},
+        where=or_(*(table.c[name].is_distinct_from(statement.excluded[name]) for name in columns)),
+    ).returning(table.c.image_path)
+    with db_engine.begin() as connection:
+        return connection.execute(statement, rows).scalars().all()
+
+
+async def import_catalogue(
+    db_engine: Engine,
+    file: IO[bytes],
+    format: TransferFormat,
+    upload_dir: str,
+    batch_size: int = 1000,
+    on_upserted: Callable[[list[str]], None] | None = None,
+) -> AsyncIterator[ImportProgress]:
+    """
+    Import creatures from an export, upserting them by name. Rows are read
+    and validated in batches off the event loop, and every batch of valid
+    rows is written in its own transaction. Invalid rows are skipped.
+
+    Args:
+        db_engine (Engine): Database engine
+        file (IO[bytes]): The export to import
+        format (TransferFormat): Format of the export
+        upload_dir (str): Directory the image paths are relative to
+        batch_size (int): Rows validated and written at a time
+        on_upserted (Callable[[list[str]], None], optional): Called after
+            every batch with the image paths of the creatures it inserted
+            or updated
+
+    Yields:
+        ImportProgress: Running totals after every batch, then the final
+            report with the first rejected rows
+    """
+    progress = ImportProgress()
+    errors: list[ImportRowError] = []
+    rows = read_rows(file, format)
+    while True:
+        valid, rejected, count = await asyncio.to_thread(_read_batch, rows, batch_size, upload_dir)
+        if not count:
+            break
+        if valid:
+            upserted = await run_db(upsert_creatures, db_engine, valid)
+            if on_upserted is not None:
+                on_upserted(upserted)
+        progress.rows += count
+        progress.imported += len(valid)
+        progress.rejected += len(rejected)
+        errors.extend(rejected[: MAX_REPORTED_ERRORS - len(errors)])
+        yield progress.model_copy()
+
+    logger.info(
+        f"Imported {progress.imported} creatures, rejected {progress.rejected} of {progress.rows} rows"
+    )
+    yield progress.model_copy(update={"done": True, "errors": errors})
+
+
+def extract_images(archive_path: str, upload_dir: str) -> list[str]:
+    """
+    Extract the images of a tarball from export_images into the upload
+    directory. Only regular files named by the content-addressed path of
+    their contents (see content_path) are accepted, so an archive can
+    neither lead out of the directory nor replace a stored image with other
+    contents, and images already stored are left alone. Extracted and
+    existing images are dated now, so the orphaned image collection leaves
+    them alone until the catalogue import referencing them is done.
+
+    Args:
+        archive_path (str): Path of the tarball
+        upload_dir (str): Directory holding the stored images
+
+    Returns:
+        list[str]: The paths of the extracted images
+
+    Raises:
+        tarfile.TarError: If the tarball is invalid or a member is unsafe
+        ValueError: If a member is not named after the hash of its contents
+        OSError: If an image cannot be written
+    """
+    root = os.path.abspath(upload_dir)
+    extracted = []
+    with tarfile.open(archive_path, mode="r:*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            member = tarfile.data_filter(member, root)
+            name = _CONTENT_NAME.fullmatch(os.path.basename(member.name))
+            if name is None or content_path("", *name.groups("")) != member.name:
+                raise ValueError(f"{member.name} is not the content-addressed path of an image")
+            file_path = os.path.join(root, member.name)
+            if os.path.exists(file_path):
+                os.utime(file_path)
+                continue
+            _extract_verified(tar, member, file_path, name.group(1))
+            extracted.append(file_path)
+    return extracted
+
+
+def _extract_verified(tar: tarfile.TarFile, member: tarfile.TarInfo, file_path: str, sha256: str) -> None:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f"{file_path}.{uuid1()}.part"
+    digest = hashlib.sha256()
+    try:
+        with tar.extractfile(member) as source, open(temp_path, "xb") as f:
+            while chunk := source.read(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+        if digest.hexdigest() != sha256:
+            raise ValueError(f"Contents of {member.name} do not match its hash")
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def refresh_images(db_engine: Engine, image_paths: list[str]) -> None:
+    """
+    Bring the image metadata, variants and near-duplicate index entries of
+    the creatures with the given images up to date after an import. Only
+    those creatures are read, a batch of paths at a time. Refreshes run one
+    at a time, and read the images, so run them off the event loop.
+
+    Args:
+        db_engine (Engine): Database engine
+        image_paths (list[str]): Images imported, or referenced by imported creatures
+    """
+    paths = list(dict.fromkeys(image_paths))
+    with _refresh_lock, Session(db_engine, expire_on_commit=False) as session:
+        for start in range(0, len(paths), REFRESH_BATCH_SIZE):
+            batch = paths[start : start + REFRESH_BATCH_SIZE]
+            backfill_images(session, batch)
+            phashes = {}
+            for creature_id, image_path, sha256 in session.execute(
+                select(Creature.id, Creature.image_path, Creature.image_sha256).where(
+                    Creature.image_path.in_(batch)
+                )
+            ):
+                if sha256 is not None:
+                    generate_derivatives(image_path, sha256)
+                if not image_index.enabled:
+                    continue
+                if image_path not in phashes:
+                    phashes[image_path] = compute_file_phash(image_path)
+                if phashes[image_path] is None:
+                    image_index.remove(creature_id)
+                else:
+                    image_index.add(creature_id, phashes[image_path])
+
+
+def schedule_image_refresh(db_engine: Engine, image_paths: list[str]) -> None:
+    """
+    Refresh the images in the background, see refresh_images.
+    """
+    if not image_paths:
+        return
+
+    async def refresh():
+        try:
+            await asyncio.to_thread(refresh_images, db_engine, image_paths)
+        except Exception as e:
+            logger.error(f"Image refresh after import failed: {str(e)}")
+
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
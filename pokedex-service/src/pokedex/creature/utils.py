@@ -1,39 +1,182 @@
+import asyncio
+from dataclasses import dataclass
+import hashlib
 import os
+import time
 from uuid import uuid1
 
 from loguru import logger
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 
+from pokedex.monitoring.metrics import IMAGE_BYTES, UPLOAD_DURATION
 
-async def upload_file(image: UploadFile, upload_dir: str) -> str:
+# Size of the chunks read from uploads while spooling them to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SpooledFile:
     """
-    Save an uploaded file to the storage directory.
+    An upload written to a temporary file next to its final location,
+    together with the content hash and size computed while writing it.
+    """
+
+    path: str
+    extension: str
+    sha256: str
+    size: int
+    stored: bool = False
+
+    def read(self) -> bytes:
+        """
+        Read the spooled contents. This blocks, so run it off the event loop.
+        """
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self) -> None:
+        """
+        Remove the temporary file unless it has been stored.
+        """
+        if self.stored:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(
+    image: UploadFile, upload_dir: str, max_size: int | None = None
+) -> SpooledFile:
+    """
+    Stream an uploaded file to a temporary file in the storage directory.
+    The upload is read once in chunks, hashed on the fly and rejected once
+    more than max_size bytes were read, or up front when its size is known.
+    Writes run in a worker thread. Starlette has already received the whole
+    request by then, routes bound its size beforehand with limit_body.
 
     Args:
         image (UploadFile): The uploaded file
         upload_dir (str): Directory path where the file will be saved
+        max_size (int | None): Maximum accepted size in bytes
 
     Returns:
-        str: The path where the file was saved
+        SpooledFile: The spooled file, to be stored or discarded by the caller
 
     Raises:
-        IOError: If there's an error reading the file or writing to disk
+        HTTPException: If the file is larger than max_size
     """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File is too large. The maximum size is {max_size} bytes.",
+    )
+    if max_size is not None and image.size is not None and image.size > max_size:
+        raise too_large
+
+    _, file_extension = os.path.splitext(image.filename or "")
+    temp_path = os.path.join(upload_dir, f".{uuid1()}{file_extension}.part")
+
+    # Ensure upload directory exists
+    os.makedirs(upload_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+    f = await asyncio.to_thread(open, temp_path, "xb")
     try:
-        # Read the file content
-        contents = await image.read()
+        try:
+            while chunk := await image.read(CHUNK_SIZE):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise too_large
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+    except BaseException:
+        await asyncio.to_thread(os.remove, temp_path)
+        UPLOAD_DURATION.labels("error").observe(time.perf_counter() - started)
+        raise
+
+    UPLOAD_DURATION.labels("success").observe(time.perf_counter() - started)
+    IMAGE_BYTES.labels("upload").observe(size)
+    return SpooledFile(
+        path=temp_path,
+        extension=file_extension,
+        sha256=digest.hexdigest(),
+        size=size,
+    )
+
+
+def content_path(directory: str, sha256: str, extension: str) -> str:
+    """
+    Returns the content-addressed path of a file, sharded by the first two
+    byte pairs of its hash (e.g. ab/cd/abcd...ef.jpg).
+
+    Args:
+        directory (str): Root directory of the store
+        sha256 (str): Hex encoded SHA-256 of the contents
+        extension (str): File extension including the dot
 
-        _, file_extension = os.path.splitext(image.filename)
-        file_path = os.path.join(upload_dir, str(uuid1()) + file_extension)
+    Returns:
+        str: The path of the file
+    """
+    return os.path.join(directory, sha256[:2], sha256[2:4], sha256 + extension.lower())
 
-        # Ensure upload directory exists
-        os.makedirs(upload_dir, exist_ok=True)
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
+async def store_spooled(spooled: SpooledFile) -> str:
+    """
+    Atomically move a spooled file to its content-addressed path in the same
+    directory. If identical contents are already stored, the existing file is
+    reused and the spooled copy removed.
 
+    Args:
+        spooled (SpooledFile): The spooled file
+
+    Returns:
+        str: The path where the file was saved
+    """
+    file_path = content_path(os.path.dirname(spooled.path), spooled.sha256, spooled.extension)
+
+    def store():
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(spooled.path)
+            # Refresh the modification time so the garbage collector spares it
+            os.utime(file_path)
+        else:
+            os.replace(spooled.path, file_path)
+
+    await asyncio.to_thread(store)
+    spooled.stored = True
+    return file_path
+
+
+async def upload_file(image: UploadFile, upload_dir: str, max_size: int | None = None) -> str:
+    """
+    Save an uploaded file to the storage directory.
+
+    Args:
+        image (UploadFile): The uploaded file
+        upload_dir (str): Directory path where the file will be saved
+        max_size (int | None): Maximum accepted size in bytes
+
+    Returns:
+        str: The path where the file was saved
+
+    Raises:
+        HTTPException: If the file is larger than max_size
+        IOError: If there's an error reading the file or writing to disk
+    """
+    try:
+        spooled = await spool_upload(image, upload_dir, max_size)
+        file_path = os.path.join(upload_dir, str(uuid1()) + spooled.extension)
+        await asyncio.to_thread(os.replace, spooled.path, file_path)
         return file_path
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
         raise IOError(f"Failed to upload file: {str(e)}") from e
@@ -0,0 +1,54 @@
+from loguru import logger
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from pokedex.creature.models import CatalogueVersion
+
+_bump = "UPDATE catalogueversion SET version = version + 1 WHERE id = 1"
+
+# Every write to the creature table, by any process, bumps the version in
+# the same transaction, so it is shared by every worker using the database
+VERSION_DDL = [
+    "INSERT OR IGNORE INTO catalogueversion (id, version) VALUES (1, 0)",
+    *(
+        f"CREATE TRIGGER IF NOT EXISTS catalogue_version_{event.lower()} "
+        f"AFTER {event} ON creature BEGIN {_bump}; END"
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ),
+]
+
+
+def create_version_triggers(engine: Engine) -> bool:
+    """
+    Create the catalogue version row and the triggers bumping it. Only
+    SQLite is supported; on other databases the catalogue has no version
+    and catalogue responses are not cached.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        bool: Whether the catalogue is versioned
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as connection:
+        for statement in VERSION_DDL:
+            connection.execute(text(statement))
+    return True
+
+
+def get_catalogue_version(db_session: Session) -> int | None:
+    """
+    Returns the current version of the creature catalogue, or None if the
+    catalogue is not versioned.
+    """
+    try:
+        row = db_session.get(CatalogueVersion, 1, populate_existing=True)
+    except OperationalError as e:
+        logger.debug(f"Catalogue version unavailable: {str(e)}")
+        db_session.rollback()
+        return None
+    return row.version if row is not None else None
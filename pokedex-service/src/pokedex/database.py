@@ -1,33 +1,179 @@
-from typing import Annotated
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlalchemy import Engine
+from loguru import logger
+from sqlalchemy import Engine, event, inspect, make_url, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateColumn
 from sqlmodel import SQLModel, Session, create_engine
 
 from pokedex.config import Settings, get_settings
+from pokedex.creature.facets import create_facet_summary
+from pokedex.creature.search import create_search_index
+from pokedex.creature.version import create_version_triggers
+from pokedex.monitoring.metrics import instrument_engine
 
 
 def create_db_engine(settings: Settings) -> Engine:
     """
     Returns the SQLAlchemy engine for database operations.
+    File based SQLite databases get a pool sized for the database executor
+    and the tuning pragmas of the settings on every new connection.
     """
-    connect_args = {"check_same_thread": False}
-    return create_engine(settings.database_url, echo=True, connect_args=connect_args)
+    url = make_url(settings.database_url)
+    if url.get_backend_name() != "sqlite":
+        engine = create_engine(url, echo=settings.db_echo)
+        instrument_engine(engine)
+        return engine
+
+    options = {}
+    if url.database and url.database != ":memory:":
+        options = {
+            "poolclass": QueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+        }
+    engine = create_engine(
+        url,
+        echo=settings.db_echo,
+        connect_args={"check_same_thread": False},
+        **options,
+    )
+    apply_sqlite_pragmas(engine, settings)
+    instrument_engine(engine)
+    return engine
+
+
+def apply_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    """
+    Configure every new SQLite connection of an engine. WAL journaling lets
+    readers run concurrently with a writer, and synchronous=NORMAL is safe
+    with WAL while skipping an fsync per commit.
+
+    Args:
+        engine (Engine): The SQLite engine
+        settings (Settings): Application settings with the pragma values
+    """
+    pragmas = {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
 
 
 engine = create_db_engine(get_settings())
 
 
+def create_db_executor(settings: Settings) -> ThreadPoolExecutor:
+    """
+    Returns the bounded thread pool running blocking database work.
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.db_executor_workers, thread_name_prefix="pokedex-db"
+    )
+
+
+db_executor = create_db_executor(get_settings())
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run blocking database work on the database executor, keeping the event
+    loop free while queries run. A session must only be used by one call at
+    a time, so await each call before making the next with the same session.
+
+    Args:
+        fn (Callable[..., Any]): The function to run
+        *args: Positional arguments of the function
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        Any: The result of the function
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        db_executor, functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
 def create_db_and_tables(engine: Engine):
     SQLModel.metadata.create_all(engine)
+    add_missing_columns(engine)
+    add_missing_indexes(engine)
+    create_search_index(engine)
+    create_version_triggers(engine)
+    create_facet_summary(engine)
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """
+    Add columns that were added to existing models since their tables were
+    created. create_all only creates missing tables, so this keeps databases
+    from earlier versions usable. New columns must be nullable or have a
+    server default.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                logger.info(f"Adding column {table.name}.{column.name}")
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                for index in table.indexes:
+                    if column in index.columns.values():
+                        index.create(connection, checkfirst=True)
+
+
+def add_missing_indexes(engine: Engine) -> None:
+    """
+    Create indexes that were added to existing models since their tables
+    were created, which create_all skips for tables that already exist.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                logger.info(f"Creating index {index.name}")
+                index.create(connection, checkfirst=True)
 
 
 async def get_session():
     """
     Returns a new SQLAlchemy session for database operations.
     """
-    with Session(engine) as session:
+    # Keep loaded attributes after commit so creatures can be shared with
+    # concurrent requests coalesced onto this one
+    session = Session(engine, expire_on_commit=False)
+    try:
         yield session
+    finally:
+        # Closing rolls back and returns the connection to the pool
+        await run_db(session.close)
 
 
 DbSession = Annotated[Session, Depends(get_session)]
@@ -0,0 +1,137 @@
+import os
+import re
+from uuid import uuid1
+
+from loguru import logger
+
+from pokedex.config import get_settings
+from pokedex.image.processing import resize_image
+
+# Path the derivative directory is served under, relative to the API root
+MEDIA_PATH = "/media"
+
+EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WEBP": ".webp",
+}
+
+
+def variant_sizes() -> dict[str, int]:
+    """
+    Returns the maximum edge in pixels of each image variant.
+    """
+    settings = get_settings()
+    return {
+        "thumbnail": settings.thumbnail_max_edge,
+        "medium": settings.medium_max_edge,
+    }
+
+
+def derivative_name(sha256: str, variant: str) -> str:
+    """
+    Returns the path of a variant relative to the derivative directory.
+    The name is derived from the source image hash and every encoding
+    parameter, so it changes whenever the output would change and the file
+    can be cached forever.
+
+    Args:
+        sha256 (str): Hex encoded SHA-256 of the source image
+        variant (str): Name of the variant
+
+    Returns:
+        str: The relative path of the variant
+    """
+    settings = get_settings()
+    max_edge = variant_sizes()[variant]
+    extension = EXTENSIONS[settings.derivative_format]
+    return f"{variant}/{sha256[:2]}/{sha256}-{max_edge}-q{settings.derivative_quality}{extension}"
+
+
+def parse_derivative_name(name: str) -> tuple[str, str] | None:
+    """
+    Returns the source image hash and variant a path relative to the
+    derivative directory is named after, or None unless it is exactly the
+    name derivative_name gives them with the current settings.
+
+    Args:
+        name (str): Relative path of a variant
+
+    Returns:
+        tuple[str, str] | None: The hex encoded SHA-256 and the variant
+    """
+    variant, _, filename = name.partition("/")
+    match = re.match(r"[0-9a-f]+(?=-)", os.path.basename(filename))
+    if variant not in variant_sizes() or match is None:
+        return None
+    if derivative_name(match.group(), variant) != name:
+        return None
+    return match.group(), variant
+
+
+def derivative_url(sha256: str | None, variant: str) -> str | None:
+    """
+    Returns the URL of a variant relative to the API root, or None for images
+    whose hash is not known. Variants missing on disk are generated when
+    first requested, see DerivativeStaticFiles.
+
+    Args:
+        sha256 (str | None): Hex encoded SHA-256 of the source image
+        variant (str): Name of the variant
+
+    Returns:
+        str | None: The URL of the variant
+    """
+    if sha256 is None:
+        return None
+    return f"{MEDIA_PATH}/{derivative_name(sha256, variant)}"
+
+
+def generate_derivatives(image_path: str, sha256: str) -> int:
+    """
+    Write every variant of an image that does not exist yet. Files are written
+    under a temporary name and renamed into place, so a variant is never
+    served half-written. This reads and encodes images, so run it off the
+    event loop.
+
+    Args:
+        image_path (str): Path of the source image
+        sha256 (str): Hex encoded SHA-256 of the source image
+
+    Returns:
+        int: The number of variants generated
+    """
+    settings = get_settings()
+    missing = {
+        variant: max_edge
+        for variant, max_edge in variant_sizes().items()
+        if not os.path.exists(
+            os.path.join(settings.derivative_dir, derivative_name(sha256, variant))
+        )
+    }
+    if not missing:
+        return 0
+
+    try:
+        with open(image_path, "rb") as f:
+            image = f.read()
+    except OSError as e:
+        logger.warning(f"Could not read image {image_path}: {str(e)}")
+        return 0
+
+    generated = 0
+    for variant, max_edge in missing.items():
+        file_path = os.path.join(settings.derivative_dir, derivative_name(sha256, variant))
+        try:
+            output = resize_image(
+                image, max_edge, settings.derivative_format, settings.derivative_quality
+            )
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            temp_path = f"{file_path}.{uuid1()}.part"
+            with open(temp_path, "wb") as f:
+                f.write(output)
+            os.replace(temp_path, file_path)
+            generated += 1
+        except Exception as e:
+            logger.warning(f"Could not generate {variant} of {image_path}: {str(e)}")
+    return generated
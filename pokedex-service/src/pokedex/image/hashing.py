@@ -0,0 +1,112 @@
+from io import BytesIO
+
+from PIL import Image
+
+
+def dhash(image: bytes, hash_size: int = 8) -> int:
+    """
+    Compute the difference hash (dHash) of an image.
+    Near-duplicate images (resized, recompressed, lightly cropped) produce
+    hashes within a small Hamming distance of each other.
+
+    Args:
+        image (bytes): The encoded image
+        hash_size (int): Width/height of the hash grid, giving hash_size**2 bits
+
+    Returns:
+        int: The perceptual hash as an integer
+
+    Raises:
+        PIL.UnidentifiedImageError: If the bytes are not a decodable image
+    """
+    with Image.open(BytesIO(image)) as img:
+        img.draft("L", (hash_size * 4, hash_size * 4))  # Cheap JPEG downscale on decode
+        pixels = list(
+            img.convert("L")
+            .resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+            .getdata()
+        )
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Returns the number of differing bits between two hashes.
+    """
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes using the Hamming distance.
+    Each node stores a hash and the set of keys sharing it; removals are
+    handled by dropping keys, leaving empty nodes in place as routing nodes.
+    """
+
+    def __init__(self):
+        self._root: list | None = None  # [hash, keys, {distance: child}]
+        self.size = 0
+
+    def add(self, value: int, key: int) -> None:
+        """
+        Insert a key under the given hash. Inserting a key already stored
+        under the hash changes nothing.
+        """
+        if self._root is None:
+            self._root = [value, {key}, {}]
+            self.size += 1
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                if key not in node[1]:
+                    node[1].add(key)
+                    self.size += 1
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, {key}, {}]
+                self.size += 1
+                return
+            node = child
+
+    def remove(self, value: int, key: int) -> None:
+        """
+        Remove a key previously inserted under the given hash.
+        """
+        node = self._root
+        while node is not None:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                if key in node[1]:
+                    node[1].discard(key)
+                    self.size -= 1
+                return
+            node = node[2].get(distance)
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """
+        Find every key whose hash lies within max_distance of value.
+
+        Returns:
+            list[tuple[int, int]]: (distance, key) pairs sorted by distance
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, key) for key in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(results)
@@ -0,0 +1,119 @@
+from io import BytesIO
+
+from loguru import logger
+from PIL import Image, ImageOps
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+# Leading bytes of the formats vision models accept, to label images that
+# cannot be decoded here
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+_HEIF_BRANDS = {b"heic": "image/heic", b"heix": "image/heic", b"mif1": "image/heif", b"avif": "image/avif"}
+
+
+def sniff_mime_type(image: bytes) -> str:
+    """
+    Returns the MIME type of an encoded image from its leading bytes, or
+    application/octet-stream if the format is not recognised.
+    """
+    for signature, mime_type in _SIGNATURES:
+        if image.startswith(signature):
+            return mime_type
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return "image/webp"
+    if image[4:8] == b"ftyp" and image[8:12] in _HEIF_BRANDS:
+        return _HEIF_BRANDS[image[8:12]]
+    return "application/octet-stream"
+
+
+def normalize_image(
+    image: bytes, max_edge: int = 1024, format: str = "JPEG", quality: int = 85
+) -> tuple[bytes, str]:
+    """
+    Prepare an image for a vision model: apply the EXIF orientation, downscale
+    it so its longest edge is at most max_edge, drop all metadata and
+    re-encode it in a compact format.
+    Images that cannot be decoded are returned unchanged, labelled with the
+    type sniffed from their leading bytes.
+
+    Args:
+        image (bytes): The encoded image
+        max_edge (int): Maximum width/height in pixels of the output
+        format (str): Output format, one of JPEG, PNG or WEBP
+        quality (int): Encoder quality for lossy formats
+
+    Returns:
+        tuple[bytes, str]: The encoded image and its MIME type
+    """
+    try:
+        output = resize_image(image, max_edge, format, quality)
+    except Exception as e:
+        logger.warning(f"Could not normalize image, sending it unchanged: {str(e)}")
+        return image, sniff_mime_type(image)
+
+    return output, MIME_TYPES[format]
+
+
+def resize_image(
+    image: bytes, max_edge: int = 1024, format: str = "JPEG", quality: int = 85
+) -> bytes:
+    """
+    Apply the EXIF orientation of an image, downscale it so its longest edge
+    is at most max_edge and re-encode it without metadata.
+
+    Args:
+        image (bytes): The encoded image
+        max_edge (int): Maximum width/height in pixels of the output
+        format (str): Output format, one of JPEG, PNG or WEBP
+        quality (int): Encoder quality for lossy formats
+
+    Returns:
+        bytes: The encoded image
+
+    Raises:
+        PIL.UnidentifiedImageError: If the image cannot be decoded
+    """
+    with Image.open(BytesIO(image)) as img:
+        img.draft("RGB", (max_edge, max_edge))  # Cheap JPEG downscale on decode
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        if format == "JPEG" and img.mode != "RGB":
+            # JPEG has no alpha channel, flatten transparency onto white
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, "white")
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGBA")
+
+        output = BytesIO()
+        img.save(output, format=format, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def image_dimensions(image_path: str) -> tuple[int, int] | None:
+    """
+    Read the width and height of an image file without decoding it.
+
+    Args:
+        image_path (str): Path of the image file
+
+    Returns:
+        tuple[int, int] | None: Width and height in pixels, or None if the
+            file is not a readable image
+    """
+    try:
+        with Image.open(image_path) as img:
+            return img.size
+    except Exception as e:
+        logger.warning(f"Could not read image dimensions of {image_path}: {str(e)}")
+        return None
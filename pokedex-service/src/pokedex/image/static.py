@@ -0,0 +1,60 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import os
+
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from pokedex.image.derivatives import generate_derivatives, parse_derivative_name
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Static files whose names change whenever their contents do, so clients
+    may cache them for as long as they like. ETag and Last-Modified
+    revalidation is still handled by StaticFiles.
+    """
+
+    cache_control = "public, max-age=31536000, immutable"
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+class DerivativeStaticFiles(ImmutableStaticFiles):
+    """
+    Image variants, generated from their source image the first time one
+    missing on disk is requested. Only names derivative_name gives with the
+    current settings are generated, for images the source callable knows.
+    """
+
+    def __init__(self, *args, source: Callable[[str], Awaitable[str | None]], **kwargs):
+        """
+        Args:
+            source: Returns the path of the image with a given SHA-256, or None
+        """
+        super().__init__(*args, **kwargs)
+        self.source = source
+
+    async def check_config(self) -> None:
+        if self.directory is not None:
+            await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        await super().check_config()
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            parsed = parse_derivative_name(path) if e.status_code == 404 else None
+            if parsed is None:
+                raise
+            sha256, _ = parsed
+            image_path = await self.source(sha256)
+            if image_path is None:
+                raise
+            await asyncio.to_thread(generate_derivatives, image_path, sha256)
+            return await super().get_response(path, scope)
@@ -0,0 +1,84 @@
+import os
+
+from PIL import Image
+import pytest
+
+from pokedex.config import Settings
+from pokedex.image.derivatives import (
+    derivative_name,
+    derivative_url,
+    generate_derivatives,
+    parse_derivative_name,
+)
+
+
+@pytest.fixture
+def settings(mocker, tmp_path):
+    settings = Settings(
+        derivative_dir=str(tmp_path / "derivatives"),
+        thumbnail_max_edge=64,
+        medium_max_edge=128,
+        derivative_format="WEBP",
+        derivative_quality=80,
+    )
+    mocker.patch("pokedex.image.derivatives.get_settings", return_value=settings)
+    return settings
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (400, 200), "orange").save(path, format="PNG")
+    return str(path)
+
+
+def test_derivative_name(settings):
+    """Test variant names are derived from the source hash and encoding parameters."""
+    assert derivative_name("abcdef", "thumbnail") == "thumbnail/ab/abcdef-64-q80.webp"
+
+    settings.derivative_quality = 60
+    assert derivative_name("abcdef", "thumbnail") == "thumbnail/ab/abcdef-64-q60.webp"
+
+
+def test_derivative_url(settings):
+    """Test variant URLs point at the media mount and need a known hash."""
+    assert derivative_url("abcdef", "medium") == "/media/medium/ab/abcdef-128-q80.webp"
+    assert derivative_url(None, "medium") is None
+
+
+def test_parse_derivative_name(settings):
+    """Test only the names derivative_name gives with the current settings are parsed."""
+    assert parse_derivative_name("thumbnail/ab/abcdef-64-q80.webp") == ("abcdef", "thumbnail")
+    assert parse_derivative_name("thumbnail/ab/abcdef-64-q60.webp") is None
+    assert parse_derivative_name("thumbnail/cd/abcdef-64-q80.webp") is None
+    assert parse_derivative_name("large/ab/abcdef-64-q80.webp") is None
+    assert parse_derivative_name("thumbnail/ab/../abcdef-64-q80.webp") is None
+
+
+def test_generate_derivatives(settings, image_path):
+    """Test every variant is generated once at its size."""
+    assert generate_derivatives(image_path, "abcdef") == 2
+
+    for variant, size in [("thumbnail", (64, 32)), ("medium", (128, 64))]:
+        file_path = os.path.join(settings.derivative_dir, derivative_name("abcdef", variant))
+        with Image.open(file_path) as img:
+            assert img.format == "WEBP"
+            assert img.size == size
+    assert not [
+        name
+        for _, _, names in os.walk(settings.derivative_dir)
+        for name in names
+        if name.endswith(".part")
+    ]
+
+    assert generate_derivatives(image_path, "abcdef") == 0
+
+
+def test_generate_derivatives_unreadable(settings, tmp_path):
+    """Test missing or undecodable images produce no variants."""
+    not_an_image = tmp_path / "notes.txt"
+    not_an_image.write_bytes(b"not an image")
+
+    assert generate_derivatives(str(tmp_path / "missing.png"), "abcdef") == 0
+    assert generate_derivatives(str(not_an_image), "abcdef") == 0
+    assert not os.path.exists(os.path.join(settings.derivative_dir, "thumbnail", "ab"))
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+import pytest
+
+from pokedex.image.hashing import BKTree, dhash, hamming_distance
+
+
+def make_image(size=(256, 192), format="PNG", quality=95, shape=0):
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    if shape == 0:
+        draw.ellipse((width * 0.2, height * 0.2, width * 0.7, height * 0.9), fill="orange")
+        draw.rectangle((width * 0.6, height * 0.1, width * 0.9, height * 0.4), fill="black")
+    else:
+        draw.polygon([(0, height), (width / 2, 0), (width, height)], fill="green")
+        draw.rectangle((0, 0, width * 0.3, height * 0.3), fill="blue")
+    buffer = BytesIO()
+    image.save(buffer, format=format, quality=quality)
+    return buffer.getvalue()
+
+
+def test_dhash_identical_images():
+    """Test identical images hash identically."""
+    assert dhash(make_image()) == dhash(make_image())
+
+
+def test_dhash_near_duplicate():
+    """Test resized and recompressed copies hash close to the original."""
+    original = dhash(make_image())
+    resized = dhash(make_image(size=(640, 480), format="JPEG", quality=40))
+
+    assert hamming_distance(original, resized) <= 6
+
+
+def test_dhash_different_images():
+    """Test different images hash far apart."""
+    assert hamming_distance(dhash(make_image()), dhash(make_image(shape=1))) > 10
+
+
+def test_dhash_invalid_image():
+    """Test dhash rejects bytes that are not an image."""
+    with pytest.raises(Exception):
+        dhash(b"not an image")
+
+
+def test_hamming_distance():
+    """Test the Hamming distance counts differing bits."""
+    assert hamming_distance(0b1010, 0b1010) == 0
+    assert hamming_distance(0b1010, 0b0101) == 4
+
+
+def test_bktree_search():
+    """Test the BK-tree returns every key within the distance, closest first."""
+    tree = BKTree()
+    tree.add(0b0000, 1)
+    tree.add(0b0001, 2)
+    tree.add(0b0111, 3)
+    tree.add(0b1111, 4)
+
+    assert tree.search(0b0000, 1) == [(0, 1), (1, 2)]
+    assert tree.search(0b0011, 1) == [(1, 2), (1, 3)]
+    assert tree.search(0b1111, 0) == [(0, 4)]
+
+
+def test_bktree_remove():
+    """Test removed keys are no longer returned."""
+    tree = BKTree()
+    tree.add(0b0000, 1)
+    tree.add(0b0001, 2)
+
+    tree.remove(0b0000, 1)
+
+    assert tree.search(0b0000, 1) == [(1, 2)]
+    assert tree.size == 1
+
+
+def test_bktree_add_duplicate():
+    """Test adding a key twice under the same hash counts it once."""
+    tree = BKTree()
+    tree.add(0b0000, 1)
+    tree.add(0b0000, 1)
+    tree.add(0b0001, 1)
+
+    assert tree.size == 2
+    tree.remove(0b0000, 1)
+    assert tree.size == 1
@@ -0,0 +1,101 @@
+from io import BytesIO
+
+from PIL import Image
+
+from pokedex.image.processing import image_dimensions, normalize_image, sniff_mime_type
+
+
+def make_image(size=(4000, 3000), mode="RGB", format="JPEG", exif=None):
+    image = Image.new(mode, size, "orange" if mode == "RGB" else (255, 128, 0, 128))
+    buffer = BytesIO()
+    if exif is not None:
+        image.save(buffer, format=format, exif=exif)
+    else:
+        image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def open_image(data):
+    return Image.open(BytesIO(data))
+
+
+def test_normalize_image_downscales():
+    """Test large images are downscaled to the maximum edge, keeping the aspect ratio."""
+    data, mime_type = normalize_image(make_image(), max_edge=1024)
+
+    assert mime_type == "image/jpeg"
+    assert open_image(data).size == (1024, 768)
+
+
+def test_normalize_image_keeps_small_images():
+    """Test images within the maximum edge are not upscaled."""
+    data, _ = normalize_image(make_image(size=(200, 100)), max_edge=1024)
+
+    assert open_image(data).size == (200, 100)
+
+
+def test_normalize_image_strips_metadata_and_applies_orientation():
+    """Test EXIF metadata is removed after applying the orientation tag."""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees clockwise
+    exif[0x010F] = "Phone Maker"
+
+    data, _ = normalize_image(make_image(size=(400, 200), exif=exif), max_edge=1024)
+
+    image = open_image(data)
+    assert image.size == (200, 400)
+    assert not image.getexif()
+
+
+def test_normalize_image_flattens_alpha_for_jpeg():
+    """Test transparent PNGs are re-encoded as JPEG."""
+    data, mime_type = normalize_image(
+        make_image(size=(300, 300), mode="RGBA", format="PNG"), format="JPEG"
+    )
+
+    assert mime_type == "image/jpeg"
+    assert open_image(data).mode == "RGB"
+
+
+def test_normalize_image_webp():
+    """Test images can be re-encoded as WebP."""
+    data, mime_type = normalize_image(make_image(size=(300, 300)), format="WEBP")
+
+    assert mime_type == "image/webp"
+    assert open_image(data).format == "WEBP"
+
+
+def test_normalize_image_invalid_image():
+    """Test undecodable bytes are passed through unchanged, not labelled as PNG."""
+    assert normalize_image(b"not an image") == (b"not an image", "application/octet-stream")
+
+
+def test_normalize_image_undecodable_keeps_sniffed_type():
+    """Test an image that cannot be decoded keeps the type of its leading bytes."""
+    truncated = make_image(size=(300, 300))[:64]
+
+    assert normalize_image(truncated) == (truncated, "image/jpeg")
+
+
+def test_sniff_mime_type():
+    """Test image formats are recognised from their leading bytes."""
+    assert sniff_mime_type(make_image(size=(10, 10), format="PNG")) == "image/png"
+    assert sniff_mime_type(make_image(size=(10, 10), format="WEBP")) == "image/webp"
+    assert sniff_mime_type(b"\x00\x00\x00\x18ftypheic") == "image/heic"
+    assert sniff_mime_type(b"not an image") == "application/octet-stream"
+
+
+def test_image_dimensions(tmp_path):
+    """Test the dimensions of a stored image are read from its header."""
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(make_image(size=(40, 30), format="PNG"))
+
+    assert image_dimensions(str(image_path)) == (40, 30)
+
+
+def test_image_dimensions_not_an_image(tmp_path):
+    """Test unreadable files have no dimensions."""
+    image_path = tmp_path / "notes.txt"
+    image_path.write_bytes(b"not an image")
+
+    assert image_dimensions(str(image_path)) is None
@@ -0,0 +1,63 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from pokedex.config import Settings
+from pokedex.image.static import DerivativeStaticFiles, ImmutableStaticFiles
+
+
+def test_immutable_static_files(tmp_path):
+    """Test files are served with immutable caching and still revalidate by ETag."""
+    (tmp_path / "image.webp").write_bytes(b"image")
+    app = FastAPI()
+    app.mount("/media", ImmutableStaticFiles(directory=str(tmp_path)))
+    client = TestClient(app)
+
+    response = client.get("/media/image.webp")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+
+    response = client.get("/media/image.webp", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+def test_derivative_static_files_generate_missing(mocker, tmp_path):
+    """Test missing variants of known images are generated when first requested."""
+    settings = Settings(
+        derivative_dir=str(tmp_path / "derivatives"),
+        thumbnail_max_edge=64,
+        medium_max_edge=128,
+        derivative_format="WEBP",
+        derivative_quality=80,
+    )
+    mocker.patch("pokedex.image.derivatives.get_settings", return_value=settings)
+    image_path = tmp_path / "image.png"
+    Image.new("RGB", (400, 200), "orange").save(image_path, format="PNG")
+    sources = {"abcdef": str(image_path)}
+    looked_up = []
+
+    async def source(sha256):
+        looked_up.append(sha256)
+        return sources.get(sha256)
+
+    app = FastAPI()
+    app.mount(
+        "/media",
+        DerivativeStaticFiles(directory=settings.derivative_dir, check_dir=False, source=source),
+    )
+    client = TestClient(app)
+
+    response = client.get("/media/thumbnail/ab/abcdef-64-q80.webp")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert (tmp_path / "derivatives" / "medium" / "ab" / "abcdef-128-q80.webp").exists()
+
+    assert client.get("/media/thumbnail/ab/abcdef-64-q80.webp").status_code == 200
+    assert client.get("/media/thumbnail/12/123456-64-q80.webp").status_code == 404
+    assert client.get("/media/thumbnail/ab/abcdef-64-q60.webp").status_code == 404
+    assert looked_up == ["abcdef", "123456"]
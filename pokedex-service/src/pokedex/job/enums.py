@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class JobStatus(Enum):
+    """Lifecycle states of an identify job"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    @property
+    def is_finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED)
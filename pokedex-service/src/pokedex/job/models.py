@@ -0,0 +1,44 @@
+from typing import Optional
+from uuid import uuid4
+
+from sqlmodel import SQLModel, Field
+
+from pokedex.creature.enums import IdentifyStage
+from pokedex.job.enums import JobStatus
+
+
+class IdentifyJobBase(SQLModel):
+    """
+    Base Pydantic model with shared attributes
+    """
+
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True)
+    stage: Optional[IdentifyStage] = None
+    creature_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class IdentifyJob(IdentifyJobBase, table=True):
+    """
+    SQLModel for database operations.
+    The uploaded image is spooled to image_path until the job has run.
+    A running job is claimed by one worker process, which renews its lease
+    until the job finishes.
+    """
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True)
+    image_path: str
+    filename: str
+    content_type: str
+    claimed_by: Optional[str] = None
+    lease_expires_at: Optional[float] = Field(default=None, index=True)
+
+
+class IdentifyJobPublic(IdentifyJobBase):
+    """
+    Schema for reading job state
+    """
+
+    id: str
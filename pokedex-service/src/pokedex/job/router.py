@@ -0,0 +1,138 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from pokedex.database import DbSession, run_db
+from pokedex.creature.dependencies import LimitedBodyRoute, limit_body, validate_image
+from pokedex.job.models import IdentifyJobPublic
+from pokedex.job.service import job_queue
+
+router = APIRouter(
+    prefix="/creature/jobs", tags=["creature-identification"], route_class=LimitedBodyRoute
+)
+
+
+@router.post(
+    "",
+    response_model=IdentifyJobPublic,
+    status_code=202,
+    responses={
+        413: {
+            "description": "Payload Too Large",
+            "content": {
+                "application/json": {"example": {"detail": "File is too large"}}
+            },
+        },
+        503: {
+            "description": "Queue full",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Too many identify jobs queued. Please try again later."}
+                }
+            },
+        }
+    },
+)
+@limit_body(lambda settings: settings.max_upload_bytes)
+async def submit_identify_job(
+    db_session: DbSession,
+    image: Annotated[UploadFile, Depends(validate_image)],
+):
+    """
+    Endpoint to queue the identification of a creature from an uploaded image.
+
+    Args:
+        db_session: Database session
+        image: The validated image file
+
+    Returns:
+        The queued job, to be polled or streamed for progress
+    """
+
+    job = await job_queue.submit(db_session, image)
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=IdentifyJobPublic,
+    responses={
+        404: {
+            "description": "Job not found",
+            "content": {"application/json": {"example": {"detail": "Job not found"}}},
+        }
+    },
+)
+async def get_identify_job(
+    db_session: DbSession,
+    job_id: str,
+):
+    """
+    Endpoint to get the state of an identify job.
+
+    Args:
+        db_session: Database session
+        job_id: The ID of the job
+
+    Returns:
+        The job status, current stage and, once done, the creature ID or error
+    """
+
+    job = await run_db(job_queue.get, db_session, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found",
+        )
+    return job
+
+
+@router.get(
+    "/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        404: {
+            "description": "Job not found",
+            "content": {"application/json": {"example": {"detail": "Job not found"}}},
+        },
+    },
+)
+async def stream_identify_job(
+    db_session: DbSession,
+    job_id: str,
+):
+    """
+    Endpoint streaming the state of an identify job as Server-Sent Events.
+    One event is sent per stage transition until the job finishes, with
+    keepalive comments in between so idle connections are not dropped.
+
+    Args:
+        db_session: Database session
+        job_id: The ID of the job
+
+    Returns:
+        A text/event-stream of job states
+    """
+
+    job = await run_db(job_queue.get, db_session, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found",
+        )
+
+    async def events():
+        async for state in job_queue.subscribe(job):
+            if state is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {state.status.value}\ndata: {state.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so events reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
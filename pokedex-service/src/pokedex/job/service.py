@@ -0,0 +1,428 @@
+import asyncio
+import os
+import socket
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile
+from loguru import logger
+from sqlalchemy import Engine, or_, update
+from sqlmodel import Session, select
+from starlette.datastructures import Headers
+
+from pokedex.config import get_settings
+from pokedex.creature.enums import IdentifyStage
+from pokedex.creature.service import identify_from_image
+from pokedex.creature.utils import upload_file
+from pokedex.database import engine, run_db
+from pokedex.job.enums import JobStatus
+from pokedex.job.models import IdentifyJob, IdentifyJobPublic
+from pokedex.llm import get_agent_config
+
+
+class JobQueue:
+    """
+    Runs identify jobs on a bounded pool of workers.
+    Jobs are persisted in the database so that queued or interrupted work is
+    picked up again after a restart, and state changes are pushed to
+    in-process subscribers for streaming.
+
+    Several processes may share the database. A worker claims a job
+    atomically before running it and renews the lease of the claim while it
+    runs, so each job runs once. Every lease period, running jobs whose lease
+    expired are queued again, queued jobs are picked up by any process and
+    finished jobs older than the retention period are deleted.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        spool_dir: str,
+        upload_dir: str,
+        workers: int = 2,
+        max_queued: int = 100,
+        max_upload_bytes: int | None = None,
+        lease_seconds: float = 60,
+        retention_seconds: float = 7 * 24 * 60 * 60,
+        heartbeat_seconds: float = 15,
+    ):
+        self.engine = engine
+        self.spool_dir = spool_dir
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_upload_bytes = max_upload_bytes
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._pending: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def start(self) -> None:
+        """
+        Queue the unfinished jobs that no live worker holds and start the
+        workers and the periodic maintenance.
+        """
+        await self._maintain()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"identify-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(
+            asyncio.create_task(self._run_maintenance(), name="identify-job-maintenance")
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the workers and queue the jobs they were running again, for any
+        process to pick up.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await run_db(self._release)
+
+    async def submit(self, db_session: Session, image: UploadFile) -> IdentifyJob:
+        """
+        Spool an uploaded image to disk and queue a job identifying it.
+
+        Args:
+            db_session (Session): Database session
+            image (UploadFile): The uploaded image file
+
+        Returns:
+            IdentifyJob: The queued job
+
+        Raises:
+            HTTPException: If too many jobs are already queued or the image is too large
+        """
+        if self._queue.qsize() >= self.max_queued:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many identify jobs queued. Please try again later.",
+            )
+
+        image_path = await upload_file(image, self.spool_dir, self.max_upload_bytes)
+        now = time.time()
+        job = IdentifyJob(
+            image_path=image_path,
+            filename=image.filename or os.path.basename(image_path),
+            content_type=image.content_type,
+            created_at=now,
+            updated_at=now,
+        )
+        db_session.add(job)
+        try:
+            await run_db(self._commit, db_session, job)
+        except Exception:
+            logger.error("Failed to create identify job")
+            db_session.rollback()
+            await asyncio.to_thread(os.remove, image_path)
+            raise
+
+        self._enqueue(job.id)
+        return job
+
+    def get(self, db_session: Session, job_id: str) -> IdentifyJob | None:
+        """
+        Get a job by ID.
+
+        Args:
+            db_session (Session): Database session
+            job_id (str): The ID of the job
+
+        Returns:
+            IdentifyJob | None: The job, or None if not found
+        """
+        return db_session.get(IdentifyJob, job_id)
+
+    async def subscribe(self, job: IdentifyJob) -> AsyncIterator[IdentifyJobPublic | None]:
+        """
+        Yield the current state of a job followed by every change until it
+        finishes. Changes made in this process are pushed as they happen. When
+        none arrives within the heartbeat interval, the job is read again from
+        the database, as another process may be running it, and None is
+        yielded if it did not change, for the caller to keep the stream alive.
+
+        Args:
+            job (IdentifyJob): The job to follow
+        """
+        updates: asyncio.Queue[IdentifyJobPublic] = asyncio.Queue()
+        self._subscribers[job.id].add(updates)
+        try:
+            # Re-read the job after subscribing so no transition is missed
+            state = await run_db(self._read, job.id)
+            if state is None:
+                return
+            yield state
+            while not state.status.is_finished:
+                try:
+                    update = await asyncio.wait_for(updates.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    update = await run_db(self._read, job.id)
+                    if update is None:
+                        return
+                    if update == state:
+                        yield None
+                        continue
+                # Polling may have read a change before it was pushed
+                if update == state or update.updated_at < state.updated_at:
+                    continue
+                state = update
+                yield state
+        finally:
+            self._subscribers[job.id].discard(updates)
+            if not self._subscribers[job.id]:
+                del self._subscribers[job.id]
+
+    @staticmethod
+    def _commit(session: Session, job: IdentifyJob) -> None:
+        session.commit()
+        session.refresh(job)
+
+    def _read(self, job_id: str) -> IdentifyJobPublic | None:
+        with Session(self.engine) as session:
+            job = session.get(IdentifyJob, job_id)
+            return IdentifyJobPublic.model_validate(job) if job is not None else None
+
+    def _publish(self, job: IdentifyJob) -> None:
+        state = IdentifyJobPublic.model_validate(job)
+        for updates in self._subscribers.get(job.id, ()):
+            updates.put_nowait(state)
+
+    async def _update(self, session: Session, job: IdentifyJob, **changes) -> None:
+        for key, value in changes.items():
+            setattr(job, key, value)
+        job.updated_at = time.time()
+        await run_db(session.commit)
+        self._publish(job)
+
+    def _enqueue(self, job_id: str) -> None:
+        if job_id not in self._pending:
+            self._pending.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def _claim(self, job_id: str) -> bool:
+        """
+        Atomically move a queued job to running under this worker's lease.
+        Returns False if another worker claimed it first.
+        """
+        now = time.time()
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                update(IdentifyJob)
+                .where(IdentifyJob.id == job_id, IdentifyJob.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    stage=None,
+                    claimed_by=self.worker_id,
+                    lease_expires_at=now + self.lease_seconds,
+                    updated_at=now,
+                )
+            )
+        return result.rowcount == 1
+
+    def _renew(self, job_id: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(IdentifyJob)
+                .where(
+                    IdentifyJob.id == job_id,
+                    IdentifyJob.claimed_by == self.worker_id,
+                    IdentifyJob.status == JobStatus.RUNNING,
+                )
+                .values(lease_expires_at=time.time() + self.lease_seconds)
+            )
+
+    async def _keep_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await run_db(self._renew, job_id)
+            except Exception as e:
+                logger.error(f"Could not renew the lease of identify job {job_id}: {str(e)}")
+
+    def _release(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(IdentifyJob)
+                .where(
+                    IdentifyJob.claimed_by == self.worker_id,
+                    IdentifyJob.status == JobStatus.RUNNING,
+                )
+                .values(
+                    status=JobStatus.QUEUED,
+                    stage=None,
+                    claimed_by=None,
+                    lease_expires_at=None,
+                    updated_at=time.time(),
+                )
+            )
+
+    def _recover(self) -> list[str]:
+        """
+        Queue again the running jobs whose lease expired, and return the IDs
+        of every queued job, oldest first.
+        """
+        now = time.time()
+        with self.engine.begin() as connection:
+            expired = connection.execute(
+                update(IdentifyJob)
+                .where(
+                    IdentifyJob.status == JobStatus.RUNNING,
+                    or_(
+                        IdentifyJob.lease_expires_at.is_(None),
+                        IdentifyJob.lease_expires_at < now,
+                    ),
+                )
+                .values(
+                    status=JobStatus.QUEUED,
+                    stage=None,
+                    claimed_by=None,
+                    lease_expires_at=None,
+                    updated_at=now,
+                )
+            ).rowcount
+            queued = connection.execute(
+                select(IdentifyJob.id)
+                .where(IdentifyJob.status == JobStatus.QUEUED)
+                .order_by(IdentifyJob.created_at)
+            ).scalars().all()
+        if expired:
+            logger.info(f"Recovered {expired} identify jobs whose worker stopped")
+        return queued
+
+    def _purge(self) -> int:
+        """
+        Delete the finished jobs older than the retention period along with
+        any spooled image they left behind. Returns the number deleted.
+        """
+        cutoff = time.time() - self.retention_seconds
+        with Session(self.engine) as session:
+            jobs = session.exec(
+                select(IdentifyJob).where(
+                    IdentifyJob.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED]),
+                    IdentifyJob.updated_at < cutoff,
+                )
+            ).all()
+            for job in jobs:
+                try:
+                    os.remove(job.image_path)
+                except OSError:
+                    pass
+                session.delete(job)
+            session.commit()
+        if jobs:
+            logger.info(f"Deleted {len(jobs)} finished identify jobs")
+        return len(jobs)
+
+    async def _maintain(self) -> None:
+        for job_id in await run_db(self._recover):
+            self._enqueue(job_id)
+        await run_db(self._purge)
+
+    async def _run_maintenance(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self._maintain()
+            except Exception as e:
+                logger.error(f"Identify job maintenance failed: {str(e)}")
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Identify job {job_id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        if not await run_db(self._claim, job_id):
+            return
+
+        session = Session(self.engine, expire_on_commit=False)
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            job = await run_db(session.get, IdentifyJob, job_id)
+            self._publish(job)
+
+            async def on_stage(stage: IdentifyStage) -> None:
+                await self._update(session, job, stage=stage)
+
+            try:
+                with open(job.image_path, "rb") as f:
+                    image = UploadFile(
+                        file=f,
+                        filename=job.filename,
+                        headers=Headers({"content-type": job.content_type}),
+                    )
+                    creature = await identify_from_image(
+                        session,
+                        image,
+                        self.upload_dir,
+                        get_agent_config(),
+                        on_stage,
+                    )
+            except HTTPException as e:
+                await self._update(
+                    session,
+                    job,
+                    status=JobStatus.FAILED,
+                    error=str(e.detail),
+                    lease_expires_at=None,
+                )
+            except Exception as e:
+                logger.error(f"Identify job {job_id} failed: {str(e)}")
+                await self._update(
+                    session,
+                    job,
+                    status=JobStatus.FAILED,
+                    error="Identification failed",
+                    lease_expires_at=None,
+                )
+            else:
+                await self._update(
+                    session,
+                    job,
+                    status=JobStatus.SUCCEEDED,
+                    creature_id=creature.id,
+                    lease_expires_at=None,
+                )
+
+            try:
+                os.remove(job.image_path)
+            except OSError:
+                pass
+        finally:
+            lease.cancel()
+            await run_db(session.close)
+
+def create_job_queue() -> JobQueue:
+    """
+    Returns a job queue configured from the application settings.
+    """
+    settings = get_settings()
+    return JobQueue(
+        engine=engine,
+        spool_dir=settings.job_spool_dir,
+        upload_dir=settings.upload_dir,
+        workers=settings.job_workers,
+        max_queued=settings.job_max_queued,
+        max_upload_bytes=settings.max_upload_bytes,
+        lease_seconds=settings.job_lease_seconds,
+        retention_seconds=settings.job_retention_seconds,
+        heartbeat_seconds=settings.job_events_heartbeat_seconds,
+    )
+
+
+job_queue = create_job_queue()
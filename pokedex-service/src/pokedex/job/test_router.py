@@ -0,0 +1,96 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from pokedex.creature.enums import IdentifyStage
+from pokedex.job.enums import JobStatus
+from pokedex.job.models import IdentifyJob, IdentifyJobPublic
+
+
+@pytest.fixture
+def mock_job():
+    return IdentifyJob(
+        id="abc123",
+        status=JobStatus.QUEUED,
+        image_path="jobs/abc123.jpg",
+        filename="lion.jpg",
+        content_type="image/jpeg",
+        created_at=1.0,
+        updated_at=1.0,
+    )
+
+
+def test_submit_identify_job(mocker, test_client, mock_job):
+    """Test submitting an image returns the queued job."""
+    mock_queue = mocker.patch("pokedex.job.router.job_queue")
+    mock_queue.submit = AsyncMock(return_value=mock_job)
+
+    response = test_client.post(
+        "/api/v1/creature/jobs",
+        files={"image": ("lion.png", b"image_data", "image/png")},
+    )
+
+    assert response.status_code == 202
+    assert response.json()["id"] == "abc123"
+    assert response.json()["status"] == "queued"
+    assert "image_path" not in response.json()
+
+
+def test_submit_identify_job_invalid_image(test_client):
+    """Test submitting a non-image file is rejected."""
+    response = test_client.post(
+        "/api/v1/creature/jobs",
+        files={"image": ("notes.txt", b"not an image")},
+    )
+
+    assert response.status_code == 422
+
+
+def test_get_identify_job(mocker, test_client, mock_job):
+    """Test polling an existing job returns its state."""
+    mock_queue = mocker.patch("pokedex.job.router.job_queue")
+    mock_job.status = JobStatus.RUNNING
+    mock_job.stage = IdentifyStage.EXPLAINING
+    mock_queue.get.return_value = mock_job
+
+    response = test_client.get("/api/v1/creature/jobs/abc123")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert response.json()["stage"] == "explaining"
+
+
+def test_get_identify_job_not_found(mocker, test_client):
+    """Test polling an unknown job returns 404."""
+    mock_queue = mocker.patch("pokedex.job.router.job_queue")
+    mock_queue.get.return_value = None
+
+    response = test_client.get("/api/v1/creature/jobs/missing")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Job not found"}
+
+
+def test_stream_identify_job(mocker, test_client, mock_job):
+    """Test the event stream sends one event per job state."""
+    mock_queue = mocker.patch("pokedex.job.router.job_queue")
+    mock_queue.get.return_value = mock_job
+
+    async def subscribe(job):
+        yield IdentifyJobPublic.model_validate(mock_job)
+        yield None
+        mock_job.status = JobStatus.SUCCEEDED
+        mock_job.creature_id = 1
+        yield IdentifyJobPublic.model_validate(mock_job)
+
+    mock_queue.subscribe = subscribe
+
+    response = test_client.get("/api/v1/creature/jobs/abc123/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [event for event in response.text.split("\n\n") if event]
+    assert events[0].startswith("event: queued\ndata: ")
+    assert events[1] == ": keepalive"
+    assert events[2].startswith("event: succeeded\ndata: ")
+    assert '"creature_id":1' in events[2]
@@ -0,0 +1,324 @@
+import asyncio
+from io import BytesIO
+import time
+
+from fastapi import HTTPException, UploadFile
+import pytest
+from sqlmodel import Session, select
+from starlette.datastructures import Headers
+
+from pokedex.creature.enums import BodyShapeIcon, IdentifyStage
+from pokedex.creature.models import Creature
+from pokedex.job.enums import JobStatus
+from pokedex.job.models import IdentifyJob, IdentifyJobPublic
+from pokedex.job.service import JobQueue
+
+
+@pytest.fixture
+def job_queue(db_engine, tmp_path):
+    return JobQueue(
+        engine=db_engine,
+        spool_dir=str(tmp_path / "jobs"),
+        upload_dir=str(tmp_path / "uploads"),
+        workers=1,
+        max_queued=2,
+        heartbeat_seconds=0.05,
+    )
+
+
+def other_process(job_queue, **kwargs):
+    return JobQueue(
+        engine=job_queue.engine,
+        spool_dir=job_queue.spool_dir,
+        upload_dir=job_queue.upload_dir,
+        workers=1,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def mock_image():
+    return UploadFile(
+        filename="lion.jpg",
+        file=BytesIO(b"image_data"),
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+
+
+@pytest.fixture
+def mock_creature():
+    return Creature(
+        id=1,
+        name="African Lion",
+        scientific_name="Panthera leo",
+        description="A large wild cat species found in Africa and India.",
+        gender_ratio=0.5,
+        kingdom="Animalia",
+        classification="Mammal",
+        family="Felidae",
+        height=1.2,
+        weight=190.0,
+        body_shape=BodyShapeIcon.QUADRUPED,
+        image_path="path/to/image.jpg",
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_agent_config(mocker):
+    return mocker.patch("pokedex.job.service.get_agent_config", return_value={})
+
+
+async def wait_for_job(job_queue, job_id):
+    for _ in range(100):
+        with Session(job_queue.engine) as session:
+            job = session.get(IdentifyJob, job_id)
+            if job.status.is_finished:
+                return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("Job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_submit_spools_image(db_session, job_queue, mock_image):
+    """Test submitting a job stores the upload and a queued job row."""
+    job = await job_queue.submit(db_session, mock_image)
+
+    assert job.status == JobStatus.QUEUED
+    with open(job.image_path, "rb") as f:
+        assert f.read() == b"image_data"
+
+
+@pytest.mark.asyncio
+async def test_submit_queue_full(db_session, job_queue, mock_image):
+    """Test submissions are rejected once the queue is full."""
+    await job_queue.submit(db_session, mock_image)
+    await job_queue.submit(db_session, mock_image)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await job_queue.submit(db_session, mock_image)
+
+    assert exc_info.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_job_succeeds(mocker, db_session, job_queue, mock_image, mock_creature):
+    """Test a worker runs the identification and records its stages and result."""
+    async def identify(session, image, upload_dir, config, on_stage):
+        assert await image.read() == b"image_data"
+        for stage in IdentifyStage:
+            await on_stage(stage)
+        return mock_creature
+
+    mocker.patch("pokedex.job.service.identify_from_image", side_effect=identify)
+    job = await job_queue.submit(db_session, mock_image)
+
+    states = []
+    subscribed = asyncio.Event()
+
+    async def follow():
+        async for state in job_queue.subscribe(job):
+            if state is not None:
+                states.append((state.status, state.stage))
+            subscribed.set()
+
+    follower = asyncio.create_task(follow())
+    await asyncio.wait_for(subscribed.wait(), timeout=1)
+    await job_queue.start()
+    try:
+        await asyncio.wait_for(follower, timeout=1)
+        finished = await wait_for_job(job_queue, job.id)
+    finally:
+        await job_queue.stop()
+
+    assert finished.status == JobStatus.SUCCEEDED
+    assert finished.creature_id == mock_creature.id
+    assert states[0] == (JobStatus.QUEUED, None)
+    assert [stage for _, stage in states[2:6]] == list(IdentifyStage)
+    assert states[-1][0] == JobStatus.SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_job_fails(mocker, db_session, job_queue, mock_image):
+    """Test a failed identification is recorded with its error."""
+    mocker.patch(
+        "pokedex.job.service.identify_from_image",
+        side_effect=HTTPException(status_code=400, detail="No creature found in the image."),
+    )
+    job = await job_queue.submit(db_session, mock_image)
+
+    await job_queue.start()
+    try:
+        finished = await wait_for_job(job_queue, job.id)
+    finally:
+        await job_queue.stop()
+
+    assert finished.status == JobStatus.FAILED
+    assert finished.error == "No creature found in the image."
+
+
+@pytest.mark.asyncio
+async def test_start_recovers_unfinished_jobs(mocker, db_session, job_queue, mock_image, mock_creature):
+    """Test jobs left queued or running by a previous process are run on start."""
+    mock_identify = mocker.patch(
+        "pokedex.job.service.identify_from_image", return_value=mock_creature
+    )
+    job = await job_queue.submit(db_session, mock_image)
+    job.status = JobStatus.RUNNING
+    db_session.commit()
+
+    restarted = other_process(job_queue)
+    await restarted.start()
+    try:
+        finished = await wait_for_job(restarted, job.id)
+    finally:
+        await restarted.stop()
+
+    assert finished.status == JobStatus.SUCCEEDED
+    mock_identify.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_start_skips_jobs_leased_by_another_process(mocker, db_session, job_queue, mock_image):
+    """Test a job another process is running under a live lease is not run again."""
+    mock_identify = mocker.patch("pokedex.job.service.identify_from_image")
+    job = await job_queue.submit(db_session, mock_image)
+    assert job_queue._claim(job.id)
+
+    other = other_process(job_queue)
+    await other.start()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        await other.stop()
+
+    mock_identify.assert_not_called()
+    db_session.refresh(job)
+    assert job.status == JobStatus.RUNNING
+    assert job.claimed_by == job_queue.worker_id
+
+
+def test_claim_is_exclusive(db_session, job_queue):
+    """Test only one worker can claim a queued job."""
+    job = IdentifyJob(
+        image_path="lion.jpg", filename="lion.jpg", content_type="image/jpeg",
+        created_at=1.0, updated_at=1.0,
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    assert job_queue._claim(job.id)
+    assert not other_process(job_queue)._claim(job.id)
+
+
+def test_recover_requeues_expired_leases(mocker, db_session, job_queue):
+    """Test running jobs are queued again once their lease expired."""
+    job = IdentifyJob(
+        image_path="lion.jpg", filename="lion.jpg", content_type="image/jpeg",
+        created_at=1.0, updated_at=1.0,
+    )
+    db_session.add(job)
+    db_session.commit()
+    mock_time = mocker.patch("pokedex.job.service.time.time", return_value=1000.0)
+    job_queue._claim(job.id)
+
+    mock_time.return_value = 1000.0 + job_queue.lease_seconds - 1
+    assert other_process(job_queue)._recover() == []
+
+    mock_time.return_value = 1000.0 + job_queue.lease_seconds + 1
+    assert other_process(job_queue)._recover() == [job.id]
+    db_session.refresh(job)
+    assert job.status == JobStatus.QUEUED
+    assert job.claimed_by is None
+
+
+def test_purge_deletes_old_finished_jobs(db_session, job_queue, tmp_path):
+    """Test finished jobs past the retention period are deleted with their spool files."""
+    spooled = tmp_path / "left.jpg"
+    spooled.write_bytes(b"image_data")
+    old = IdentifyJob(
+        status=JobStatus.FAILED, image_path=str(spooled), filename="left.jpg",
+        content_type="image/jpeg", created_at=1.0, updated_at=1.0,
+    )
+    recent = IdentifyJob(
+        status=JobStatus.SUCCEEDED, image_path="recent.jpg", filename="recent.jpg",
+        content_type="image/jpeg", created_at=1.0, updated_at=time.time(),
+    )
+    queued = IdentifyJob(
+        image_path="queued.jpg", filename="queued.jpg", content_type="image/jpeg",
+        created_at=1.0, updated_at=1.0,
+    )
+    db_session.add_all([old, recent, queued])
+    db_session.commit()
+    ids = {old.id, recent.id, queued.id}
+
+    assert job_queue._purge() == 1
+
+    db_session.expunge_all()
+    assert ids - set(db_session.exec(select(IdentifyJob.id))) == {old.id}
+    assert not spooled.exists()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_polls_jobs_run_elsewhere(db_session, job_queue, mock_image):
+    """Test subscribers see changes made by another process and get keepalives meanwhile."""
+    job = await job_queue.submit(db_session, mock_image)
+    states = []
+
+    async def follow():
+        async for state in job_queue.subscribe(job):
+            states.append(state.status if state is not None else None)
+
+    follower = asyncio.create_task(follow())
+    await asyncio.sleep(0.08)
+    job.status = JobStatus.SUCCEEDED
+    db_session.commit()
+    await asyncio.wait_for(follower, timeout=1)
+
+    assert states[0] == JobStatus.QUEUED
+    assert None in states
+    assert states[-1] == JobStatus.SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_subscribe_skips_stale_updates(mocker, db_session, job_queue, mock_image):
+    """Test updates pushed after the job was read in a newer state are skipped."""
+    job = await job_queue.submit(db_session, mock_image)
+    subscription = job_queue.subscribe(job)
+    assert (await anext(subscription)).status == JobStatus.QUEUED
+
+    queued = IdentifyJobPublic.model_validate(job)
+    job.status = JobStatus.RUNNING
+    job.updated_at += 1
+    db_session.commit()
+    assert (await anext(subscription)).status == JobStatus.RUNNING
+
+    job_queue._publish(job)
+    for updates in job_queue._subscribers[job.id]:
+        updates.put_nowait(queued)
+    job.status = JobStatus.SUCCEEDED
+    job.updated_at += 1
+    db_session.commit()
+    job_queue._publish(job)
+
+    assert (await anext(subscription)).status == JobStatus.SUCCEEDED
+    await subscription.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_running_jobs(mocker, db_session, job_queue, mock_image):
+    """Test stopping queues the interrupted jobs again right away."""
+    started = asyncio.Event()
+
+    async def identify(session, image, upload_dir, config, on_stage):
+        started.set()
+        await asyncio.sleep(10)
+
+    mocker.patch("pokedex.job.service.identify_from_image", side_effect=identify)
+    job = await job_queue.submit(db_session, mock_image)
+    await job_queue.start()
+    await asyncio.wait_for(started.wait(), timeout=1)
+    await job_queue.stop()
+
+    db_session.refresh(job)
+    assert job.status == JobStatus.QUEUED
+    assert job.claimed_by is None
@@ -1,10 +1,21 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
 from enum import Enum
-from functools import cache
+from importlib.util import find_spec
+from typing import Any
 
+import httpx
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
+from loguru import logger
 from pydantic import SecretStr
 
+from pokedex.config import Settings, get_settings
+from pokedex.monitoring.metrics import LLMMetricsHandler
+from pokedex.resilience import AdaptiveLimiter, CircuitBreaker, EndpointGuard
+
 
 class ModelName(Enum):
     GPT_5 = "gpt-5"
@@ -15,14 +26,21 @@ class ModelName(Enum):
     GEMMA_3_LOCAL = "gemma-3-local"
 
 
-@cache
-def get_llm(model_name: str, endpoint: str, api_key: SecretStr) -> BaseChatModel:
+def get_llm(
+    model_name: str,
+    endpoint: str,
+    api_key: SecretStr,
+    http_async_client: httpx.AsyncClient | None = None,
+    max_retries: int = 2,
+) -> BaseChatModel:
     """
     Returns a language model instance based on the specified model name.
     Args:
         model_name (str): The name of the model to retrieve.
         endpoint (str): The API endpoint for the model.
         api_key (SecretStr): The API key for authentication.
+        http_async_client (httpx.AsyncClient | None): Shared HTTP client to send requests with.
+        max_retries (int): Number of retries made by the OpenAI client itself.
     Returns:
         BaseChatModel: An instance of the requested language model.
     """
@@ -41,12 +59,16 @@ def get_llm(model_name: str, endpoint: str, api_key: SecretStr) -> BaseChatModel
                 base_url=endpoint,
                 temperature=0.0,
                 max_tokens=5000,
+                http_async_client=http_async_client,
+                max_retries=max_retries,
             )
         case ModelName.GPT_5 | ModelName.GPT_5_mini:
             llm = ChatOpenAI(
                 model=model_name,
                 api_key=api_key,
                 max_tokens=5000,
+                http_async_client=http_async_client,
+                max_retries=max_retries,
             )
         case _:
             llm = ChatOpenAI(
@@ -54,6 +76,204 @@ def get_llm(model_name: str, endpoint: str, api_key: SecretStr) -> BaseChatModel
                 api_key=api_key,
                 temperature=0.0,
                 max_tokens=5000,
+                http_async_client=http_async_client,
+                max_retries=max_retries,
             )
 
     return llm
+
+
+class LLMRegistry:
+    """
+    Owns the language models used by the agents together with their HTTP
+    clients and concurrency limits. Models on the same endpoint share one
+    pooled HTTP client, so connections and TLS sessions are reused across
+    requests, and each model has a semaphore bounding its in-flight calls.
+    Calls to each endpoint also go through an EndpointGuard adapting the
+    concurrency to the endpoint's health, which takes over retrying.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._http_clients: dict[str | None, httpx.AsyncClient] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._guards: dict[str | None, EndpointGuard] = {}
+        self._llms: dict[str, BaseChatModel] = {}
+        self._agent_config: RunnableConfig | None = None
+
+    async def start(self) -> None:
+        """
+        Create the HTTP clients and models up front.
+        """
+        self.agent_config()
+        logger.info(f"LLM registry started with {len(self._http_clients)} HTTP clients")
+
+    async def stop(self) -> None:
+        """
+        Close the HTTP clients and forget the models.
+        """
+        clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._semaphores.clear()
+        self._guards.clear()
+        self._llms.clear()
+        self._agent_config = None
+        for client in clients:
+            await client.aclose()
+
+    def _http_client(self, endpoint: str | None) -> httpx.AsyncClient:
+        client = self._http_clients.get(endpoint)
+        if client is None:
+            settings = self.settings
+            http2 = settings.llm_http2 and find_spec("h2") is not None
+            if settings.llm_http2 and not http2:
+                logger.warning("HTTP/2 requested for LLM calls but h2 is not installed, using HTTP/1.1")
+            client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(
+                    settings.llm_timeout_seconds,
+                    connect=settings.llm_connect_timeout_seconds,
+                ),
+            )
+            self._http_clients[endpoint] = client
+        return client
+
+    def semaphore(self, model_name: str) -> asyncio.Semaphore:
+        """
+        Returns the semaphore bounding concurrent calls to a model.
+        Args:
+            model_name (str): The name of the model.
+        Returns:
+            asyncio.Semaphore: The semaphore of the model.
+        """
+        semaphore = self._semaphores.get(model_name)
+        if semaphore is None:
+            limit = self.settings.llm_model_concurrency.get(
+                model_name, self.settings.llm_max_concurrency
+            )
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[model_name] = semaphore
+        return semaphore
+
+    def guard(self, endpoint: str | None) -> EndpointGuard:
+        """
+        Returns the resilience guard of a model endpoint.
+        Args:
+            endpoint (str | None): The API endpoint, None for the provider default.
+        Returns:
+            EndpointGuard: The guard of the endpoint.
+        """
+        guard = self._guards.get(endpoint)
+        if guard is None:
+            settings = self.settings
+            guard = EndpointGuard(
+                endpoint=endpoint or "default",
+                limiter=AdaptiveLimiter(
+                    initial_limit=settings.llm_max_concurrency,
+                    min_limit=settings.llm_adaptive_min_concurrency,
+                    max_limit=settings.llm_max_connections,
+                    latency_target_seconds=settings.llm_latency_target_seconds,
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.llm_breaker_failure_threshold,
+                    recovery_seconds=settings.llm_breaker_recovery_seconds,
+                ),
+                retry_attempts=settings.llm_retry_attempts,
+                retry_base_delay_seconds=settings.llm_retry_base_delay_seconds,
+                retry_max_delay_seconds=settings.llm_retry_max_delay_seconds,
+            )
+            self._guards[endpoint] = guard
+        return guard
+
+    def stats(self) -> list[dict]:
+        """
+        Returns the state of the guard of every endpoint for monitoring.
+        """
+        return [guard.stats() for guard in self._guards.values()]
+
+    def get_llm(self, model_name: str, endpoint: str | None, api_key: SecretStr) -> BaseChatModel:
+        """
+        Returns the shared instance of a language model.
+        Args:
+            model_name (str): The name of the model to retrieve.
+            endpoint (str | None): The API endpoint for the model.
+            api_key (SecretStr): The API key for authentication.
+        Returns:
+            BaseChatModel: The language model.
+        """
+        llm = self._llms.get(model_name)
+        if llm is None:
+            # Retries are made by the endpoint guard
+            llm = get_llm(model_name, endpoint, api_key, self._http_client(endpoint), max_retries=0)
+            llm.callbacks = [LLMMetricsHandler(model_name)]
+            self._llms[model_name] = llm
+        return llm
+
+    def agent_config(self) -> RunnableConfig:
+        """
+        Returns the agent configuration holding the text and image models and
+        their concurrency limits.
+        Returns:
+            RunnableConfig: Configuration passed to the agent graphs.
+        """
+        if self._agent_config is None:
+            settings = self.settings
+            self._agent_config = {
+                "configurable": {
+                    "llm": self.get_llm(settings.model_name, settings.model_endpoint, settings.model_api_key),
+                    "image_llm": self.get_llm(settings.image_model_name, settings.image_model_endpoint, settings.image_model_api_key),
+                    "limits": {
+                        "llm": self.semaphore(settings.model_name),
+                        "image_llm": self.semaphore(settings.image_model_name),
+                    },
+                    "guards": {
+                        "llm": self.guard(settings.model_endpoint),
+                        "image_llm": self.guard(settings.image_model_endpoint),
+                    },
+                }
+            }
+        return self._agent_config
+
+
+async def call_llm(config: RunnableConfig, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Call one of the configured models within its concurrency limit and
+    through the guard of its endpoint, if configured.
+    Args:
+        config (RunnableConfig): Agent configuration.
+        key (str): The configured model, "llm" or "image_llm".
+        fn (Callable[[], Awaitable[Any]]): Coroutine factory making the call.
+    Returns:
+        Any: The result of the call.
+    """
+    configurable = config["configurable"]
+    semaphore = configurable.get("limits", {}).get(key)
+    guard = configurable.get("guards", {}).get(key)
+    async with semaphore if semaphore is not None else nullcontext():
+        if guard is None:
+            return await fn()
+        return await guard.call(fn)
+
+
+def create_llm_registry() -> LLMRegistry:
+    """
+    Returns an LLM registry configured from the application settings.
+    """
+    return LLMRegistry(get_settings())
+
+
+llm_registry = create_llm_registry()
+
+
+def get_agent_config() -> RunnableConfig:
+    """
+    Returns the agent configuration holding the text and image models.
+    Returns:
+        RunnableConfig: Configuration passed to the agent graphs.
+    """
+    return llm_registry.agent_config()
@@ -1,13 +1,23 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from sqlmodel import Session
 
 from pokedex.config import settings
-from pokedex.database import create_db_and_tables
+from pokedex.database import create_db_and_tables, run_db
+from pokedex.creature.image_index import image_index
 from pokedex.creature.router import router as creature_router
+from pokedex.creature.storage import backfill_images, find_image_path, run_image_gc
+from pokedex.image.derivatives import MEDIA_PATH
+from pokedex.image.static import DerivativeStaticFiles
+from pokedex.job.router import router as job_router
+from pokedex.job.service import job_queue
+from pokedex.llm import llm_registry
+from pokedex.monitoring.router import router as monitoring_router
 
 logger.info("Starting Pokedex Service...")
 
@@ -19,8 +29,46 @@ async def lifespan(app: FastAPI):
 
     logger.info("Creating database and tables...")
     create_db_and_tables(engine)
+
+    def rebuild_image_index():
+        with Session(engine) as session:
+            image_index.rebuild(session)
+
+    logger.info("Rebuilding image index in the background...")
+    index_task = asyncio.create_task(asyncio.to_thread(rebuild_image_index))
+
+    def backfill_creature_images():
+        with Session(engine, expire_on_commit=False) as session:
+            backfill_images(session)
+
+    logger.info("Recording the metadata of legacy images in the background...")
+    backfill_task = asyncio.create_task(asyncio.to_thread(backfill_creature_images))
+
+    gc_task = None
+    if settings.image_gc_interval_seconds > 0:
+        logger.info("Scheduling removal of orphaned images...")
+        gc_task = asyncio.create_task(
+            run_image_gc(
+                engine,
+                settings.upload_dir,
+                settings.image_gc_interval_seconds,
+                settings.image_gc_grace_seconds,
+            )
+        )
+
+    logger.info("Creating shared LLM clients...")
+    await llm_registry.start()
+
+    logger.info("Starting identify job workers...")
+    await job_queue.start()
     yield
     # Shutdown events
+    await job_queue.stop()
+    await llm_registry.stop()
+    index_task.cancel()
+    backfill_task.cancel()
+    if gc_task is not None:
+        gc_task.cancel()
     logger.info("Shutting down Pokedex Service...")
 
 
@@ -40,11 +88,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor"],
 )
 
 app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
 
+
+async def source_image(sha256: str) -> str | None:
+    from pokedex.database import engine
+
+    def find() -> str | None:
+        with Session(engine) as session:
+            return find_image_path(session, sha256)
+
+    return await run_db(find)
+
+
+app.mount(
+    MEDIA_PATH,
+    DerivativeStaticFiles(directory=settings.derivative_dir, check_dir=False, source=source_image),
+    name="media",
+)
+
+app.include_router(job_router)
 app.include_router(creature_router)
+app.include_router(monitoring_router)
 
 
 if __name__ == "__main__":
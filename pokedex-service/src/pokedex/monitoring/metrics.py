@@ -0,0 +1,153 @@
+import functools
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Engine, event
+
+# Model calls take seconds to minutes, most other work milliseconds
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, float("inf"))
+BYTES_BUCKETS = tuple(float(1024 * 4**i) for i in range(9)) + (float("inf"),)
+
+NODE_DURATION = Histogram(
+    "pokedex_agent_node_duration_seconds",
+    "Duration of agent graph nodes",
+    ["agent", "node", "outcome"],
+    buckets=LLM_BUCKETS,
+)
+LLM_DURATION = Histogram(
+    "pokedex_llm_request_duration_seconds",
+    "Duration of model calls, per attempt",
+    ["model", "outcome"],
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "pokedex_llm_tokens",
+    "Tokens used by model calls",
+    ["model", "kind"],
+)
+IMAGE_BYTES = Histogram(
+    "pokedex_image_bytes",
+    "Size of uploaded images and of the images sent to the vision model",
+    ["kind"],
+    buckets=BYTES_BUCKETS,
+)
+UPLOAD_DURATION = Histogram(
+    "pokedex_upload_duration_seconds",
+    "Duration of spooling uploads to disk",
+    ["outcome"],
+)
+DB_DURATION = Histogram(
+    "pokedex_db_query_duration_seconds",
+    "Duration of database statements",
+    ["operation"],
+)
+DB_ERRORS = Counter(
+    "pokedex_db_query_errors",
+    "Failed database statements",
+    ["operation"],
+)
+CACHE_LOOKUPS = Counter(
+    "pokedex_cache_lookups",
+    "Lookups of the scan cache and the near-duplicate image index",
+    ["cache", "result"],
+)
+
+DB_OPERATIONS = {"select", "insert", "update", "delete"}
+
+
+def timed_node(agent: str, node: Any) -> Any:
+    """
+    Wrap an agent graph node to record its duration and outcome.
+
+    Args:
+        agent (str): Name of the agent the node belongs to
+        node: The async node function, taking the state and the config
+
+    Returns:
+        The wrapped node
+    """
+    success = NODE_DURATION.labels(agent, node.__name__, "success")
+    error = NODE_DURATION.labels(agent, node.__name__, "error")
+
+    @functools.wraps(node)
+    async def wrapper(state, config: RunnableConfig):
+        started = time.perf_counter()
+        try:
+            result = await node(state, config)
+        except BaseException:
+            error.observe(time.perf_counter() - started)
+            raise
+        success.observe(time.perf_counter() - started)
+        return result
+
+    return wrapper
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    Callback recording the duration, outcome and token usage of every call
+    of the models it is attached to.
+    """
+
+    # Bookkeeping only, no need to hop to a thread for async calls
+    run_inline = True
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._started: dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        self._observe(run_id, "success")
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens"):
+            LLM_TOKENS.labels(self.model_name, "prompt").inc(usage["prompt_tokens"])
+        if usage.get("completion_tokens"):
+            LLM_TOKENS.labels(self.model_name, "completion").inc(usage["completion_tokens"])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._observe(run_id, "error")
+
+    def _observe(self, run_id: UUID, outcome: str) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_DURATION.labels(self.model_name, outcome).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record the duration of every statement run on an engine.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine
+    """
+
+    def operation(statement: str) -> str:
+        verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        return verb if verb in DB_OPERATIONS else "other"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_DURATION.labels(operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+        DB_ERRORS.labels(operation(context.statement or "")).inc()
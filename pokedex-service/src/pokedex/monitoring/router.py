@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from pokedex.llm import llm_registry
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get("/monitoring/llm")
+async def get_llm_stats() -> list[dict]:
+    """
+    Endpoint to inspect the health of the model endpoints.
+
+    Returns:
+        list[dict]: Per endpoint circuit state, adaptive concurrency limit,
+            in-flight and waiting calls, and call, failure, retry and
+            rejection counters
+    """
+    return llm_registry.stats()
+
+
+@router.get("/metrics", response_class=Response)
+async def get_metrics():
+    """
+    Endpoint exposing the service metrics in the Prometheus text format.
+
+    Returns:
+        Latency histograms of agent nodes, model calls, database statements
+        and uploads, image sizes, token usage and cache hit/miss counters
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,75 @@
+from uuid import uuid4
+
+from langchain_core.outputs import LLMResult
+from prometheus_client import REGISTRY
+import pytest
+from sqlalchemy import create_engine, text
+
+from pokedex.monitoring.metrics import LLMMetricsHandler, instrument_engine, timed_node
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_timed_node_records_outcome():
+    """Test node durations are recorded per outcome and errors re-raised."""
+
+    async def good_node(state, config):
+        return {"done": True}
+
+    async def bad_node(state, config):
+        raise ValueError("No image provided")
+
+    def count(node: str, outcome: str) -> float:
+        return sample(
+            "pokedex_agent_node_duration_seconds_count",
+            agent="test-agent",
+            node=node,
+            outcome=outcome,
+        )
+
+    before_good, before_bad = count("good_node", "success"), count("bad_node", "error")
+
+    assert await timed_node("test-agent", good_node)({}, {}) == {"done": True}
+    with pytest.raises(ValueError):
+        await timed_node("test-agent", bad_node)({}, {})
+
+    assert count("good_node", "success") == before_good + 1
+    assert count("bad_node", "error") == before_bad + 1
+
+def test_llm_handler_records_duration_and_tokens():
+    """Test model calls are timed and their token usage counted."""
+    handler = LLMMetricsHandler("test-model")
+    run_id = uuid4()
+    before = sample("pokedex_llm_tokens_total", model="test-model", kind="prompt")
+
+    handler.on_chat_model_start({}, [], run_id=run_id)
+    handler.on_llm_end(
+        LLMResult(
+            generations=[],
+            llm_output={"token_usage": {"prompt_tokens": 12, "completion_tokens": 3}},
+        ),
+        run_id=run_id,
+    )
+
+    assert sample("pokedex_llm_tokens_total", model="test-model", kind="prompt") == before + 12
+    assert sample("pokedex_llm_tokens_total", model="test-model", kind="completion") >= 3
+    assert sample("pokedex_llm_request_duration_seconds_count", model="test-model", outcome="success") >= 1
+
+
+def test_instrument_engine():
+    """Test statements are timed by operation and failures counted."""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = sample("pokedex_db_query_duration_seconds_count", operation="select")
+    errors = sample("pokedex_db_query_errors_total", operation="select")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            connection.execute(text("SELECT * FROM missing"))
+
+    assert sample("pokedex_db_query_duration_seconds_count", operation="select") == before + 1
+    assert sample("pokedex_db_query_errors_total", operation="select") == errors + 1
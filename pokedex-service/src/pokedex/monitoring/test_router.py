@@ -0,0 +1,19 @@
+def test_get_llm_stats(mocker, test_client):
+    """Test the state of the model endpoints is reported."""
+    stats = [{"endpoint": "default", "circuit": "closed", "concurrency_limit": 4.0}]
+    mock_registry = mocker.patch("pokedex.monitoring.router.llm_registry")
+    mock_registry.stats.return_value = stats
+
+    response = test_client.get("/api/v1/monitoring/llm")
+
+    assert response.status_code == 200
+    assert response.json() == stats
+
+
+def test_get_metrics(test_client):
+    """Test metrics are exposed in the Prometheus text format."""
+    response = test_client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "pokedex_agent_node_duration_seconds" in response.text
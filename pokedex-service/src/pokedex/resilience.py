@@ -0,0 +1,298 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import Enum
+import math
+import random
+import time
+from typing import Any
+
+from fastapi import HTTPException
+import httpx
+from loguru import logger
+import openai
+
+# Errors worth retrying: the endpoint is overloaded, restarting or unreachable
+TRANSIENT_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TransportError,
+    asyncio.TimeoutError,
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Returns whether a failed model call may succeed when retried.
+    """
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class CircuitOpenError(HTTPException):
+    """
+    Raised instead of calling a model endpoint that is known to be unhealthy.
+    """
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail="The model backend is unavailable. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        self.endpoint = endpoint
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: the limit grows by one after a full window of
+    fast successful calls and is cut by backoff_ratio when a call is slower
+    than latency_target_seconds or fails transiently. Only calls started
+    after the previous cut can cut it again, so one burst of slow responses
+    counts as a single congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        latency_target_seconds: float = 30,
+        backoff_ratio: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> float:
+        """
+        Wait for a free slot.
+
+        Returns:
+            float: The monotonic time the call started, to pass to release
+        """
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up this caller will not use on to the next waiter
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, succeeded: bool | None) -> None:
+        """
+        Free a slot and adjust the limit from the outcome of the call.
+
+        Args:
+            started (float): The time returned by acquire
+            succeeded (bool | None): Whether the call succeeded, failed
+                transiently, or None to leave the limit unchanged
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if succeeded and now - started <= self.latency_target_seconds:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        elif succeeded is not None and started >= self._last_decrease:
+            previous = self.limit
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            self._last_decrease = now
+            logger.warning(f"Reduced model concurrency limit from {previous:.1f} to {self.limit:.1f}")
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an endpoint after failure_threshold consecutive transient
+    failures. After recovery_seconds a single trial call is let through: its
+    success closes the circuit again, its failure keeps it open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """
+        Returns the number of seconds until the next trial call is allowed.
+        """
+        return max(0.0, self._opened_at + self.recovery_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may be made now, reserving the trial call when
+        the circuit is recovering.
+        """
+        if self.state == CircuitState.OPEN and self.retry_after() == 0:
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+        return self.state == CircuitState.CLOSED
+
+    def record_success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            logger.info("Model endpoint recovered, closing circuit")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.error(f"Model endpoint failing, opening circuit for {self.recovery_seconds}s")
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """
+        Release the trial call of a recovering circuit without a verdict.
+        """
+        self._trial_in_flight = False
+
+
+class EndpointGuard:
+    """
+    Resilience layer around the calls to one model endpoint: an adaptive
+    concurrency limit, jittered retries of transient failures and a circuit
+    breaker failing fast with 503 while the endpoint is unhealthy.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        limiter: AdaptiveLimiter,
+        breaker: CircuitBreaker,
+        retry_attempts: int = 3,
+        retry_base_delay_seconds: float = 0.5,
+        retry_max_delay_seconds: float = 8,
+    ):
+        self.endpoint = endpoint
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retry_attempts = retry_attempts
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self.retry_max_delay_seconds = retry_max_delay_seconds
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Returns the delay before a retry, with full jitter.
+
+        Args:
+            attempt (int): The number of attempts made so far, starting at 1
+        """
+        ceiling = min(
+            self.retry_max_delay_seconds,
+            self.retry_base_delay_seconds * 2 ** (attempt - 1),
+        )
+        return random.uniform(0, ceiling)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Call the endpoint through the guard.
+
+        Args:
+            fn (Callable[[], Awaitable[Any]]): Coroutine factory making the call
+
+        Returns:
+            Any: The result of the call
+
+        Raises:
+            CircuitOpenError: If the endpoint is unhealthy
+        """
+        for attempt in range(1, self.retry_attempts + 1):
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise CircuitOpenError(self.endpoint, self.breaker.retry_after())
+
+            started = await self.limiter.acquire()
+            succeeded = None
+            self.calls += 1
+            try:
+                result = await fn()
+                succeeded = True
+            except asyncio.CancelledError:
+                self.breaker.record_abandoned()
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    # The endpoint answered, the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                succeeded = False
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt == self.retry_attempts:
+                    raise
+                logger.warning(f"Transient failure calling {self.endpoint}: {str(e)}, retrying")
+            finally:
+                self.limiter.release(started, succeeded)
+
+            if succeeded:
+                self.breaker.record_success()
+                return result
+
+            self.retries += 1
+            await asyncio.sleep(self.backoff_delay(attempt))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the current state of the guard for monitoring.
+        """
+        return {
+            "endpoint": self.endpoint,
+            "circuit": self.breaker.state.value,
+            "retry_after_seconds": round(self.breaker.retry_after(), 1)
+            if self.breaker.state == CircuitState.OPEN
+            else 0,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from pokedex.config import get_settings
+from pokedex.database import create_db_and_tables, create_db_engine, run_db
+
+
+def test_create_db_and_tables_adds_missing_columns():
+    """Test tables created by an earlier version get the columns added since."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE creature (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "scientific_name VARCHAR NOT NULL, description VARCHAR NOT NULL, "
+                "gender_ratio FLOAT NOT NULL, kingdom VARCHAR NOT NULL, "
+                "classification VARCHAR NOT NULL, family VARCHAR NOT NULL, "
+                "height FLOAT NOT NULL, weight FLOAT NOT NULL, body_shape VARCHAR NOT NULL, "
+                "image_path VARCHAR NOT NULL)"
+            )
+        )
+
+    create_db_and_tables(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("creature")}
+    assert {"image_sha256", "image_size", "image_width", "image_height"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("creature")}
+    assert {
+        "ix_creature_image_sha256",
+        "ix_creature_name",
+        "ix_creature_height",
+        "ix_creature_weight",
+        "ix_creature_gender_ratio",
+        "ix_creature_taxonomy",
+        "ix_creature_classification",
+        "ix_creature_family",
+        "ix_creature_body_shape_height",
+    } <= indexes
+
+    with engine.connect() as connection:
+        triggers = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        ).scalars().all()
+    assert {"catalogue_version_insert", "catalogue_version_update", "catalogue_version_delete"} <= set(triggers)
+    assert {"creature_facets_insert", "creature_facets_update", "creature_facets_delete"} <= set(triggers)
+
+    # Running it again on an up to date database is a no-op
+    create_db_and_tables(engine)
+
+
+def test_create_db_engine_applies_sqlite_profile(tmp_path):
+    """Test file databases get the pool and the pragmas of the settings on each connection."""
+    settings = get_settings().model_copy(
+        update={
+            "database_url": f"sqlite:///{tmp_path / 'pokedex.db'}",
+            "db_pool_size": 3,
+            "sqlite_busy_timeout_ms": 1234,
+        }
+    )
+    engine = create_db_engine(settings)
+
+    with engine.connect() as connection:
+
+        def pragma(name: str):
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 1234
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("cache_size") == settings.sqlite_cache_size
+    assert engine.pool.size() == 3
+    assert engine.echo is False
+
+
+def test_create_db_engine_in_memory():
+    """Test in-memory databases keep SQLAlchemy's default pool."""
+    settings = get_settings().model_copy(update={"database_url": "sqlite://"})
+    engine = create_db_engine(settings)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+
+
+@pytest.mark.asyncio
+async def test_run_db_keeps_event_loop_free():
+    """Test blocking database work runs on the executor while the loop keeps running."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_query(value, multiplier=1):
+        started.set()
+        release.wait(5)
+        return threading.current_thread().name, value * multiplier
+
+    query = asyncio.create_task(run_db(slow_query, 21, multiplier=2))
+    await asyncio.to_thread(started.wait, 5)
+    # The loop still serves other work while the query blocks its thread
+    assert not query.done()
+    release.set()
+
+    thread_name, result = await query
+    assert result == 42
+    assert thread_name.startswith("pokedex-db")
+
+
+@pytest.mark.asyncio
+async def test_run_db_raises_errors():
+    """Test errors of the database work are raised to the caller."""
+
+    def failing_query():
+        raise ValueError("Database is locked")
+
+    with pytest.raises(ValueError):
+        await run_db(failing_query)
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from pokedex.config import Settings
+from pokedex.llm import LLMRegistry, call_llm
+
+
+@pytest.fixture
+def settings():
+    return Settings(
+        model_name="qwen-3-local",
+        model_endpoint="http://localhost:8001/v1",
+        image_model_name="gemma-3-local",
+        image_model_endpoint="http://localhost:8001/v1",
+        llm_max_connections=8,
+        llm_max_concurrency=3,
+        llm_model_concurrency={"gemma-3-local": 1},
+    )
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_clients_per_endpoint(settings):
+    """Test models on the same endpoint share one pooled HTTP client."""
+    registry = LLMRegistry(settings)
+    await registry.start()
+
+    config = registry.agent_config()
+    llm = config["configurable"]["llm"]
+    image_llm = config["configurable"]["image_llm"]
+
+    assert registry.agent_config() is config
+    assert llm.http_async_client is image_llm.http_async_client
+    assert llm.http_async_client._transport._pool._max_connections == 8
+    assert registry.get_llm("gpt-4o", None, settings.model_api_key).http_async_client is not llm.http_async_client
+
+    await registry.stop()
+    assert llm.http_async_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_registry_per_model_limits(settings):
+    """Test each model gets its own semaphore, with per-model overrides."""
+    registry = LLMRegistry(settings)
+
+    limits = registry.agent_config()["configurable"]["limits"]
+
+    assert limits["llm"]._value == 3
+    assert limits["image_llm"]._value == 1
+    assert registry.semaphore("qwen-3-local") is limits["llm"]
+    await registry.stop()
+
+
+@pytest.mark.asyncio
+async def test_registry_http2_without_h2(mocker, settings):
+    """Test HTTP/2 falls back to HTTP/1.1 when h2 is not installed."""
+    mocker.patch("pokedex.llm.find_spec", return_value=None)
+    settings.llm_http2 = True
+    registry = LLMRegistry(settings)
+
+    llm = registry.agent_config()["configurable"]["llm"]
+
+    assert llm.http_async_client._transport._pool._http2 is False
+    await registry.stop()
+
+
+@pytest.mark.asyncio
+async def test_call_llm_bounds_concurrency():
+    """Test calls holding a model limit never exceed it."""
+    config = {"configurable": {"limits": {"llm": asyncio.Semaphore(2)}}}
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(call_llm(config, "llm", call) for _ in range(5)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_call_llm_without_limits():
+    """Test configurations without limits or guards call the model directly."""
+    async def call():
+        return "response"
+
+    assert await call_llm({"configurable": {}}, "image_llm", call) == "response"
+
+
+@pytest.mark.asyncio
+async def test_call_llm_through_guard(settings):
+    """Test calls go through the guard of the model endpoint, which retries them."""
+    registry = LLMRegistry(settings)
+    config = registry.agent_config()
+    guard = config["configurable"]["guards"]["image_llm"]
+    guard.retry_base_delay_seconds = 0
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise asyncio.TimeoutError()
+        return "response"
+
+    assert await call_llm(config, "image_llm", call) == "response"
+    assert len(attempts) == 2
+    assert registry.stats()[0]["retries"] == 1
+    assert config["configurable"]["llm"].max_retries == 0
+    await registry.stop()
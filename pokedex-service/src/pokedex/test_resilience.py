@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from pokedex.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    EndpointGuard,
+)
+
+
+def make_guard(**kwargs) -> EndpointGuard:
+    guard = EndpointGuard(
+        endpoint="http://model",
+        limiter=AdaptiveLimiter(initial_limit=4, max_limit=8),
+        breaker=CircuitBreaker(failure_threshold=2, recovery_seconds=30),
+        retry_base_delay_seconds=0,
+        **kwargs,
+    )
+    return guard
+
+
+@pytest.mark.asyncio
+async def test_limiter_increases_on_fast_success():
+    """Test the limit grows additively with fast successful calls."""
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=8)
+
+    started = await limiter.acquire()
+    limiter.release(started, True)
+
+    assert limiter.limit == 2.5
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_decreases_once_per_congestion_signal():
+    """Test only calls started after the last decrease cut the limit again."""
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    first = await limiter.acquire()
+    second = await limiter.acquire()
+
+    limiter.release(first, False)
+    limiter.release(second, False)
+    assert limiter.limit == 4
+
+    third = await limiter.acquire()
+    limiter.release(third, False)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_decreases_on_slow_success():
+    """Test calls slower than the latency target count as congestion."""
+    limiter = AdaptiveLimiter(initial_limit=4, latency_target_seconds=0)
+
+    started = await limiter.acquire()
+    await asyncio.sleep(0.01)
+    limiter.release(started, True)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_blocks_beyond_limit():
+    """Test callers wait for a free slot once the limit is reached."""
+    limiter = AdaptiveLimiter(initial_limit=1)
+    started = await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    assert limiter.waiting == 1
+
+    limiter.release(started, None)
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.in_flight == 1
+
+
+def test_breaker_opens_and_recovers(mocker):
+    """Test the circuit opens after consecutive failures and lets a single trial call through."""
+    clock = mocker.patch("pokedex.resilience.time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+    clock.return_value = 130.0
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_reopens_on_failed_trial(mocker):
+    """Test a failed trial call opens the circuit again."""
+    clock = mocker.patch("pokedex.resilience.time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+    breaker.record_failure()
+
+    clock.return_value = 130.0
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.retry_after() == 30
+
+
+@pytest.mark.asyncio
+async def test_guard_retries_transient_failures():
+    """Test transient failures are retried until the call succeeds."""
+    guard = make_guard(retry_attempts=3)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise asyncio.TimeoutError()
+        return "response"
+
+    assert await guard.call(call) == "response"
+    assert guard.retries == 1
+    assert guard.failures == 1
+    assert guard.breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_guard_does_not_retry_other_errors():
+    """Test errors not caused by the endpoint's health are raised immediately."""
+    guard = make_guard(retry_attempts=3)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("Invalid output")
+
+    with pytest.raises(ValueError):
+        await guard.call(call)
+    assert len(attempts) == 1
+    assert guard.breaker.consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_guard_fails_fast_when_circuit_open():
+    """Test calls are rejected with 503 and Retry-After while the circuit is open."""
+    guard = make_guard(retry_attempts=5)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise asyncio.TimeoutError()
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await guard.call(call)
+
+    assert len(attempts) == 2
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "30"}
+    assert guard.stats()["circuit"] == "open"
+    assert guard.stats()["rejected"] == 1
@@ -51,7 +51,7 @@ const CreatureCard: React.FC<CreatureCardProps> = ({ creature, onClose }) => (
     <img
       src={`${(import.meta.env.VITE_IN_CONTAINER === 'true'
         ? `${window.location.origin}/api`
-        : 'http://localhost:8000/api')}/static/uploads/${(creature.image_path ?? '').replace(/^.*[\\\/]/, '')}`}
+        : 'http://localhost:8000/api')}${creature.medium_url ?? `/static/uploads/${(creature.image_path ?? '').replace(/\\/g, '/').replace(/^.*\/uploads\/|^.*\//, '')}`}`}
       alt={creature.name}
       style={{
         width: 180,
@@ -21,6 +21,8 @@ export interface Creature {
   family?: string;
   body_shape?: string;
   image_path?: string;
+  thumbnail_url?: string | null;
+  medium_url?: string | null;
   gender_ratio?: number;
   height?: number;
   weight?: number;
@@ -31,6 +33,21 @@ const API_URL = (import.meta.env.VITE_IN_CONTAINER === 'true'
   ? `${window.location.origin}/api`
   : 'http://localhost:8000/api') + '/creature/';
 
+// Fetch every page of a creature listing, following the X-Next-Cursor header
+async function fetchAllCreatures(url: string, errorMessage: string): Promise<Creature[]> {
+  const creatures: Creature[] = [];
+  let cursor: string | null = null;
+  do {
+    const pageUrl = new URL(url, window.location.href);
+    if (cursor) pageUrl.searchParams.set('cursor', cursor);
+    const res = await fetch(pageUrl);
+    if (!res.ok) throw new Error(`${errorMessage}: ${res.status}`);
+    creatures.push(...(await res.json()));
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return creatures;
+}
+
 // Small typewriter hook used for animated text; keeps it simple and fast
 function useTypewriter(text: string, speed = 20) {
   const [out, setOut] = useState('');
@@ -231,9 +248,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
       setLoading(true);
       // If no grid buttons are pressed, call search with no params (reset filters)
       if (!pressedGridKeys || pressedGridKeys.length === 0) {
-        const res = await fetch(`${API_URL}search`);
-        if (!res.ok) throw new Error(`Search failed: ${res.status}`);
-        const data = await res.json();
+        const data = await fetchAllCreatures(`${API_URL}search`, 'Search failed');
         setCreatures(data);
         setLoading(false);
         return;
@@ -262,9 +277,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
       }
       const query = new URLSearchParams(params).toString();
       const url = `${API_URL}search${query ? `?${query}` : ''}`;
-      const res = await fetch(url);
-      if (!res.ok) throw new Error(`Search failed: ${res.status}`);
-      const data = await res.json();
+      const data = await fetchAllCreatures(url, 'Search failed');
       setCreatures(data);
       setLoading(false);
     } catch (err: any) {
@@ -286,11 +299,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
   useEffect(() => {
     setLoading(true);
     setError(null);
-    fetch(API_URL)
-      .then((res) => {
-        if (!res.ok) throw new Error('Failed to fetch creatures');
-        return res.json();
-      })
+    fetchAllCreatures(API_URL, 'Failed to fetch creatures')
       .then((data) => {
         setCreatures(data);
         setLoading(false);
@@ -399,7 +408,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
                 key={selected ? selected.id : hovered?.id}
                 src={`${(import.meta.env.VITE_IN_CONTAINER === 'true'
                   ? `${window.location.origin}/api`
-                  : 'http://localhost:8000/api')}/static/uploads/${((selected || hovered)?.image_path ?? '').replace(/^.*[\\\/]/, '')}`}
+                  : 'http://localhost:8000/api')}${(selected || hovered)?.medium_url ?? `/static/uploads/${((selected || hovered)?.image_path ?? '').replace(/\\/g, '/').replace(/^.*\/uploads\/|^.*\//, '')}`}`}
                 alt={(selected || hovered)?.name ?? ''}
                 className="crt-wipe"
                 style={{
@@ -665,11 +674,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
     refresh: () => {
       setLoading(true);
       setError(null);
-      fetch(API_URL)
-        .then((res) => {
-          if (!res.ok) throw new Error('Failed to fetch creatures');
-          return res.json();
-        })
+      fetchAllCreatures(API_URL, 'Failed to fetch creatures')
         .then((data) => {
           setCreatures(data);
           setLoading(false);
@@ -807,18 +812,15 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
       setSelected(creature);
       // Refetch the creature list so newly identified creature is present
       try {
-        const listRes = await fetch(API_URL);
-        if (listRes.ok) {
-          const listData = await listRes.json();
-          setCreatures(listData);
-          // attempt to scroll the newly identified creature into view
-          setTimeout(() => {
-            const el = itemRefs.current[creature.id];
-            if (el && typeof el.scrollIntoView === 'function') {
-              el.scrollIntoView({ behavior: 'smooth', block: 'center' });
-            }
-          }, 120);
-        }
+        const listData = await fetchAllCreatures(API_URL, 'Failed to fetch creatures');
+        setCreatures(listData);
+        // attempt to scroll the newly identified creature into view
+        setTimeout(() => {
+          const el = itemRefs.current[creature.id];
+          if (el && typeof el.scrollIntoView === 'function') {
+            el.scrollIntoView({ behavior: 'smooth', block: 'center' });
+          }
+        }, 120);
       } catch (e) {
         // non-fatal - keep selected creature shown
         console.warn('Failed to refetch creatures after identify', e);
@@ -948,7 +950,7 @@ const CreatureList = forwardRef<CreatureListHandle, CreatureListProps>(({ onScan
                   <img
                     src={`${(import.meta.env.VITE_IN_CONTAINER === 'true'
                       ? `${window.location.origin}/api`
-                      : 'http://localhost:8000/api')}/static/uploads/${(creature.image_path ?? "").replace(/^.*[\\\/]/, '')}`}
+                      : 'http://localhost:8000/api')}${creature.thumbnail_url ?? `/static/uploads/${(creature.image_path ?? "").replace(/\\/g, '/').replace(/^.*\/uploads\/|^.*\//, '')}`}`}
                     alt={creature.name}
                     style={{
                       width: 36,